@@ -4,6 +4,7 @@ from langchain_core.runnables import Runnable
 
 from agents.abstract_agents.agents_B.retriever_agent import retriever_node
 from agents.abstract_agents.agents_B.relevance_checker_agent import relevance_check_node
+from streamlit_app.graph_tracing import trace_node, trace_graph
 
 # 각 noded의 출력을 State라고 정의하여 각 Type을 미리 정해두는 것
 class AgentState(TypedDict):
@@ -19,8 +20,8 @@ def build_abstract_graph() -> Runnable:
     builder = StateGraph(state_schema=AgentState)
 
     # 노드 정의
-    builder.add_node("retriever", retriever_node)
-    builder.add_node("relevance_checker", relevance_check_node)
+    builder.add_node("retriever", trace_node("abstract", "retriever", retriever_node))
+    builder.add_node("relevance_checker", trace_node("abstract", "relevance_checker", relevance_check_node))
 
     # 엣지 정의
     builder.set_entry_point("retriever")
@@ -60,4 +61,4 @@ def build_abstract_graph() -> Runnable:
     # )
 
     graph = builder.compile()
-    return graph
\ No newline at end of file
+    return trace_graph("abstract", graph, question_field="query")
\ No newline at end of file
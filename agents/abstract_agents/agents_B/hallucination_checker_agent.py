@@ -1,10 +1,10 @@
 import os
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 
 load_dotenv()
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 HALLUCINATION_PROMPT = """당신은 정확한 정보를 판단하는 전문가입니다.
 
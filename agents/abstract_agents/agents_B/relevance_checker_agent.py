@@ -1,10 +1,10 @@
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+llm = get_llm(model="gpt-4o-mini", temperature=0)
 
 # 프롬프트 템플릿
 RELEVANCE_PROMPT = """
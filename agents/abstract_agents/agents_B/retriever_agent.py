@@ -1,40 +1,62 @@
 from langchain_core.runnables import RunnableLambda
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from langchain.schema.document import Document
-from typing import List
+from streamlit_app.embedding_cache import get_cached_embeddings
+from agents.abstract_agents.paper_index import (
+    DATA_PATH, FAISS_PATH, load_or_build_paper_store, normalize, search_parameters, tombstoned_positions,
+)
 from dotenv import load_dotenv
 import numpy as np
-import json, os
 
 load_dotenv()
-embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
+# ✅ relevance reject 로 다시 실행되어도 같은 query / plan_desc 는 embedding 캐시에서 조회
+embedding_model = get_cached_embeddings(model="text-embedding-3-small")
 
-DATA_PATH = "agents/abstract_agents/data/EMNLP_ACL_NAACL_Abstracts.json"
-FAISS_PATH = "agents/abstract_agents/data/faiss_index"
+# ✅ 인덱스 종류(flat / ivf_flat / ivf_pq / hnsw)는 FAISS_PATH 의 papers.meta.json 에 기록 (paper_index 로 빌드)
+vectorstore, INDEX_META = load_or_build_paper_store(embedding_model, FAISS_PATH, DATA_PATH)
 
-def load_documents(path: str) -> List[Document]:
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return [
-        Document(
-            page_content=item["abstract"],
-            metadata={"title": item.get("title", ""), "url": item.get("url", "")}
-        )
-        for item in data if item.get("abstract") and item.get("title")
-    ]
+# ✅ 증분 반영(paper_ingest)으로 삭제 / 교체된 문서는 벡터가 남아 있으므로 모든 검색 경로에서 제외
+TOMBSTONES = tombstoned_positions(vectorstore)
+SEARCH_PARAMS = search_parameters(vectorstore.index, INDEX_META.get("params", {}), TOMBSTONES)
+
+# ✅ relevance reject 횟수별 (query, plan) 가중치 — cosine 가중합은 선형이므로 두 벡터를 먼저 섞어 한 번만 계산
+SCORE_WEIGHTS = {0: (0.5, 0.5), 1: (0.3, 0.7), 2: (0.7, 0.3)}
+TOP_K = 5
+
+_matrix_cache = {}
+
+def normalized_index_matrix(store) -> np.ndarray:
+    """
+    FAISS 인덱스 벡터를 한 번만 꺼내 L2 정규화한 float32 (N, d) 행렬 — 인덱스 크기가 바뀌면 다시 만듦
+    """
+    index = store.index
+    cached = _matrix_cache.get(id(store))
+    if cached is None or cached.shape[0] != index.ntotal:
+        cached = normalize(index.reconstruct_n(0, index.ntotal))
+        _matrix_cache[id(store)] = cached
+    return cached
 
-if os.path.exists(FAISS_PATH):
-    vectorstore = FAISS.load_local(
-        FAISS_PATH,
-        embeddings=embedding_model,
-        index_name="papers",
-        allow_dangerous_deserialization=True
-    )
-else:
-    documents = load_documents(DATA_PATH)
-    vectorstore = FAISS.from_documents(documents, embedding_model)
-    vectorstore.save_local(FAISS_PATH, index_name="papers")
+def faiss_top_k(store, query_vector: np.ndarray, k: int = TOP_K, params=None):
+    """
+    근사 인덱스(ivf / hnsw)는 행렬을 꺼내지 않고 FAISS 검색 → (인덱스, 점수, 선택된 벡터)
+    """
+    scores, ids = store.index.search(np.ascontiguousarray(query_vector[None, :], dtype=np.float32), k, params=params)
+    keep = ids[0] >= 0
+    top, top_scores = ids[0][keep], scores[0][keep]
+    return top, top_scores, normalize([store.index.reconstruct(int(i)) for i in top]).reshape(len(top), -1)
+
+def top_k_scores(matrix: np.ndarray, query_vector: np.ndarray, k: int = TOP_K, excluded: np.ndarray = None):
+    """
+    행렬-벡터 곱 한 번 + argpartition 으로 상위 k 개 (인덱스, 점수)를 점수 내림차순으로 반환 (excluded 위치 제외)
+    """
+    scores = matrix @ query_vector
+    n_excluded = 0 if excluded is None else len(excluded)
+    if n_excluded:
+        scores[excluded] = -np.inf
+    k = min(k, len(scores) - n_excluded)
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
 
 # 🔹 수정된 retriever_node
 def retriever_node(state: dict) -> dict:
@@ -43,29 +65,26 @@ def retriever_node(state: dict) -> dict:
     relevance_reject_num = state.get("relevance_reject_num", 0)
     print("Tool critic reject number: ", relevance_reject_num)
 
-    # 쿼리 임베딩
-    query_emb = embedding_model.embed_query(query)
-    plan_emb = embedding_model.embed_query(plan_desc)
-
-    # FAISS 인덱스 벡터
-    faiss_index = vectorstore.index
-    stored_vectors = faiss_index.reconstruct_n(0, faiss_index.ntotal)
+    if relevance_reject_num in SCORE_WEIGHTS:
+        # 쿼리 임베딩 (정규화 → 두 벡터의 가중합이 곧 cosine 가중합의 query 벡터)
+        query_emb, plan_emb = normalize(embedding_model.embed_documents([query, plan_desc]))
+        query_weight, plan_weight = SCORE_WEIGHTS[relevance_reject_num]
 
-    def cosine_sim(a, b):
-        return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8)
+        blended = query_weight * query_emb + plan_weight * plan_emb
 
-    query_scores = [cosine_sim(query_emb, v) for v in stored_vectors]
-    plan_scores = [cosine_sim(plan_emb, v) for v in stored_vectors]
-
-    if relevance_reject_num == 0:
-        combined_scores = [(i, (q + p) / 2) for i, (q, p) in enumerate(zip(query_scores, plan_scores))]
-    elif relevance_reject_num == 1:
-        combined_scores = [(i, (0.3 * q + 0.7 * p)) for i, (q, p) in enumerate(zip(query_scores, plan_scores))]
-    elif relevance_reject_num == 2:
-        combined_scores = [(i, (0.7 * q + 0.3 * p)) for i, (q, p) in enumerate(zip(query_scores, plan_scores))]
+        if INDEX_META["index_type"] == "flat":
+            matrix = normalized_index_matrix(vectorstore)
+            top_k, top_scores = top_k_scores(matrix, blended, excluded=TOMBSTONES)
+            top_vectors = matrix[top_k]
+        else:
+            top_k, top_scores, top_vectors = faiss_top_k(vectorstore, blended, params=SEARCH_PARAMS)
+        query_scores, plan_scores = top_vectors @ query_emb, top_vectors @ plan_emb
     else:
         # MMR 검색 (문서 제목 포함된 summary로 대체)
-        docs = vectorstore.max_marginal_relevance_search(query, k=5, fetch_k=20)
+        docs = vectorstore.max_marginal_relevance_search(
+            query, k=5, fetch_k=20,
+            filter=(lambda metadata: not metadata.get("tombstoned")) if len(TOMBSTONES) else None,
+        )
         print("\n Top 5 문서들과 Score 분석 (MMR):")
         for doc in docs:
             print(f"- 제목: {doc.metadata['title']}")
@@ -76,17 +95,16 @@ def retriever_node(state: dict) -> dict:
         ])
         return {**state, "retrieved_doc": combined}
 
-    # 공통 처리: Top-k 정렬
-    top_k = sorted(combined_scores, key=lambda x: x[1], reverse=True)[:5]
+    # 공통 처리: Top-k 출력 (개별 score 는 선택된 k 개만 계산)
     print("\n Top 5 문서들과 Score 분석:")
-    for i, score in top_k:
+    for i, score, query_score, plan_score in zip(top_k, top_scores, query_scores, plan_scores):
         doc = vectorstore.docstore._dict[vectorstore.index_to_docstore_id[i]]
         print(f"- 제목: {doc.metadata['title']}")
-        print(f"  ⤷ Query Score: {query_scores[i]:.4f}")
-        print(f"  ⤷ Plan Score : {plan_scores[i]:.4f}")
+        print(f"  ⤷ Query Score: {query_score:.4f}")
+        print(f"  ⤷ Plan Score : {plan_score:.4f}")
         print(f"  ⤷ 평균 Score  : {score:.4f}")
 
-    docs = [vectorstore.docstore._dict[vectorstore.index_to_docstore_id[i]] for i, _ in top_k]
+    docs = [vectorstore.docstore._dict[vectorstore.index_to_docstore_id[i]] for i in top_k]
     combined = "\n\n".join([
         f"제목: {doc.metadata['title']}\n요약: {doc.page_content}"
         for doc in docs
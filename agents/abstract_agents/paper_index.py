@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import time
+import uuid
+import warnings
+from contextlib import contextmanager
+from typing import List
+
+import faiss
+import numpy as np
+
+from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+'''
+논문 abstract FAISS 인덱스 빌더 — flat(정확) / ivf_flat / ivf_pq / hnsw (근사 최근접 이웃)
+
+사용법 (repo root 에서):
+    python -m agents.abstract_agents.paper_index --index-type hnsw                 # abstract JSON 임베딩 → 인덱스 저장
+    python -m agents.abstract_agents.paper_index --index-type ivf_pq --nlist 1024 --target-recall 0.9
+
+    store, meta = load_paper_store(embedding_model)      # retriever_agent 가 사용 (meta["index_type"])
+    index, params = build_faiss_index(vectors, "ivf_flat")
+    params, chosen, sweep = tune_search_params(index, "ivf_flat", vectors, queries, params)
+
+- 저장 형식: FAISS_PATH/papers.faiss, papers.pkl (LangChain FAISS) + papers.meta.json (index_type, metric, 빌드 / 검색 파라미터)
+- 모든 인덱스는 L2 정규화 벡터의 inner product(= cosine) 사용, meta 파일이 없는 기존 인덱스는 flat / l2 로 간주
+- 근사 인덱스는 코퍼스 일부를 query 로 써서 (자기 자신 match 는 제외) 정확(flat) 결과 대비 recall@k 가 target_recall 이상인 조합 중
+  latency 가 가장 작은 nprobe / efSearch / refine_k_factor 를 골라 저장
+- ivf_pq 는 기본으로 원본 벡터를 함께 저장해 PQ 후보를 정확한 거리로 재정렬 (IndexRefineFlat)
+- recall / latency 비교: python -m benchmarks.ann_index_benchmark
+- 새로 크롤링한 논문 반영 (전체 재임베딩 없이): python -m agents.abstract_agents.paper_ingest
+'''
+
+DATA_PATH = "agents/abstract_agents/data/EMNLP_ACL_NAACL_Abstracts.json"
+FAISS_PATH = "agents/abstract_agents/data/faiss_index"
+INDEX_NAME = "papers"
+META_NAME = f"{INDEX_NAME}.meta.json"
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+EMBED_BATCH_SIZE = int(os.getenv("PAPER_INDEX_EMBED_BATCH", "256"))
+LEGACY_META = {"index_type": "flat", "metric": "l2", "normalized": False, "params": {}}
+
+@contextmanager
+def _inner_product_store():
+    # LangChain 은 MAX_INNER_PRODUCT + normalize_L2 조합에 경고만 내고 정규화는 그대로 수행 (= cosine)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Normalizing L2 is not applicable")
+        yield
+
+def load_documents(path: str = DATA_PATH) -> List[Document]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [
+        Document(
+            page_content=item["abstract"],
+            metadata={"title": item.get("title", ""), "url": item.get("url", "")}
+        )
+        for item in data if item.get("abstract") and item.get("title")
+    ]
+
+def normalize(vectors) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+def embed_texts(embedding_model, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    batches = [
+        embedding_model.embed_documents(texts[start:start + batch_size])
+        for start in range(0, len(texts), batch_size)
+    ]
+    return normalize(np.concatenate([np.asarray(batch, dtype=np.float32) for batch in batches])) if batches \
+        else np.empty((0, 0), dtype=np.float32)
+
+def default_params(index_type: str, n: int, dim: int) -> dict:
+    """
+    코퍼스 크기 / 차원에 맞춘 기본 빌드·검색 파라미터
+    - nlist ≈ 4·√n (centroid 당 학습 벡터 39개 이상), nprobe = nlist / 16
+    - PQ 서브벡터 수 m 은 d 의 약수 중 d/16 에 가까운 값, 학습 벡터가 적으면 nbits 를 줄임
+      PQ 거리만으로는 recall 이 낮으므로 상위 k × refine_k_factor 개를 원본 벡터로 다시 정렬 (0 이면 PQ 코드만 저장)
+    - HNSW M=32, efConstruction=200, efSearch=64
+    """
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nlist = int(max(1, min(4 * np.sqrt(n), n // 39)))
+        params = {"nlist": nlist, "nprobe": max(1, nlist // 16)}
+        if index_type == "ivf_pq":
+            divisors = [m for m in range(1, dim + 1) if dim % m == 0]
+            params["m"] = min(divisors, key=lambda m: abs(m - max(1, dim // 16)))
+            params["nbits"] = int(min(8, max(4, np.log2(max(n // 39, 16)))))
+            params["refine_k_factor"] = 16
+        return params
+    if index_type == "hnsw":
+        return {"hnsw_m": 32, "ef_construction": 200, "ef_search": 64}
+    return {}
+
+def set_search_params(index, params: dict):
+    if "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = int(params["nprobe"])
+    if "ef_search" in params:
+        index.hnsw.efSearch = int(params["ef_search"])
+    if params.get("refine_k_factor") and isinstance(index, faiss.IndexRefine):
+        index.k_factor = float(params["refine_k_factor"])
+
+def _enable_reconstruct(index):
+    # MMR 검색(index.reconstruct) 이 IVF 인덱스에서도 동작하도록 direct map 생성
+    try:
+        faiss.extract_index_ivf(index).make_direct_map()
+    except RuntimeError:
+        pass
+
+def build_faiss_index(vectors: np.ndarray, index_type: str = "flat", **overrides):
+    """
+    정규화된 (n, d) float32 벡터로 inner product 인덱스 생성 + 학습 + 추가 → (index, 사용한 파라미터)
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 index_type: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+    vectors = normalize(vectors)
+    n, dim = vectors.shape
+    params = {**default_params(index_type, n, dim), **{k: v for k, v in overrides.items() if v is not None}}
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, int(params["hnsw_m"]), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = int(params["ef_construction"])
+    else:
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, int(params["nlist"]), faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, int(params["nlist"]), int(params["m"]), int(params["nbits"]),
+                                     faiss.METRIC_INNER_PRODUCT)
+            if params.get("refine_k_factor"):
+                index = faiss.IndexRefineFlat(index)
+        index.train(vectors)
+        _enable_reconstruct(index)
+
+    index.add(vectors)
+    set_search_params(index, params)
+    return index, params
+
+def drop_self_matches(ids: np.ndarray, query_ids: np.ndarray, k: int) -> np.ndarray:
+    # k+1 개 검색 결과에서 query 자신(코퍼스 안의 위치)을 빼고 앞의 k 개
+    return np.stack([row[row != query_id][:k] for row, query_id in zip(ids, query_ids)])
+
+def exact_search(vectors: np.ndarray, queries: np.ndarray, k: int, query_ids: np.ndarray = None) -> np.ndarray:
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(normalize(vectors))
+    if query_ids is None:
+        return index.search(normalize(queries), k)[1]
+    return drop_self_matches(index.search(normalize(queries), k + 1)[1], query_ids, k)
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    hits = sum(len(set(approx[approx >= 0]) & set(exact)) for approx, exact in zip(approx_ids, exact_ids))
+    return hits / exact_ids.size if exact_ids.size else 1.0
+
+def measure_search(index, queries: np.ndarray, exact_ids: np.ndarray, k: int, query_ids: np.ndarray = None) -> dict:
+    # retriever 와 같은 단건 query 기준 latency (query_ids 를 주면 k+1 개를 찾아 자기 자신을 뺀 k 개로 recall 계산)
+    queries = normalize(queries)
+    n_search = k if query_ids is None else k + 1
+    ids = np.empty((len(queries), n_search), dtype=np.int64)
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        ids[i] = index.search(query[None, :], n_search)[1][0]
+    elapsed = time.perf_counter() - start
+    if query_ids is not None:
+        ids = drop_self_matches(ids, query_ids, k)
+    return {"recall": round(recall_at_k(ids, exact_ids), 4), "latency_ms": round(elapsed / max(len(queries), 1) * 1000, 4)}
+
+SEARCH_PARAM_KEYS = ("nprobe", "ef_search", "refine_k_factor")
+
+def search_param_grid(index_type: str, params: dict) -> list:
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nlist = int(params["nlist"])
+        grid = [{"nprobe": p} for p in sorted({min(2 ** i, nlist, 256) for i in range(int(np.log2(nlist)) + 2)})]
+        if params.get("refine_k_factor"):
+            grid = [{**row, "refine_k_factor": k_factor} for k_factor in (4, 16, 32) for row in grid]
+        return grid
+    if index_type == "hnsw":
+        return [{"ef_search": ef} for ef in (16, 32, 64, 128, 256, 512)]
+    return [{}]
+
+def tune_search_params(index, index_type: str, vectors: np.ndarray, queries: np.ndarray, params: dict,
+                       k: int = 5, target_recall: float = 0.95, query_ids: np.ndarray = None):
+    """
+    정확 검색 대비 recall@k ≥ target_recall 인 조합 중 latency 가 가장 작은 nprobe / efSearch / refine_k_factor 선택
+    → (params, 선택된 sweep 행, sweep 결과)  (어떤 조합도 목표를 못 맞추면 recall 이 가장 높은 조합)
+    queries 가 코퍼스 벡터면 query_ids(코퍼스 안의 위치)를 넘겨 자기 자신 match 를 recall 에서 제외
+    """
+    exact_ids = exact_search(vectors, queries, k, query_ids)
+    sweep = []
+    for candidate in search_param_grid(index_type, params):
+        set_search_params(index, candidate)
+        sweep.append({**candidate, **measure_search(index, queries, exact_ids, k, query_ids)})
+    passing = [row for row in sweep if row["recall"] >= target_recall]
+    chosen = min(passing, key=lambda row: row["latency_ms"]) if passing else max(sweep, key=lambda row: row["recall"])
+    params = {**params, **{key: chosen[key] for key in SEARCH_PARAM_KEYS if key in chosen}}
+    set_search_params(index, params)
+    return params, chosen, sweep
+
+def build_paper_store(documents: List[Document], embedding_model, index_type: str = "flat",
+                      target_recall: float = 0.95, n_queries: int = 200, **overrides):
+    """
+    문서 임베딩 → 인덱스 생성 (근사 인덱스는 search 파라미터 튜닝) → (LangChain FAISS store, meta)
+    """
+    vectors = embed_texts(embedding_model, [doc.page_content for doc in documents])
+    index, params = build_faiss_index(vectors, index_type, **overrides)
+
+    meta = {"index_type": index_type, "metric": "inner_product", "normalized": True,
+            "dim": int(vectors.shape[1]), "ntotal": int(index.ntotal)}
+    if index_type != "flat":
+        # ✅ 코퍼스 벡터를 query 로 쓰면 top-1 이 항상 자기 자신(같은 IVF cell / HNSW 이웃)이라 recall 이 부풀려짐
+        #    → 자기 자신을 뺀 k 개 이웃으로 recall 측정
+        rng = np.random.default_rng(0)
+        query_ids = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+        params, chosen, _ = tune_search_params(index, index_type, vectors, vectors[query_ids], params,
+                                               target_recall=target_recall, query_ids=query_ids)
+        meta["tuning"] = {"target_recall": target_recall, "recall": chosen["recall"], "latency_ms": chosen["latency_ms"]}
+    meta["params"] = params
+
+    return paper_store_from_index(index, documents, embedding_model), meta
+
+def paper_store_from_index(index, documents: List[Document], embedding_model, ids: List[str] = None):
+    # index 의 i 번째 벡터 = documents[i] (ids 가 없으면 새 uuid)
+    ids = ids or [str(uuid.uuid4()) for _ in documents]
+    with _inner_product_store():
+        return FAISS(
+            embedding_function=embedding_model,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
+
+def save_paper_store(store, meta: dict, path: str = FAISS_PATH):
+    store.save_local(path, index_name=INDEX_NAME)
+    with open(os.path.join(path, META_NAME), "w", encoding="utf-8") as f:
+        json.dump({"built_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}, f, ensure_ascii=False, indent=1)
+
+def index_metadata(path: str = FAISS_PATH) -> dict:
+    meta_path = os.path.join(path, META_NAME)
+    if not os.path.exists(meta_path):
+        return dict(LEGACY_META)
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def load_paper_store(embedding_model, path: str = FAISS_PATH):
+    """
+    저장된 인덱스 로딩 (meta 에 맞춰 정규화 / 거리 / 검색 파라미터 설정) → (store, meta)
+    """
+    meta = index_metadata(path)
+    normalized = meta.get("normalized", False)
+    with _inner_product_store():
+        store = FAISS.load_local(
+            path,
+            embeddings=embedding_model,
+            index_name=INDEX_NAME,
+            allow_dangerous_deserialization=True,
+            normalize_L2=normalized,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT if normalized else DistanceStrategy.EUCLIDEAN_DISTANCE,
+        )
+    if meta["index_type"] in ("ivf_flat", "ivf_pq"):
+        _enable_reconstruct(store.index)
+    set_search_params(store.index, meta.get("params", {}))
+    return store, meta
+
+def tombstoned_positions(store) -> np.ndarray:
+    """
+    증분 반영(paper_ingest)에서 삭제 / 교체된 문서의 인덱스 위치 — 벡터는 남아 있으므로 검색에서 제외해야 함
+    """
+    docs = store.docstore._dict
+    return np.array(sorted(
+        position for position, doc_id in store.index_to_docstore_id.items()
+        if docs[doc_id].metadata.get("tombstoned")
+    ), dtype=np.int64)
+
+def search_parameters(index, params: dict, excluded: np.ndarray):
+    """
+    excluded 위치를 건너뛰는 검색 파라미터 (index.search(..., params=...)), 제외할 위치가 없으면 None
+    — SearchParameters 는 index 에 설정된 nprobe / efSearch 를 덮어쓰므로 meta 의 값을 함께 넣음
+    """
+    if len(excluded) == 0:
+        return None
+    batch = faiss.IDSelectorBatch(np.ascontiguousarray(excluded, dtype=np.int64))
+    selector = faiss.IDSelectorNot(batch)
+    base = faiss.extract_index_ivf(index.base_index) if isinstance(index, faiss.IndexRefine) else index
+    if isinstance(base, faiss.IndexIVF):
+        search_params = faiss.SearchParametersIVF(sel=selector, nprobe=int(params.get("nprobe", base.nprobe)))
+    elif isinstance(base, faiss.IndexHNSW):
+        search_params = faiss.SearchParametersHNSW(sel=selector, efSearch=int(params.get("ef_search", base.hnsw.efSearch)))
+    else:
+        search_params = faiss.SearchParameters(sel=selector)
+    # SWIG 객체는 Python 참조가 없으면 해제되므로 selector / 내부 파라미터를 함께 보관
+    referenced = [batch, selector, search_params]
+    if isinstance(index, faiss.IndexRefine):
+        search_params = faiss.IndexRefineSearchParameters(k_factor=float(index.k_factor), base_index_params=search_params)
+    search_params.referenced_objects = referenced
+    return search_params
+
+def load_or_build_paper_store(embedding_model, path: str = FAISS_PATH, data_path: str = DATA_PATH):
+    if os.path.exists(path):
+        return load_paper_store(embedding_model, path)
+    store, meta = build_paper_store(load_documents(data_path), embedding_model,
+                                    index_type=os.getenv("PAPER_INDEX_TYPE", "flat"))
+    save_paper_store(store, meta, path)
+    return store, meta
+
+def main(argv=None) -> int:
+    from dotenv import load_dotenv
+    from streamlit_app.embedding_cache import get_cached_embeddings
+
+    parser = argparse.ArgumentParser(description="논문 abstract FAISS 인덱스 빌드")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=FAISS_PATH)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--m", type=int, default=None, help="IVF-PQ 서브벡터 수")
+    parser.add_argument("--nbits", type=int, default=None)
+    parser.add_argument("--refine-k-factor", type=int, default=None, help="IVF-PQ 재정렬 배수 (0: 재정렬 없음)")
+    parser.add_argument("--hnsw-m", type=int, default=None)
+    parser.add_argument("--ef-construction", type=int, default=None)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    documents = load_documents(args.data)
+    start = time.perf_counter()
+    store, meta = build_paper_store(
+        documents, get_cached_embeddings(model="text-embedding-3-small"), args.index_type,
+        target_recall=args.target_recall, nlist=args.nlist, m=args.m, nbits=args.nbits,
+        refine_k_factor=args.refine_k_factor,
+        hnsw_m=args.hnsw_m, ef_construction=args.ef_construction,
+    )
+    save_paper_store(store, meta, args.output)
+    print(f"✅ {args.index_type} 인덱스 저장: {args.output} ({meta['ntotal']}개, {time.perf_counter() - start:.1f}s)")
+    print(json.dumps({key: meta[key] for key in ("params", "tuning") if key in meta}, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from agents.abstract_agents.paper_index import (
+    DATA_PATH, EMBED_BATCH_SIZE, FAISS_PATH, INDEX_NAME, build_faiss_index, build_paper_store, embed_texts,
+    load_documents, load_paper_store, paper_store_from_index, save_paper_store, tombstoned_positions,
+)
+
+'''
+논문 abstract 코퍼스 증분 반영 — JSON 코퍼스와 인덱스를 비교해 새로 크롤링한 / 바뀐 논문만 임베딩
+
+사용법 (repo root 에서):
+    python -m agents.abstract_agents.paper_ingest                                      # DATA_PATH 반영
+    python -m agents.abstract_agents.paper_ingest --data agents/abstract_agents/data/EMNLP_ACL_NAACL_Abstracts.json papers_combined_2024.json
+    python -m agents.abstract_agents.paper_ingest --dry-run                            # 추가 / 변경 / 삭제 개수만 출력
+    python -m agents.abstract_agents.paper_ingest --compact                            # tombstone 정리 (재임베딩 없음)
+
+- 문서 key: url (없으면 제목), content hash: 제목 + abstract 의 sha1 → 새 문서 / hash 가 바뀐 문서만 임베딩
+- 임베딩은 EMBED_BATCH_SIZE 단위, batch 마다 index 끝에 추가 (IVF 는 기존 centroid 에 배정, 재학습 없음)
+- 바뀐 문서의 이전 벡터와 JSON 에서 사라진 문서는 tombstone (docstore metadata["tombstoned"]) → retriever 검색에서 제외
+- tombstone 이 전체의 COMPACT_RATIO 를 넘으면 남은 벡터로 인덱스를 다시 만듦 (저장된 벡터 재사용, 재임베딩 없음)
+- FAISS_PATH/papers.manifest.json: key → (content hash, docstore id) + 반영 이력, 없거나 인덱스와 맞지 않으면 docstore 로 재구성
+'''
+
+MANIFEST_NAME = f"{INDEX_NAME}.manifest.json"
+COMPACT_RATIO = float(os.getenv("PAPER_INDEX_COMPACT_RATIO", "0.2"))
+HISTORY_LIMIT = 50
+
+def document_key(doc: Document) -> str:
+    url = doc.metadata.get("url", "").strip()
+    return url or "title:" + doc.metadata.get("title", "").strip()
+
+def content_hash(doc: Document) -> str:
+    text = f"{doc.metadata.get('title', '')}\n{doc.page_content}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _tombstone(store, doc_id: str):
+    doc = store.docstore._dict[doc_id]
+    doc.metadata = {**doc.metadata, "tombstoned": True}
+
+def manifest_from_store(store) -> dict:
+    """
+    docstore 의 살아 있는 문서로 manifest 구성 (같은 key 가 여러 번 들어 있으면 먼저 들어간 문서를 tombstone)
+    """
+    documents = {}
+    docs = store.docstore._dict
+    for position in sorted(store.index_to_docstore_id):
+        doc_id = store.index_to_docstore_id[position]
+        doc = docs[doc_id]
+        if doc.metadata.get("tombstoned"):
+            continue
+        key = document_key(doc)
+        if key in documents:
+            _tombstone(store, documents[key]["id"])
+        documents[key] = {"hash": content_hash(doc), "id": doc_id}
+    return {"ntotal": int(store.index.ntotal), "documents": documents, "history": []}
+
+def load_manifest(store, path: str = FAISS_PATH) -> dict:
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return manifest_from_store(store)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    docs = store.docstore._dict
+    if manifest.get("ntotal") == store.index.ntotal and all(entry["id"] in docs for entry in manifest["documents"].values()):
+        return manifest
+    # paper_index 로 전체 재빌드한 경우 등 → 이력만 유지
+    print("⚠️ manifest 가 인덱스와 맞지 않아 docstore 로부터 다시 구성합니다.")
+    return {**manifest_from_store(store), "history": manifest.get("history", [])}
+
+def save_manifest(manifest: dict, path: str = FAISS_PATH):
+    with open(os.path.join(path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+def diff_corpus(manifest: dict, documents: List[Document]) -> dict:
+    """
+    JSON 코퍼스 vs manifest → added / changed / removed key 목록, unchanged 개수, corpus (key → Document)
+    """
+    corpus = {document_key(doc): doc for doc in documents}
+    indexed = manifest["documents"]
+    added = [key for key in corpus if key not in indexed]
+    changed = [key for key in corpus if key in indexed and indexed[key]["hash"] != content_hash(corpus[key])]
+    removed = [key for key in indexed if key not in corpus]
+    return {"corpus": corpus, "added": added, "changed": changed, "removed": removed,
+            "unchanged": len(corpus) - len(added) - len(changed)}
+
+def ingest_documents(store, manifest: dict, documents: List[Document], embedding_model,
+                     remove_missing: bool = True, batch_size: int = EMBED_BATCH_SIZE) -> dict:
+    """
+    새 / 바뀐 문서만 batch 단위로 임베딩해 index 에 추가, 바뀐 / 사라진 문서의 기존 벡터는 tombstone → 반영 요약
+    (manifest 는 batch 마다 갱신 → 중간에 실패해도 저장된 batch 는 다음 실행에서 다시 임베딩하지 않음)
+    """
+    start = time.perf_counter()
+    diff = diff_corpus(manifest, documents)
+    indexed = manifest["documents"]
+    stale = diff["changed"] + (diff["removed"] if remove_missing else [])
+    for key in stale:
+        _tombstone(store, indexed.pop(key)["id"])
+
+    pending = diff["added"] + diff["changed"]
+    for begin in range(0, len(pending), batch_size):
+        keys = pending[begin:begin + batch_size]
+        docs = [diff["corpus"][key] for key in keys]
+        texts = [doc.page_content for doc in docs]
+        ids = [str(uuid.uuid4()) for _ in keys]
+        vectors = embed_texts(embedding_model, texts, batch_size)
+        store.add_embeddings(list(zip(texts, vectors)), metadatas=[dict(doc.metadata) for doc in docs], ids=ids)
+        for key, doc, doc_id in zip(keys, docs, ids):
+            indexed[key] = {"hash": content_hash(doc), "id": doc_id}
+        manifest["ntotal"] = int(store.index.ntotal)
+
+    return {
+        "added": len(diff["added"]), "changed": len(diff["changed"]), "removed": len(stale) - len(diff["changed"]),
+        "unchanged": diff["unchanged"], "embedded": len(pending), "seconds": round(time.perf_counter() - start, 2),
+    }
+
+def compact_paper_store(store, meta: dict, embedding_model):
+    """
+    tombstone 을 뺀 벡터로 같은 종류 / 파라미터의 인덱스를 다시 만듦 → (store, meta)
+    저장된 벡터를 reconstruct 해서 쓰므로 재임베딩 없음 (refine 없는 ivf_pq 는 PQ 로 복원한 근사 벡터)
+    """
+    excluded = set(tombstoned_positions(store).tolist())
+    live = [position for position in sorted(store.index_to_docstore_id) if position not in excluded]
+    ids = [store.index_to_docstore_id[position] for position in live]
+    vectors = store.index.reconstruct_batch(np.array(live, dtype=np.int64))
+    index, params = build_faiss_index(vectors, meta["index_type"], **meta.get("params", {}))
+    documents = [store.docstore._dict[doc_id] for doc_id in ids]
+    meta = {**meta, "metric": "inner_product", "normalized": True, "dim": int(vectors.shape[1]),
+            "ntotal": int(index.ntotal), "params": params}
+    return paper_store_from_index(index, documents, embedding_model, ids), meta
+
+def _save(store, meta: dict, manifest: dict, path: str):
+    manifest["ntotal"] = int(store.index.ntotal)
+    meta = {**meta, "ntotal": int(store.index.ntotal), "tombstones": len(tombstoned_positions(store)),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    save_paper_store(store, meta, path)
+    save_manifest(manifest, path)
+
+def ingest_paper_index(embedding_model, data_paths=(DATA_PATH,), path: str = FAISS_PATH, remove_missing: bool = True,
+                       compact: bool = False, compact_ratio: float = COMPACT_RATIO, dry_run: bool = False) -> dict:
+    """
+    data_paths 의 JSON 을 합친 코퍼스를 path 의 인덱스에 반영 → 반영 요약
+    인덱스가 없으면 PAPER_INDEX_TYPE 으로 전체 빌드 (다음 실행부터 증분)
+    """
+    documents = [doc for data_path in data_paths for doc in load_documents(data_path)]
+    if not os.path.exists(path):
+        if dry_run:
+            return {"added": len(documents), "changed": 0, "removed": 0, "unchanged": 0, "embedded": 0}
+        start = time.perf_counter()
+        store, meta = build_paper_store(documents, embedding_model, index_type=os.getenv("PAPER_INDEX_TYPE", "flat"))
+        manifest = manifest_from_store(store)
+        summary = {"added": len(manifest["documents"]), "changed": 0, "removed": 0, "unchanged": 0,
+                   "embedded": len(documents), "seconds": round(time.perf_counter() - start, 2), "full_build": True}
+        manifest["history"].append({"at": time.strftime("%Y-%m-%dT%H:%M:%S"), **summary})
+        _save(store, meta, manifest, path)
+        return summary
+
+    store, meta = load_paper_store(embedding_model, path)
+    manifest = load_manifest(store, path)
+    if dry_run:
+        diff = diff_corpus(manifest, documents)
+        return {"added": len(diff["added"]), "changed": len(diff["changed"]),
+                "removed": len(diff["removed"]) if remove_missing else 0, "unchanged": diff["unchanged"], "embedded": 0}
+
+    summary = {}
+    try:
+        summary = ingest_documents(store, manifest, documents, embedding_model, remove_missing=remove_missing)
+        n_tombstones = len(tombstoned_positions(store))
+        if n_tombstones and (compact or n_tombstones > compact_ratio * store.index.ntotal):
+            store, meta = compact_paper_store(store, meta, embedding_model)
+            summary["compacted"] = n_tombstones
+    finally:
+        # 임베딩 도중 실패해도 이미 추가한 batch 는 저장
+        manifest["history"] = (manifest.get("history", []) + [{"at": time.strftime("%Y-%m-%dT%H:%M:%S"), **summary}])[-HISTORY_LIMIT:]
+        _save(store, meta, manifest, path)
+    return summary
+
+def main(argv=None) -> int:
+    from dotenv import load_dotenv
+    from streamlit_app.embedding_cache import get_cached_embeddings
+
+    parser = argparse.ArgumentParser(description="논문 abstract 코퍼스를 FAISS 인덱스에 증분 반영")
+    parser.add_argument("--data", nargs="+", default=[DATA_PATH], help="합쳐서 하나의 코퍼스로 보는 abstract JSON 경로들")
+    parser.add_argument("--index", default=FAISS_PATH)
+    parser.add_argument("--keep-missing", action="store_true", help="JSON 에 없는 기존 문서를 tombstone 하지 않음")
+    parser.add_argument("--compact", action="store_true", help="tombstone 이 있으면 비율과 관계없이 인덱스 재구성")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    summary = ingest_paper_index(
+        get_cached_embeddings(model="text-embedding-3-small"), args.data, args.index,
+        remove_missing=not args.keep_missing, compact=args.compact, dry_run=args.dry_run,
+    )
+    print(("🔎 " if args.dry_run else "✅ ") + json.dumps(summary, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,7 @@ import openai
 import json
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 from agents.tools_schema import tools_schema
 
@@ -11,7 +11,7 @@ load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # 🔧 최신 도구 설명이 포함된 function_call 기반 모델 생성
-llm = ChatOpenAI(
+llm = get_llm(
     model="gpt-4o-mini",  # function calling 지원 모델
     temperature=0.2,
     model_kwargs={"functions": tools_schema}
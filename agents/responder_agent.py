@@ -3,13 +3,13 @@ import openai
 
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 
 Responder_PROMPT = """당신은 유능한 AI 비서입니다.
@@ -2,13 +2,17 @@ import os
 import openai
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
+from streamlit_app.revision_loop import before_check, after_check
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.5)
+llm = get_llm(model="gpt-4o-mini", temperature=0.5)
+
+# revision은 최대 3번만 -> 무한 루프 방지
+MAX_REJECTIONS = 3
 
 
 HALLUCINATION_CHECK_PROMPT = """
@@ -39,45 +43,70 @@ HALLUCINATION_CHECK_PROMPT = """
 - 요약에서 **명확한 사실 오류, 수치 왜곡, 잘못된 결론**이 있으면 "reject: [이유]" 형식으로 출력하세요.
 """
 
-def hallucination_check_node_fn(state):
+def _hallucination_check_prompt(state):
     print("*" * 10, "Start table analysis hallucination check", "*" * 10)
     
     hallucination_reject_num = state.get("hallucination_reject_num", 0)
-
-    if hallucination_reject_num == 0:
-        prompt = HALLUCINATION_CHECK_PROMPT.format(
-            selected_question=state["selected_question"],
-            linearized_table=state["linearized_table"],
-            numeric_anaylsis=state["numeric_anaylsis"],
-            table_analysis=state["table_analysis"]
-        )
-    else:
-        prompt = HALLUCINATION_CHECK_PROMPT.format(
-            selected_question=state["selected_question"],
-            linearized_table=state["linearized_table"],
-            numeric_anaylsis=state["numeric_anaylsis"],
-            table_analysis=state["revised_analysis"]
-        )
-
-    response = llm.invoke(prompt)
-    result = response.content.strip()
-
+    table_analysis = state["table_analysis"] if hallucination_reject_num == 0 else state["revised_analysis"]
+
+    prompt = HALLUCINATION_CHECK_PROMPT.format(
+        selected_question=state["selected_question"],
+        linearized_table=state["linearized_table"],
+        numeric_anaylsis=state["numeric_anaylsis"],
+        table_analysis=table_analysis
+    )
+    return prompt, table_analysis
+
+def _hallucination_check_skipped(state, loop, decision, verdict):
+    # revision_loop 가 LLM 없이 결정: "accept" / "reject" (규칙 기반 유의성 검증) / "stop" (직전 초안과 거의 동일)
+    if decision == "stop":
+        print("⚠️ 수정 결과가 이전 초안과 거의 같아 revision 을 종료합니다.")
+        return {**state, "hallucination_check": "reject", "revision_loop": loop, "significance_check": verdict}
+    return _hallucination_check_result(state, decision, verdict["feedback"], loop, verdict=verdict)
+
+def _parse_check_response(response):
     # "reject: 이유" 혹은 "accept"
+    result = response.content.strip()
     if result.lower().startswith("reject"):
-        decision = "reject"
-        feedback = result[len("reject"):].strip(": ").strip()
+        return "reject", result[len("reject"):].strip(": ").strip()
+    return "accept", ""
+
+def _hallucination_check_result(state, decision, feedback, loop, response=None, verdict=None):
+    hallucination_reject_num = state.get("hallucination_reject_num", 0)
+    source = "LLM" if response is not None else "Rule"
+
+    print(f"Hallucination Check 결과 ({source}): ", decision)
+    if decision == "reject":
         hallucination_reject_num = hallucination_reject_num + 1
-        print("Hallucination Check 결과: ", decision)
-        print("\nLLM Feedback: ", feedback)
+        print(f"\n{source} Feedback: ", feedback)
     else:
-        decision = "accept"
-        print("Hallucination Check 결과: ", decision)
         feedback = ""
 
     return {**state, 
             "hallucination_check": decision, 
             "feedback": feedback,
-            "hallucination_reject_num": hallucination_reject_num
+            "hallucination_reject_num": hallucination_reject_num,
+            "revision_loop": after_check(loop, decision, llm.model, response, hallucination_reject_num, MAX_REJECTIONS),
+            "significance_check": verdict,
             }
 
-hallucination_check_node = RunnableLambda(hallucination_check_node_fn)
\ No newline at end of file
+def hallucination_check_node_fn(state):
+    prompt, table_analysis = _hallucination_check_prompt(state)
+    loop, skipped, verdict = before_check(state, table_analysis)
+    if skipped is not None:
+        return _hallucination_check_skipped(state, loop, skipped, verdict)
+    response = llm.invoke(prompt)
+    decision, feedback = _parse_check_response(response)
+    return _hallucination_check_result(state, decision, feedback, loop, response=response, verdict=verdict)
+
+# ✅ async graph(ainvoke)용 노드
+async def hallucination_check_node_afn(state):
+    prompt, table_analysis = _hallucination_check_prompt(state)
+    loop, skipped, verdict = before_check(state, table_analysis)
+    if skipped is not None:
+        return _hallucination_check_skipped(state, loop, skipped, verdict)
+    response = await llm.ainvoke(prompt)
+    decision, feedback = _parse_check_response(response)
+    return _hallucination_check_result(state, decision, feedback, loop, response=response, verdict=verdict)
+
+hallucination_check_node = RunnableLambda(hallucination_check_node_fn, afunc=hallucination_check_node_afn)
\ No newline at end of file
@@ -2,13 +2,13 @@ import os
 import openai
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 POLISHING_PROMPT = """
 당신은 통계 데이터를 해석하는 데이터 과학자입니다.
@@ -29,7 +29,7 @@ column: {column_names}
 - 문장 길이는 짧고, 번호 리스트로 작성
 """
 
-def hypothesis_generate_fn(state):
+def _hypothesis_prompt(state) -> str:
     selected_table = state["selected_table"]
     selected_question = state["selected_question"]
 
@@ -51,17 +51,27 @@ def hypothesis_generate_fn(state):
     print("\n 주어진 rows: ", row_names_str)
     print("\n 주어진 columns: ", column_names_str)
 
-    # ✅ LLM 호출
-    response = llm.invoke(POLISHING_PROMPT.format(
+    return POLISHING_PROMPT.format(
         row_names=row_names_str,
         column_names=column_names_str,
         selected_question=selected_question
-    ))
+    )
 
+def _hypothesis_result(state, response):
     hypotheses = response.content.strip()
 
     print(("\n=== 생성된 가설 ===\n"), hypotheses)
     # ✅ 결과 저장
     return {**state, "generated_hypotheses": hypotheses}
 
-hypothesis_generate_node = RunnableLambda(hypothesis_generate_fn)
\ No newline at end of file
+def hypothesis_generate_fn(state):
+    # ✅ LLM 호출
+    response = llm.invoke(_hypothesis_prompt(state))
+    return _hypothesis_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def hypothesis_generate_afn(state):
+    response = await llm.ainvoke(_hypothesis_prompt(state))
+    return _hypothesis_result(state, response)
+
+hypothesis_generate_node = RunnableLambda(hypothesis_generate_fn, afunc=hypothesis_generate_afn)
\ No newline at end of file
@@ -2,13 +2,13 @@ import os
 import openai
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 POLISHING_PROMPT = """
 당신은 한국어 데이터 리포트의 문체와 문장 흐름을 다듬는 전문 에디터입니다.
@@ -39,22 +39,30 @@ POLISHING_PROMPT = """
 """
 
 
-def sentence_polish_fn(state):
+def _polish_prompt(state) -> str:
     print("*" * 10, "Start sentence polishing", "*" * 10)
 
     hallucination_reject_num = state["hallucination_reject_num"]
     
     if hallucination_reject_num == 0:
-        response = llm.invoke(POLISHING_PROMPT.format(
+        return POLISHING_PROMPT.format(
             raw_summary = state["table_analysis"]
-        ))
-    else:
-        response = llm.invoke(POLISHING_PROMPT.format(
-            raw_summary = state["revised_analysis"]
-        ))
+        )
+    return POLISHING_PROMPT.format(
+        raw_summary = state["revised_analysis"]
+    )
+
+def sentence_polish_fn(state):
+    response = llm.invoke(_polish_prompt(state))
+    polishing_result = response.content.strip()
+
+    return {**state, "polishing_result": polishing_result}
 
+# ✅ async graph(ainvoke)용 노드
+async def sentence_polish_afn(state):
+    response = await llm.ainvoke(_polish_prompt(state))
     polishing_result = response.content.strip()
 
     return {**state, "polishing_result": polishing_result}
 
-sentence_polish_node = RunnableLambda(sentence_polish_fn)
\ No newline at end of file
+sentence_polish_node = RunnableLambda(sentence_polish_fn, afunc=sentence_polish_afn)
\ No newline at end of file
@@ -1,23 +1,18 @@
 import os
 
-from langchain_openai import OpenAIEmbeddings
-import numpy as np
+from streamlit_app.embedding_cache import get_cached_embeddings
+from agents.table_agents.agent_C.table_catalog import TableCatalog
 from langchain_core.runnables import RunnableLambda
 
 TABLE_DIR = "agents/table_agents/table_list"
-available_tables = os.listdir(TABLE_DIR)
 
-embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
+embedding_model = get_cached_embeddings(model="text-embedding-3-small")
 
-def cosine_similarity(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-8)
+# ✅ 파일명 + 질문 문장 임베딩은 catalog 행렬에 저장 (바뀐 파일만 다시 임베딩) → query 당 임베딩 1회 + 행렬-벡터 곱 1회
+table_catalog = TableCatalog(TABLE_DIR, embedding_model)
 
-def find_most_similar_table(query: str, filenames: list) -> str:
-    query_vec = embedding_model.embed_query(query)
-    file_vecs = [embedding_model.embed_query(fname) for fname in filenames]
-    scores = [cosine_similarity(query_vec, v) for v in file_vecs]
-    best_idx = int(np.argmax(scores))
-    return filenames[best_idx], scores[best_idx]
+def find_most_similar_table(query: str, filenames: list = None):
+    return table_catalog.best_match(query, filenames)
 
 
 def retrieval_table_node_fn(state: dict) -> dict:
@@ -30,7 +25,7 @@ def retrieval_table_node_fn(state: dict) -> dict:
     else:
         query = raw_query
 
-    best_file, score = find_most_similar_table(query, available_tables)
+    best_file, score = find_most_similar_table(query)
     file_path = os.path.join(TABLE_DIR, best_file)
 
     return {
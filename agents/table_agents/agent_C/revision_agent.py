@@ -2,13 +2,14 @@ import os
 import openai
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
+from streamlit_app.revision_loop import after_revision
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 REVISION_PROMPT = """
 당신은 통계 데이터를 바탕으로 인구집단 간 패턴과 경향성을 객관적으로 요약하는 데이터 분석 전문가입니다.
@@ -62,7 +63,7 @@ Let's think step by step
 대기환경 문제 관심 정도, 연령대 높을수록 더 높은 경향 보였음. 기저질환 있는 그룹, 대기오염 배출사업장 주변 거주 그룹, 실외 체류시간 많은 그룹도 상대적으로 높은 관심 보였음.
 """
 
-def revise_table_analysis_fn(state):
+def _revision_prompt(state) -> str:
     print("\n********** Start table analysis revision **********")
 
     if state["hallucination_reject_num"] == 0:
@@ -79,12 +80,13 @@ def revise_table_analysis_fn(state):
             selected_question=state["selected_question"],
             linearized_table=state["linearized_table"],
             numeric_anaylsis=state["numeric_anaylsis"],
-            table_analysis=state["revised_analysis"],
+            table_analysis=state.get("revised_analysis", state["table_analysis"]),
             feedback=state["feedback"],
             generated_hypotheses=state.get("generated_hypotheses", "해당 없음")
         )
+    return prompt
 
-    response = llm.invoke(prompt)
+def _revision_result(state, response):
     revised_analysis = response.content.strip()
 
     print("\n✅ 수정된 보고서:")
@@ -92,7 +94,17 @@ def revise_table_analysis_fn(state):
 
     return {
         **state,
-        "revised_analysis": revised_analysis
+        "revised_analysis": revised_analysis,
+        "revision_loop": after_revision(state, llm.model, response),
     }
 
-revise_table_analysis_node = RunnableLambda(revise_table_analysis_fn)
\ No newline at end of file
+def revise_table_analysis_fn(state):
+    response = llm.invoke(_revision_prompt(state))
+    return _revision_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def revise_table_analysis_afn(state):
+    response = await llm.ainvoke(_revision_prompt(state))
+    return _revision_result(state, response)
+
+revise_table_analysis_node = RunnableLambda(revise_table_analysis_fn, afunc=revise_table_analysis_afn)
\ No newline at end of file
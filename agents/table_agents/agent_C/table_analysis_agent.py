@@ -2,13 +2,13 @@ import os
 import openai
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from streamlit_app.llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3)
 
 TABLE_PROMPT = """
 당신은 통계 데이터를 바탕으로 인구집단 간 패턴과 경향성을 객관적으로 요약하는 데이터 분석 전문가입니다.
@@ -54,17 +54,19 @@ Let's think step by step
 대기환경 문제 관심 정도, 연령대 높을수록 두드러진 경향 보였음. 기저질환 있는 그룹, 대기오염 배출사업장 주변 거주 그룹, 실외 체류시간 많은 그룹도 상대적으로 더 높은 관심 보였음.
 """
 
-def table_anaylsis_node_fn(state):
+def _table_analysis_prompt(state) -> str:
     print("*" * 10, "Start table anaylzing", "*" * 10)
     linearized_table = state["linearized_table"]
     numeric_anaylsis = state["numeric_anaylsis"]
     selected_question = state["selected_question"]
     generated_hypotheses = state["generated_hypotheses"]
 
-    response = llm.invoke(TABLE_PROMPT.format(selected_question = selected_question,
-                                               linearized_table=linearized_table,
-                                                 numeric_anaylsis=numeric_anaylsis,
-                                                 generated_hypotheses = generated_hypotheses))
+    return TABLE_PROMPT.format(selected_question = selected_question,
+                               linearized_table=linearized_table,
+                               numeric_anaylsis=numeric_anaylsis,
+                               generated_hypotheses = generated_hypotheses)
+
+def _table_analysis_result(state, response):
     table_analysis = response.content.strip()
 
     # print("💬 Table Anaylsis 시작")
@@ -73,4 +75,13 @@ def table_anaylsis_node_fn(state):
     print("생성된 보고서 초안 :", table_analysis)
     return {**state, "table_analysis": table_analysis}
 
-table_anaylsis_node = RunnableLambda(table_anaylsis_node_fn)
\ No newline at end of file
+def table_anaylsis_node_fn(state):
+    response = llm.invoke(_table_analysis_prompt(state))
+    return _table_analysis_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def table_anaylsis_node_afn(state):
+    response = await llm.ainvoke(_table_analysis_prompt(state))
+    return _table_analysis_result(state, response)
+
+table_anaylsis_node = RunnableLambda(table_anaylsis_node_fn, afunc=table_anaylsis_node_afn)
\ No newline at end of file
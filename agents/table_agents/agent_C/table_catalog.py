@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from streamlit_app.survey_table_parser import list_survey_questions
+
+'''
+table_list 파일 라우팅용 catalog 인덱스 — 파일명 + 질문 문장을 파일당 한 번만 임베딩해 행렬 파일로 저장
+
+사용법:
+    catalog = TableCatalog(TABLE_DIR, embedding_model)
+    best_file, score = catalog.best_match(query)            # query 임베딩 1회 + 행렬-벡터 곱 1회
+    python -m agents.table_agents.agent_C.table_catalog      # catalog 미리 빌드 / 갱신
+
+- 저장 형식: CATALOG_DIR/table_catalog.npy (정규화된 float32 (파일 수, d)) + table_catalog.json (파일명, mtime, 크기, embedding 모델, d)
+- embedding 모델(backend / 차원 옵션 포함)이나 차원이 저장된 catalog 와 다르면 전체 다시 임베딩
+- (mtime, 크기)가 바뀐 / 새 파일만 다시 임베딩, 사라진 파일은 행 삭제
+- query 마다 디렉토리 mtime(파일 추가 / 삭제 / 이름 변경)만 확인하고, 파일별 stat 전체 scan 은
+  디렉토리가 바뀌었거나 CATALOG_RESCAN_SECONDS 가 지났을 때만 (제자리 덮어쓰기 감지) → 파일 수와 무관한 라우팅 latency
+- 파일 텍스트: 확장자를 뺀 파일명 + 통계표 시트의 질문 문장 (첫 번째 열만 읽음, 실패하면 파일명만)
+'''
+
+TABLE_EXTENSIONS = (".csv", ".xlsx")
+CATALOG_DIR = os.getenv("TABLE_CATALOG_DIR", "agents/table_agents/.cache/table_catalog")
+CATALOG_NAME = "table_catalog"
+# ✅ embedding 입력 토큰 한도(8191) 대비 여유 — 한글은 1자 ≈ 1~2토큰
+CATALOG_MAX_CHARS = int(os.getenv("TABLE_CATALOG_MAX_CHARS", "3000"))
+CATALOG_RESCAN_SECONDS = float(os.getenv("TABLE_CATALOG_RESCAN_SECONDS", "60"))
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-8)
+
+def _model_id(embedding_model) -> str:
+    # CachedEmbeddings 는 backend / 차원 옵션까지 포함한 cache_model 을 사용 (fake 256차원 vs OpenAI 1536차원 구분)
+    return str(getattr(embedding_model, "cache_model", None) or getattr(embedding_model, "model", None)
+               or type(embedding_model).__name__)
+
+def table_text(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    if not path.endswith(".xlsx"):
+        return name
+    try:
+        question_keys, question_texts = list_survey_questions(path)
+    except Exception as e:
+        print(f"⚠️ 질문 목록을 읽지 못해 파일명만 사용합니다: {os.path.basename(path)} ({e})")
+        return name
+    questions = [question_texts[key].replace("(전체 단위 : %)", "") for key in question_keys]
+    return "\n".join([name] + questions)[:CATALOG_MAX_CHARS]
+
+def scan_tables(table_dir: str) -> dict:
+    # 파일명 → [mtime_ns, size] (엑셀 잠금 파일 / 숨김 파일 제외)
+    files = {}
+    with os.scandir(table_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(TABLE_EXTENSIONS) and not entry.name.startswith((".", "~$")) and entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = [stat.st_mtime_ns, stat.st_size]
+    return files
+
+class TableCatalog:
+    """
+    table_dir 의 파일별 정규화 임베딩 행렬 — 바뀐 파일만 다시 임베딩해서 catalog_dir 에 저장
+    """
+
+    def __init__(self, table_dir: str, embedding_model, catalog_dir: str = CATALOG_DIR):
+        self.table_dir = table_dir
+        self.embedding_model = embedding_model
+        self.catalog_dir = catalog_dir
+        self.filenames = []
+        self.stats = {}
+        self.matrix = None
+        self.model_id = None
+        self._dir_mtime = None
+        self._scanned_at = float("-inf")
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _paths(self):
+        base = os.path.join(self.catalog_dir, CATALOG_NAME)
+        return base + ".json", base + ".npy"
+
+    def _load(self):
+        meta_path, matrix_path = self._paths
+        if not (os.path.exists(meta_path) and os.path.exists(matrix_path)):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path)
+        # 다른 디렉토리 / 다른 embedding 모델의 catalog 이거나 파일 수 / 차원이 맞지 않으면 처음부터 다시 빌드
+        if meta.get("table_dir") != os.path.abspath(self.table_dir) or len(meta["files"]) != len(matrix) \
+                or meta.get("model") != _model_id(self.embedding_model) or meta.get("dim") != matrix.shape[-1]:
+            return
+        self.filenames = [item["name"] for item in meta["files"]]
+        self.stats = {item["name"]: item["stat"] for item in meta["files"]}
+        self.matrix = matrix
+        self.model_id = meta["model"]
+
+    def _save(self):
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        meta_path, matrix_path = self._paths
+        meta = {
+            "table_dir": os.path.abspath(self.table_dir),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model": self.model_id,
+            "dim": int(self.matrix.shape[1]) if self.matrix is not None else None,
+            "files": [{"name": name, "stat": self.stats[name]} for name in self.filenames],
+        }
+        # ✅ 다른 프로세스가 읽는 중에도 깨진 파일이 보이지 않도록 임시 파일에 쓴 뒤 교체
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, self.matrix)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def refresh(self, rebuild: bool = False) -> dict:
+        """
+        디렉토리의 (mtime, 크기)와 catalog 비교 → 새 / 바뀐 파일만 임베딩, 사라진 파일 제거 → {"embedded", "removed"}
+        rebuild 이거나 embedding 모델이 바뀌었으면 모든 파일을 다시 임베딩 (차원이 다른 행렬을 합치지 않도록)
+        """
+        # scan 도중의 변경은 다음 query 에서 다시 감지되도록 scan 전에 기록
+        self._dir_mtime = os.stat(self.table_dir).st_mtime_ns
+        self._scanned_at = time.monotonic()
+        files = scan_tables(self.table_dir)
+        with self._lock:
+            model_id = _model_id(self.embedding_model)
+            if rebuild or self.model_id != model_id:
+                self.filenames, self.stats, self.matrix = [], {}, None
+                self.model_id = model_id
+            stale = sorted(name for name, stat in files.items() if self.stats.get(name) != stat)
+            removed = [name for name in self.filenames if name not in files]
+            if not stale and not removed:
+                return {"embedded": 0, "removed": 0}
+
+            keep = [i for i, name in enumerate(self.filenames) if name in files and name not in stale]
+            blocks = [self.matrix[keep]] if keep else []
+            if stale:
+                texts = [table_text(os.path.join(self.table_dir, name)) for name in stale]
+                blocks.append(_normalize(self.embedding_model.embed_documents(texts)))
+            self.filenames = [self.filenames[i] for i in keep] + stale
+            self.stats = {name: files[name] for name in self.filenames}
+            self.matrix = np.concatenate(blocks) if blocks else None
+            self._save()
+            return {"embedded": len(stale), "removed": len(removed)}
+
+    def best_match(self, query: str, filenames: list = None):
+        """
+        query 와 가장 비슷한 파일 → (파일명, cosine 점수), filenames 를 주면 그 안에서만 선택
+        (후보 파일이 하나도 없으면 FileNotFoundError)
+        """
+        if os.stat(self.table_dir).st_mtime_ns != self._dir_mtime \
+                or time.monotonic() - self._scanned_at > CATALOG_RESCAN_SECONDS:
+            self.refresh()
+        with self._lock:
+            names, matrix = self.filenames, self.matrix
+        if not names:
+            raise FileNotFoundError(f"❌ {self.table_dir} 에 통계표 파일이 없습니다.")
+        mask = None
+        if filenames is not None:
+            allowed = set(filenames)
+            mask = np.array([name in allowed for name in names], dtype=bool)
+            # ✅ 허용된 파일이 catalog 에 없으면 argmax 가 허용 범위 밖의 names[0] 을 고르므로 먼저 차단
+            if not mask.any():
+                raise FileNotFoundError(f"❌ {self.table_dir} 에 지정한 통계표 파일이 없습니다: {sorted(allowed)}")
+        query_vector = _normalize(self.embedding_model.embed_query(query))
+        if matrix.shape[1] != query_vector.shape[-1]:
+            # 같은 모델 id 인데 차원이 다름 (예: 모델 설정 변경) → 전체 다시 임베딩
+            print(f"⚠️ table catalog 차원({matrix.shape[1]})이 query 임베딩({query_vector.shape[-1]})과 달라 다시 빌드합니다.")
+            self.refresh(rebuild=True)
+            with self._lock:
+                names, matrix = self.filenames, self.matrix
+            if mask is not None:
+                mask = np.array([name in allowed for name in names], dtype=bool)
+        scores = matrix @ query_vector
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        best = int(np.argmax(scores))
+        return names[best], float(scores[best])
+
+def main(argv=None) -> int:
+    from dotenv import load_dotenv
+    from streamlit_app.embedding_cache import get_cached_embeddings
+
+    parser = argparse.ArgumentParser(description="table_list 파일 catalog 빌드 / 갱신")
+    parser.add_argument("--table-dir", default="agents/table_agents/table_list")
+    parser.add_argument("--catalog-dir", default=CATALOG_DIR)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    start = time.perf_counter()
+    catalog = TableCatalog(args.table_dir, get_cached_embeddings(model="text-embedding-3-small"), args.catalog_dir)
+    summary = catalog.refresh()
+    print(f"✅ table catalog: {len(catalog.filenames)}개 파일 {json.dumps(summary)} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
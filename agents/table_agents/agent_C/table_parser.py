@@ -1,9 +1,9 @@
-import pandas as pd
-import re
-from collections import defaultdict
-
 from langchain_core.runnables import RunnableLambda
 
+from streamlit_app.workbook_cache import get_parsed_workbook
+from streamlit_app.survey_table_parser import parse_survey_tables, PARSER_PRESETS
+from streamlit_app.table_linearizer import linearize_table
+
 '''
 사용법: 
 # 함수 사용법
@@ -19,106 +19,9 @@ Table: tables["QUESTION_KEY"]
     e.g. A2에 대한 table: tables["A2"]
 '''
 
-import pandas as pd
-from collections import defaultdict
-import re
-
 def load_survey_tables(file_path: str, sheet_name: str = "통계표"):
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-
-    pattern = r"^[A-Z]+\d*[-.]?\d*\."
-    question_indices = df[df[0].astype(str).str.match(pattern)].index.tolist()
-
-    tables = {}
-    question_texts = {}
-    question_keys = []
-    key_counts = defaultdict(int)
-
-    for i, start in enumerate(question_indices):
-        end = question_indices[i + 1] if i + 1 < len(question_indices) else len(df)
-        title = str(df.iloc[start, 0]).strip()
-
-        match = re.match(pattern, title)
-        if not match:
-            continue
-        base_key = match.group().rstrip(".")
-        key_counts[base_key] += 1
-        suffix = f"_{key_counts[base_key]}" if key_counts[base_key] > 1 else ""
-        final_key = base_key + suffix
-
-        question_texts[final_key] = title + "(전체 단위 : %)"
-        question_keys.append(final_key)
-
-        table = df.iloc[start + 1:end].reset_index(drop=True)
-
-        if len(table) >= 2:
-            # 테이블 제목 제거 및 컬럼명 설정
-            first_header = table.iloc[0].fillna('').astype(str)
-            second_header = table.iloc[1].fillna('').astype(str)
-            
-            # 테이블 제목 식별하기
-            title_text = None
-            title_col_idx = None
-            
-            # 사례수 다음에 나오는 테이블 제목 찾기
-            for idx, val in enumerate(first_header):
-                if idx > 2 and isinstance(val, str) and len(val) > 0:  # 대분류, 소분류, 사례수 이후
-                    # 이 값이 테이블 제목인지 확인 (다른 컬럼에는 없고 이 컬럼에만 있는 텍스트)
-                    if val not in ['관심없다', '보통', '관심있다', '평균']:
-                        title_text = val
-                        title_col_idx = idx
-                        break
-            
-            # 새로운 컬럼명 생성
-            new_columns = []
-            
-            for idx in range(len(first_header)):
-                if idx == 0:
-                    new_columns.append("대분류")
-                elif idx == 1:
-                    new_columns.append("소분류")
-                elif idx == 2:
-                    new_columns.append("사례수")
-                else:
-                    # 테이블 제목이 있는 경우 제거
-                    first_val = "" if (title_col_idx is not None and 
-                                      first_header.iloc[idx] == title_text) else first_header.iloc[idx]
-                    
-                    # 두 헤더 결합
-                    combined = (first_val + " " + second_header.iloc[idx]).strip()
-                    combined = combined.replace('nan', '').strip()
-                    
-                    new_columns.append(combined)
-            
-            table = table.drop([0, 1]).reset_index(drop=True)
-            table.columns = new_columns
-
-            # 불필요한 빈 컬럼/행 제거
-            table = table.dropna(axis=1, how='all')
-            table = table.dropna(axis=0, how='all')
-
-            # 대분류 채우기
-            table["대분류"] = table["대분류"].ffill()
-
-            # 마지막 요약행 (예: 합계 등) 제거
-            if len(table) > 2:
-                table = table.iloc[:-2].reset_index(drop=True)
-
-            # 숫자 컬럼 반올림
-            for col in table.columns:
-                try:
-                    numeric_col = pd.to_numeric(table[col], errors='coerce')
-                    if numeric_col.notna().any():
-                        table[col] = numeric_col.round(1)
-                except:
-                    continue
-
-            tables[final_key] = table
-
-    return tables, question_texts, question_keys
-
-def linearize_row_wise(df):
-    return " | ".join(["; ".join([f"{col}: {val}" for col, val in row.items()]) for _, row in df.iterrows()])
+    # ✅ Streamlit 앱과 같은 파서 구현 — CLI 는 마지막 2행(합계 등)을 제거하고 key 를 정규화하지 않음
+    return parse_survey_tables(file_path, sheet_name=sheet_name, **PARSER_PRESETS["cli"])
 
 def select_table(tables, question_keys, question_texts, index):
 
@@ -132,7 +35,8 @@ def select_table(tables, question_keys, question_texts, index):
     else:
         raise ValueError("입력한 값이 올바른 질문 번호 또는 키가 아닙니다.")
 
-    selected_table = tables[selected_key]
+    # ✅ workbook 캐시와 공유되는 테이블 → hypothesis 노드의 row_name 추가가 캐시에 남지 않도록 복사
+    selected_table = tables[selected_key].copy()
     selected_question = question_texts[selected_key]
     return selected_table, selected_question
 
@@ -140,7 +44,7 @@ def table_parser_node_fn(state):
     analysis_type = state.get("analysis_type", True)   # ✅ 기본값 False
     print("*" * 10, "Start table parsing", "*" * 10)
     file_path = state["file_path"]
-    table, question_texts, question_keys = load_survey_tables(file_path)
+    table, question_texts, question_keys = get_parsed_workbook(file_path, load_survey_tables)
 
     # type = True -> each qeustion 따로 하나씩
     if analysis_type:
@@ -156,7 +60,8 @@ def table_parser_node_fn(state):
     else:
         selected_table, selected_question = state["selected_table"], state["selected_question"]
 
-    linearized_table = linearize_row_wise(selected_table)
+    # ✅ 토큰 예산 안에서 형식 자동 선택 (row-wise → markdown → compact)
+    linearized_table = linearize_table(selected_table)
 
     return {
         **state,
@@ -12,6 +12,7 @@ from agents.table_agents.agent_C.hallucination_check_agent import hallucination_
 from agents.table_agents.agent_C.revision_agent import revise_table_analysis_node
 from agents.table_agents.agent_C.polish_agent import sentence_polish_node
 from agents.table_agents.agent_C.hypothesis_generation import hypothesis_generate_node
+from streamlit_app.graph_tracing import trace_node, trace_graph
 
 
 class AgentState(TypedDict):
@@ -32,6 +33,8 @@ class AgentState(TypedDict):
 
     hallucination_check: Annotated[str, "table_analysis hallucination_check"]
     hallucination_reject_num: Annotated[int, "Number of hallucination rejections"]
+    revision_loop: Annotated[dict, "revision_loop 통계 (검증 / revision 횟수, 토큰, 비용, stop_reason)"]
+    significance_check: Annotated[dict, "규칙 기반 유의성 검증 결과 (decision, feedback, issues, notes)"]
     feedback: Annotated[str, "LLM feedback"]
 
     polishing_result: Annotated[str, "Final sentence polishing step output"]
@@ -43,14 +46,14 @@ def build_table_graph() -> Runnable:
     builder = StateGraph(state_schema=AgentState)
 
     # 노드 정의
-    builder.add_node("retrieval_table_node", retrieval_table_node)
-    builder.add_node("numeric_analyzer", numeric_analysis_node)
-    builder.add_node("table_analyzer", table_anaylsis_node)
-    builder.add_node("table_parser", table_parser_node)
-    builder.add_node("hallucination_check_node", hallucination_check_node)
-    builder.add_node("revise_table_analysis", revise_table_analysis_node)
-    builder.add_node("sentence_polish_node", sentence_polish_node)
-    builder.add_node("hypothesis_generate_node", hypothesis_generate_node)
+    builder.add_node("retrieval_table_node", trace_node("table_workflow", "retrieval_table_node", retrieval_table_node))
+    builder.add_node("numeric_analyzer", trace_node("table_workflow", "numeric_analyzer", numeric_analysis_node))
+    builder.add_node("table_analyzer", trace_node("table_workflow", "table_analyzer", table_anaylsis_node))
+    builder.add_node("table_parser", trace_node("table_workflow", "table_parser", table_parser_node))
+    builder.add_node("hallucination_check_node", trace_node("table_workflow", "hallucination_check_node", hallucination_check_node))
+    builder.add_node("revise_table_analysis", trace_node("table_workflow", "revise_table_analysis", revise_table_analysis_node))
+    builder.add_node("sentence_polish_node", trace_node("table_workflow", "sentence_polish_node", sentence_polish_node))
+    builder.add_node("hypothesis_generate_node", trace_node("table_workflow", "hypothesis_generate_node", hypothesis_generate_node))
 
     # Input | Output
     # query | file_path
@@ -80,8 +83,10 @@ def build_table_graph() -> Runnable:
         if hallucination_check == "accept":
             return "sentence_polish_node"
         elif hallucination_check == "reject":
-            if hallucination_reject_num >= 3:  # revision은 최대 3번만 -> 무한 루프 방지
-                print("⚠️ Reject count exceeded. Forcing END.")
+            # reject 횟수(최대 3번) / 토큰·비용·시간 예산 / 진전 없는 revision -> 무한 루프 방지
+            stop_reason = state.get("revision_loop", {}).get("stop_reason")
+            if stop_reason:
+                print(f"⚠️ Revision loop stopped ({stop_reason}). Forcing END.")
                 return END
             else:
                 return "revise_table_analysis"
@@ -98,5 +103,13 @@ def build_table_graph() -> Runnable:
     builder.add_edge("sentence_polish_node", END)
 
     graph = builder.compile()
-    return graph
-
+    return trace_graph("table_workflow", graph, question_field="query",
+                       revision_nodes=("revise_table_analysis",))
+
+def build_async_table_graph() -> Runnable:
+    """
+    graph.ainvoke 용 — LLM 노드(table_analyzer, hallucination_check, revision, polish, hypothesis)는 llm.ainvoke,
+    LLM 을 호출하지 않는 노드(retrieval, parser, numeric)는 LangGraph 가 스레드 풀에서 실행
+        result = await build_async_table_graph().ainvoke(state)
+    """
+    return build_table_graph()
@@ -1,5 +1,7 @@
-from agents.table_agents.table_graph.table_workflow_graph import build_table_graph
+from agents.table_agents.table_graph.table_workflow_graph import build_table_graph, build_async_table_graph
 from agents.table_agents.agent_C.table_parser import load_survey_tables
+from streamlit_app.workbook_cache import get_parsed_workbook
+from streamlit_app.batch_executor import run_batch_async
 
 import pandas as pd
 from docx import Document
@@ -19,32 +21,42 @@ def get_result(query: str, batch_mode: bool = False, file_path: str = None):
     if hallucination_check == "accept":
         return result.get("table_analysis", "⚠️ table_analysis 존재하지 않습니다.")
     elif hallucination_check == "reject":
-        return result.get("revised_analysis", "⚠️ revised_analysis 존재하지 않습니다.")
+        return result.get("revised_analysis", result.get("table_analysis", "⚠️ revised_analysis 존재하지 않습니다."))
     else:
         return "⚠️ hallucination_check 값이 유효하지 않습니다."
 
 def get_all_result_to_doc(file_path, output_path="analysis_report.docx"):
-    tables, question_texts, question_keys = load_survey_tables(file_path)
-    workflow = build_table_graph()
+    # ✅ 파싱 결과는 캐시되어 각 질문의 table_parser 노드에서는 재파싱하지 않음
+    tables, question_texts, question_keys = get_parsed_workbook(file_path, load_survey_tables)
+    workflow = build_async_table_graph()
 
     results = []
 
     print(f"총 {len(question_keys)}개의 질문이 감지되었습니다. Batch 분석을 시작합니다.\n")
 
-    for idx, key in enumerate(question_keys):
-        print(f"\n===== [ {key} ] 질문 분석 시작 =====")
-
-        state = {
+    batch_states = [
+        (key, {
             "query": f"{question_texts[key]} 분석해줘",
             "file_path": file_path,
             "analysis_type": False,
-            "selected_table": tables[key],
+            "selected_table": tables[key].copy(),
             "selected_question": question_texts[key],
             "hallucination_reject_num": 0,
-        }
-
-        result = workflow.invoke(state)
-        report = result.get("polishing_result", "결과 없음")
+        })
+        for key in question_keys
+    ]
+
+    def on_done(item, n_done, n_total):
+        print(f"===== [{n_done}/{n_total}] [ {item['key']} ] {item['status']} ({item['seconds']:.1f}s) =====")
+
+    # ✅ 질문별 workflow 를 하나의 event loop 에서 동시에 실행 (BATCH_MAX_CONCURRENCY / BATCH_QUESTION_TIMEOUT_SECONDS), 결과는 question_keys 순서
+    for idx, item in enumerate(run_batch_async(workflow.ainvoke, batch_states, on_done=on_done)):
+        key = item["key"]
+        if item["status"] == "ok":
+            report = item["result"].get("polishing_result", "결과 없음")
+        else:
+            print(f"❌ [ {key} ] 분석 실패: {item['error']}")
+            report = f"⚠️ 분석 실패: {item['error']}"
 
         # ✅ 결과 리스트에 저장
         results.append({
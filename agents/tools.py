@@ -43,7 +43,7 @@ def table_analysis(query):
         output = result.get("table_analysis", "⚠️ table_analysis 존재하지 않습니다.")
         return output
     elif hallucination_check == "reject":
-        output = result.get("revised_analysis", "⚠️ revised_analysis 존재하지 않습니다.")
+        output = result.get("revised_analysis", result.get("table_analysis", "⚠️ revised_analysis 존재하지 않습니다."))
         return output
     else:
         return "⚠️ hallucination_check 값이 유효하지 않습니다."
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.abstract_agents.paper_index import (
+    INDEX_TYPES, SEARCH_PARAM_KEYS, build_faiss_index, exact_search, measure_search, normalize, search_param_grid, set_search_params,
+)
+
+'''
+논문 인덱스 종류별 recall@k / 단건 query latency 벤치마크 (정확한 flat 인덱스 대비)
+
+사용법 (repo root 에서):
+    python -m benchmarks.ann_index_benchmark                                  # 합성 임베딩 10k / 50k, 모든 인덱스 종류
+    python -m benchmarks.ann_index_benchmark --sizes 200000 --dim 1536 --types flat hnsw
+    python -m benchmarks.ann_index_benchmark --from-index agents/abstract_agents/data/faiss_index --output result.json
+
+- 합성 임베딩: 군집(cluster) 중심 + 잡음을 L2 정규화 (실제 abstract 임베딩처럼 주제별로 뭉친 분포), query 는 같은 분포의 별도 표본
+- --from-index: 저장된 인덱스 벡터를 꺼내 그중 --queries 개를 query 로 사용 (자기 자신 match 는 recall 에서 제외)
+- 인덱스 종류별로 빌드(학습 포함) 시간, 인덱스 크기, nprobe / efSearch / refine_k_factor sweep 의 recall@k 와 latency 출력
+'''
+
+DEFAULT_SIZES = [10000, 50000]
+
+def synthetic_embeddings(n: int, dim: int, n_clusters: int = 200, noise: float = 0.6, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + noise * rng.standard_normal((n, dim)).astype(np.float32)
+    return normalize(vectors)
+
+def index_vectors(path: str) -> np.ndarray:
+    index = faiss.read_index(os.path.join(path, "papers.faiss"))
+    return normalize(index.reconstruct_n(0, index.ntotal))
+
+def run_size(vectors: np.ndarray, queries: np.ndarray, index_types: list, k: int, query_ids: np.ndarray = None) -> dict:
+    exact_ids = exact_search(vectors, queries, k, query_ids)
+    results = {}
+    for index_type in index_types:
+        start = time.perf_counter()
+        index, params = build_faiss_index(vectors, index_type)
+        build_seconds = time.perf_counter() - start
+        sweep = []
+        for candidate in search_param_grid(index_type, params):
+            set_search_params(index, candidate)
+            sweep.append({**candidate, **measure_search(index, queries, exact_ids, k, query_ids)})
+        results[index_type] = {
+            "build_params": {key: value for key, value in params.items() if key not in SEARCH_PARAM_KEYS},
+            "build_seconds": round(build_seconds, 3),
+            "index_mb": round(faiss.serialize_index(index).nbytes / 2 ** 20, 2),
+            "sweep": sweep,
+        }
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 recall / latency 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--from-index", default=None, help="저장된 papers.faiss 가 있는 디렉토리")
+    parser.add_argument("--output", default=None, help="측정 결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    if args.from_index:
+        vectors = index_vectors(args.from_index)
+        rng = np.random.default_rng(0)
+        query_ids = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+        datasets = {f"index:{len(vectors)}": (vectors, vectors[query_ids], query_ids)}
+    else:
+        datasets = {}
+        for n in args.sizes:
+            data = synthetic_embeddings(n + args.queries, args.dim, seed=n)
+            datasets[f"synthetic:{n}x{args.dim}"] = (data[:n], data[n:], None)
+
+    report = {}
+    for name, (vectors, queries, query_ids) in datasets.items():
+        print(f"[{name}] k={args.k}, queries={len(queries)}")
+        report[name] = run_size(vectors, queries, args.types, args.k, query_ids)
+        for index_type, result in report[name].items():
+            print(f"  {index_type:<9} build {result['build_seconds']:.2f}s  {result['index_mb']:.1f}MB  {result['build_params']}")
+            for row in result["sweep"]:
+                label = ", ".join(f"{key}={row[key]}" for key in SEARCH_PARAM_KEYS if key in row) or "exact"
+                print(f"      {label:<32} recall@{args.k} {row['recall']:.3f}  {row['latency_ms']:.3f} ms/query")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_workbooks import make_survey_workbook
+from streamlit_app.survey_table_parser import parse_survey_tables, iter_survey_tables, PARSER_PRESETS
+
+'''
+통계표 파서 golden 출력 비교 + 파싱 시간 벤치마크
+
+사용법 (repo root 에서):
+    python -m benchmarks.parser_conformance                       # 10/100/1000 문항 비교 + 시간 측정
+    python -m benchmarks.parser_conformance --sizes 10 100        # 일부 크기만
+    python -m benchmarks.parser_conformance --update-golden       # 의도된 출력 변경 후 golden 갱신
+    python -m benchmarks.parser_conformance --output result.json  # 측정 결과 JSON 저장
+
+- 합성 통계표는 크기별로 seed=크기 로 생성 (benchmarks/synthetic_workbooks.py)
+- golden 은 preset(streamlit / cli)별 question_keys, question_texts 해시, 테이블별 해시(컬럼, dtype, 값)
+- golden 과 다르면 어떤 질문이 달라졌는지 출력하고 exit code 1
+'''
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+DEFAULT_SIZES = [10, 100, 1000]
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+def fingerprint_table(table) -> str:
+    payload = {
+        "columns": [str(col) for col in table.columns],
+        "dtypes": [str(dtype) for dtype in table.dtypes],
+        "values": [[_cell(val) for val in row] for row in table.to_numpy(dtype=object).tolist()],
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def fingerprint_parse(tables, question_texts, question_keys) -> dict:
+    texts = json.dumps(question_texts, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return {
+        "question_keys": list(question_keys),
+        "question_texts": hashlib.sha256(texts).hexdigest()[:16],
+        "tables": {key: fingerprint_table(tables[key]) for key in question_keys if key in tables},
+    }
+
+def golden_path(n_questions: int) -> str:
+    return os.path.join(GOLDEN_DIR, f"survey_parser_{n_questions}.json")
+
+def diff_fingerprints(expected: dict, actual: dict) -> list:
+    problems = []
+    if expected["question_keys"] != actual["question_keys"]:
+        problems.append("question_keys 가 다름")
+    if expected["question_texts"] != actual["question_texts"]:
+        problems.append("question_texts 가 다름")
+    for key in sorted(set(expected["tables"]) | set(actual["tables"])):
+        if expected["tables"].get(key) != actual["tables"].get(key):
+            problems.append(f"테이블 '{key}' 가 다름")
+    return problems
+
+def run_size(n_questions: int, update_golden: bool = False) -> dict:
+    data = make_survey_workbook(n_questions, seed=n_questions)
+    result = {"n_questions": n_questions, "workbook_bytes": len(data), "presets": {}}
+    fingerprints = {}
+
+    for preset, options in PARSER_PRESETS.items():
+        start = time.perf_counter()
+        parsed = parse_survey_tables(io.BytesIO(data), **options)
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed = {key: table for key, _, table in iter_survey_tables(io.BytesIO(data), **options)}
+        stream_seconds = time.perf_counter() - start
+
+        fingerprints[preset] = fingerprint_parse(*parsed)
+        stream_fingerprint = fingerprint_parse(streamed, parsed[1], parsed[2])
+        result["presets"][preset] = {
+            "parse_seconds": round(parse_seconds, 4),
+            "stream_seconds": round(stream_seconds, 4),
+            "n_tables": len(parsed[0]),
+            "stream_problems": diff_fingerprints(fingerprints[preset], stream_fingerprint),
+        }
+
+    path = golden_path(n_questions)
+    if update_golden or not os.path.exists(path):
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fingerprints, f, ensure_ascii=False, indent=1)
+        result["golden"] = "written"
+        return result
+
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    for preset, fingerprint in fingerprints.items():
+        problems = diff_fingerprints(golden[preset], fingerprint)
+        result["presets"][preset]["golden_problems"] = problems
+    result["golden"] = "checked"
+    return result
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="통계표 파서 golden 비교 및 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--output", default=None, help="측정 결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for n_questions in args.sizes:
+        result = run_size(n_questions, update_golden=args.update_golden)
+        results.append(result)
+        for preset, stats in result["presets"].items():
+            problems = stats.get("golden_problems", []) + stats["stream_problems"]
+            failed = failed or bool(problems)
+            status = "OK" if not problems else f"FAIL ({len(problems)})"
+            print(f"[{n_questions:>5} 문항] {preset:<9} parse {stats['parse_seconds']:.3f}s "
+                  f"stream {stats['stream_seconds']:.3f}s  golden={result['golden']} {status}")
+            for problem in problems[:10]:
+                print(f"    - {problem}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+
+# ✅ 벤치마크는 항상 오프라인: fake LLM backend, 디스크 LLM 캐시 / trace 파일 / 통계표 bundle 사용 안 함, rate limit 해제
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["LLM_CACHE_PATH"] = ""
+os.environ["GRAPH_TRACE_PATH"] = ""
+os.environ["SURVEY_TABLE_BUNDLE_DIR"] = ""
+os.environ.setdefault("FAKE_LLM_LATENCY_SECONDS", "0")
+os.environ["LLM_RATE_LIMITS"] = json.dumps({
+    model: {"rpm": 1e9, "tpm": 1e12} for model in ("gpt-4o", "gpt-4o-mini", "default")
+})
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# streamlit_app 모듈은 app.py 와 같은 flat import 로 로딩 (graph 노드와 같은 모듈 객체 공유)
+sys.path.insert(0, os.path.join(ROOT, "streamlit_app"))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_workbooks import make_survey_workbook, make_raw_data_workbook
+from survey_table_parser import load_survey_tables
+from table_linearizer import LINEARIZERS, choose_linearization, count_tokens, linearize_row_wise
+from raw_data_session import RawDataSession, get_raw_data_session, clear_raw_data_sessions
+from table_analysis_FT_Star_analysis import run_statistical_tests
+from table_analysis_get_anchor import get_anchor
+from table_analysis_graph import build_async_table_graph
+from batch_executor import run_batch_async
+from agents.table_agents.agent_C.numeric_anaylsis_agent import analyze_by_category
+
+'''
+통계표 분석 파이프라인 단계별 벤치마크 (합성 통계표 + Raw Data, fake LLM)
+
+사용법 (repo root 에서):
+    python -m benchmarks.pipeline_benchmark                              # small, medium 규모 측정 + baseline 비교
+    python -m benchmarks.pipeline_benchmark --scales small large --repeat 5
+    python -m benchmarks.pipeline_benchmark --output result.json         # 측정 결과 JSON 저장
+    python -m benchmarks.pipeline_benchmark --update-baseline            # 의도된 성능 변화 후 baseline 갱신
+
+측정 단계 (각 단계는 해당 규모의 모든 질문을 처리하는 시간):
+- load_survey_tables, linearize_row_wise, analyze_by_category, get_anchor
+- raw_data_session (DATA / DEMO 시트 로딩), run_statistical_tests (ft_test / chi_square), statistics_matrix
+- graph_batch: async table graph 를 LLM_BACKEND=fake 로 전체 질문에 대해 실행 (LLM 대기 시간 0 → orchestration 비용)
+
+linearize_tokens (시간 비교 대상 아님): 선형화 형식별 / auto 가 고른 형식의 전체 질문 토큰 합과 row_wise 대비 절감률
+(tiktoken encoding 을 받을 수 없는 오프라인 환경에서는 count_tokens 의 근사치)
+
+- 각 단계는 --repeat 회 실행한 중앙값(median)으로 baseline(benchmarks/baseline/pipeline.json)과 비교
+- median 이 baseline × (1 + tolerance) 보다 크고 차이가 --min-delta 초 이상이면 regression → exit code 1
+'''
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline", "pipeline.json")
+
+SCALES = {
+    "small": {"n_questions": 20, "n_respondents": 500, "n_demographics": 4},
+    "medium": {"n_questions": 100, "n_respondents": 2000, "n_demographics": 6},
+    "large": {"n_questions": 300, "n_respondents": 5000, "n_demographics": 10},
+}
+DEFAULT_SCALES = ["small", "medium"]
+
+def _silence_streamlit():
+    # streamlit run 없이 st.* 를 호출할 때의 경고가 측정 결과를 가리지 않도록
+    from streamlit import config
+    config.set_option("global.showWarningOnDirectExecution", False)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.CRITICAL)
+
+def _quiet():
+    # 노드의 print 출력 제거
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _time(fn, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with _quiet():
+            fn()
+        runs.append(time.perf_counter() - start)
+    return {"median": round(statistics.median(runs), 5), "min": round(min(runs), 5), "runs": [round(r, 5) for r in runs]}
+
+def make_inputs(params: dict, seed: int = 0) -> dict:
+    survey = make_survey_workbook(params["n_questions"], seed=seed)
+    tables, question_texts, question_keys = load_survey_tables(io.BytesIO(survey))
+    raw = make_raw_data_workbook(question_keys, params["n_respondents"], params["n_demographics"], seed=seed)
+    return {"survey": survey, "raw": raw, "tables": tables, "question_keys": question_keys}
+
+def run_scale(name: str, repeat: int, include_graph: bool = True) -> dict:
+    params = SCALES[name]
+    inputs = make_inputs(params)
+    tables, keys = inputs["tables"], inputs["question_keys"]
+    session = RawDataSession.from_file(inputs["raw"])
+    stages = {}
+
+    stages["load_survey_tables"] = _time(lambda: load_survey_tables(io.BytesIO(inputs["survey"])), repeat)
+    stages["linearize_row_wise"] = _time(lambda: [linearize_row_wise(tables[key]) for key in keys], repeat)
+    stages["analyze_by_category"] = _time(lambda: [analyze_by_category(tables[key]) for key in keys], repeat)
+    stages["get_anchor"] = _time(lambda: [get_anchor(tables[key]) for key in keys], repeat)
+    stages["raw_data_session"] = _time(lambda: RawDataSession.from_file(inputs["raw"]), repeat)
+
+    for test_type in ("ft_test", "chi_square"):
+        stages[f"run_statistical_tests[{test_type}]"] = _time(lambda: [
+            run_statistical_tests(test_type, session.raw_data, key, session.demo_mapping, session=session)
+            for key in keys
+        ], repeat)
+
+    def statistics_matrix():
+        # 세션 내부 캐시를 피하려고 매번 새 세션의 DEMO 코드화 결과만 재사용
+        fresh = RawDataSession(session.raw_data, session.demo_df)
+        fresh._demo_codes = session.demo_codes()
+        fresh.statistics_matrix({key: "ft_test" if i % 2 == 0 else "chi_square" for i, key in enumerate(keys)})
+    stages["statistics_matrix"] = _time(statistics_matrix, repeat)
+
+    if include_graph:
+        clear_raw_data_sessions()
+        graph_session = get_raw_data_session(io.BytesIO(inputs["raw"]))
+        workflow = build_async_table_graph()
+
+        def graph_batch():
+            states = [(key, {
+                "analysis_type": False,
+                "selected_key": key,
+                "uploaded_file": io.BytesIO(inputs["survey"]),
+                "raw_data_session": graph_session,
+                "test_type_override": "ft_test",
+                "lang": "한국어",
+                "hallucination_reject_num": 0,
+            }) for key in keys]
+            results = run_batch_async(workflow.ainvoke, states)
+            failed = [item["key"] for item in results if item["status"] != "ok"]
+            if failed:
+                raise RuntimeError(f"graph 실행 실패: {failed[:5]} ({results[0]['error']!r})")
+        stages["graph_batch"] = _time(graph_batch, repeat)
+
+    return {"params": params, "stages": stages, "linearize_tokens": linearize_tokens(tables, keys)}
+
+def linearize_tokens(tables: dict, keys: list) -> dict:
+    totals = {fmt: sum(count_tokens(linearizer(tables[key])) for key in keys) for fmt, linearizer in LINEARIZERS.items()}
+    with _quiet():
+        chosen = [choose_linearization(tables[key]) for key in keys]
+    totals["auto"] = sum(n_tokens for _, _, n_tokens in chosen)
+    return {
+        "tokens": totals,
+        "auto_formats": {fmt: sum(1 for chosen_fmt, _, _ in chosen if chosen_fmt == fmt) for fmt in LINEARIZERS},
+        "saving_vs_row_wise": {fmt: round(1 - n / totals["row_wise"], 3) if totals["row_wise"] else 0.0
+                               for fmt, n in totals.items() if fmt != "row_wise"},
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> list:
+    rows = []
+    for scale, result in results.items():
+        base_stages = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, stats in result["stages"].items():
+            base = base_stages.get(stage)
+            if base is None:
+                rows.append({"scale": scale, "stage": stage, "median": stats["median"], "baseline": None,
+                             "ratio": None, "status": "new"})
+                continue
+            ratio = stats["median"] / base["median"] if base["median"] else float("inf")
+            regressed = ratio > 1 + tolerance and stats["median"] - base["median"] > min_delta
+            improved = ratio < 1 - tolerance and base["median"] - stats["median"] > min_delta
+            rows.append({"scale": scale, "stage": stage, "median": stats["median"], "baseline": base["median"],
+                         "ratio": round(ratio, 3), "status": "regression" if regressed else "faster" if improved else "ok"})
+    return rows
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="통계표 분석 파이프라인 단계별 벤치마크")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-graph", action="store_true", help="graph_batch 단계 생략")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="허용 느려짐 비율 (0.3 = 30%%)")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="regression 으로 볼 최소 차이(초)")
+    parser.add_argument("--output", default=None, help="측정 결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+    _silence_streamlit()
+
+    results = {}
+    for scale in args.scales:
+        print(f"[{scale}] {SCALES[scale]}")
+        results[scale] = run_scale(scale, args.repeat, include_graph=not args.no_graph)
+        for stage, stats in results[scale]["stages"].items():
+            print(f"    {stage:<34} median {stats['median']:.4f}s  min {stats['min']:.4f}s")
+        tokens = results[scale]["linearize_tokens"]
+        print("    linearize_tokens  " + "  ".join(f"{fmt} {n}" for fmt, n in tokens["tokens"].items())
+              + f"  (auto 절감 {tokens['saving_vs_row_wise']['auto']:.1%}, auto 형식 {tokens['auto_formats']})")
+
+    report = {"environment": environment(), "repeat": args.repeat, "scales": results}
+
+    if args.update_baseline:
+        baseline = {"environment": report["environment"], "repeat": args.repeat, "scales": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = {**json.load(f), "environment": report["environment"], "repeat": args.repeat}
+        baseline["scales"].update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=1)
+        print(f"✅ baseline 갱신: {args.baseline}")
+        report["comparison"] = []
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["comparison"] = compare(results, baseline, args.tolerance, args.min_delta)
+        for row in report["comparison"]:
+            if row["status"] in ("regression", "faster"):
+                print(f"    {'❌' if row['status'] == 'regression' else '✅'} [{row['scale']}] {row['stage']}: "
+                      f"{row['baseline']:.4f}s → {row['median']:.4f}s (x{row['ratio']})")
+    else:
+        print(f"⚠️ baseline 이 없습니다 ({args.baseline}), --update-baseline 으로 생성하세요.")
+        report["comparison"] = []
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    regressions = [row for row in report["comparison"] if row["status"] == "regression"]
+    print(f"regression {len(regressions)}건" if regressions else "regression 없음")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit_app.significance_verifier import verify_significance
+
+'''
+규칙 기반 유의성 검증(significance_verifier) 판정 사례 확인
+
+사용법 (repo root 에서):
+    python -m benchmarks.significance_verifier_conformance        # 모든 사례 판정 확인
+    python -m benchmarks.significance_verifier_conformance -v     # 사례별 issues / notes 출력
+
+- 표: 성별(남성 > 여성, 유의), 연령(20대 / 30대 / 40대, 유의하지 않음)의 만족도 평균
+- 사례마다 기대 decision 과 contradicted_claim 이 붙은 (대분류, 소분류) 목록을 비교
+- 비교문("남성이 여성보다 높았다", "higher than")의 기준 그룹이 주장 대상으로 잘못 판정되지 않는지 포함
+- "크게" / "최대" 같은 정도 부사가 방향 표현으로 잘못 읽히지 않는지 포함
+- 방향 표현이 없는 주장("더 만족했음", "앞섰음")은 accept 가 아니라 uncertain (LLM 검증) 인지 포함
+- 기대와 다른 사례가 있으면 출력하고 exit code 1
+'''
+
+TABLE = pd.DataFrame({
+    "대분류": ["전체", "성별", None, "연령", None, None],
+    "소분류": ["전체", "남성", "여성", "20대", "30대", "40대"],
+    "사례수": [100, 50, 50, 30, 30, 40],
+    "만족도 평균": [3.0, 3.6, 2.4, 3.0, 3.1, 2.9],
+})
+
+FT_TEST_RESULT = pd.DataFrame({
+    "대분류": ["성별", "연령"],
+    "통계량": [5.1, 0.8],
+    "p-value": [0.001, 0.45],
+    "유의성": ["**", ""],
+})
+
+# (초안, 기대 decision, 기대 contradicted_claim 의 (대분류, 소분류) 목록)
+CASES = [
+    ("성별에 따라 남성이 여성보다 만족도가 높았다.", "accept", []),
+    ("성별로는 여성이 남성보다 낮았다.", "accept", []),
+    ("성별로는 여성보다 남성이 높았다.", "accept", []),
+    ("성별로는 여성이 남성에 비해 만족도가 낮았다.", "accept", []),
+    ("By 성별, 남성 reported higher satisfaction than 여성.", "accept", []),
+    ("By 성별, 여성 was lower compared to 남성.", "accept", []),
+    ("성별로는 남성이 높고 여성이 낮았다.", "accept", []),
+    ("성별로는 여성이 크게 낮았다.", "accept", []),
+    ("성별로는 여성이 최대 1.2점 낮았음.", "accept", []),
+    ("성별로는 남성이 여성보다 많이 높았다.", "accept", []),
+    ("성별로는 남성이 크게 낮았다.", "reject", [("성별", "남성")]),
+    ("성별로는 여성이 남성보다 높았다.", "reject", [("성별", "여성")]),
+    ("성별로는 남성이 여성에 비해 낮았다.", "reject", [("성별", "남성")]),
+    ("By 성별, 여성 was higher than 남성.", "reject", [("성별", "여성")]),
+    ("성별로는 여성이 높았다.", "reject", [("성별", "여성")]),
+    ("성별로는 남성과 여성 모두 높았다.", "uncertain", []),
+    ("성별로는 여성이 남성보다 더 만족했음.", "uncertain", []),
+    ("성별로는 여성이 남성을 앞섰음.", "uncertain", []),
+    ("성별로는 여성이 두드러졌음.", "uncertain", []),
+    ("연령별로는 큰 차이가 없었다.", "reject", []),
+]
+
+def run_cases(verbose: bool = False) -> list:
+    failures = []
+    for draft, expected_decision, expected_issues in CASES:
+        verdict = verify_significance(draft, FT_TEST_RESULT, TABLE, lang="한국어")
+        contradicted = [(issue["category"], issue["group"]) for issue in verdict["issues"]
+                        if issue["type"] == "contradicted_claim"]
+        ok = verdict["decision"] == expected_decision and contradicted == expected_issues
+        print(f"{'OK  ' if ok else 'FAIL'} {verdict['decision']:<9} {draft}")
+        if verbose or not ok:
+            print(f"    expected: {expected_decision} {expected_issues}")
+            print(f"    issues: {verdict['issues']}")
+            print(f"    notes: {verdict['notes']}")
+        if not ok:
+            failures.append(draft)
+    return failures
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="significance_verifier 판정 사례 확인")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    failures = run_cases(verbose=args.verbose)
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} 사례 통과")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import io
+
+import numpy as np
+import openpyxl
+
+'''
+벤치마크 / golden 비교용 합성 통계표(.xlsx) 생성기
+
+- seed 가 같으면 항상 같은 셀 값이 생성됨 (xlsx bytes 자체는 작성 시각 때문에 다를 수 있음)
+- 실제 통계표처럼 질문 제목 행, 2줄 헤더, 대분류/소분류 그룹 행, 합계/빈 trailer 행을 포함
+- 중복 질문 key(A3 → A3_2), '-', '.' 가 들어간 key, 테이블 제목 헤더, 빈 컬럼 등 파서 분기를 모두 포함
+
+사용법:
+    data = make_survey_workbook(100, seed=0)          # bytes
+    tables, question_texts, question_keys = load_survey_tables(io.BytesIO(data))
+
+    raw = make_raw_data_workbook(question_keys, n_respondents=2000, n_demographics=6, seed=0)
+    session = get_raw_data_session(io.BytesIO(raw))   # DATA / DEMO 시트 (통계표 질문 key 와 같은 컬럼명)
+'''
+
+SHEET_NAME = "통계표"
+
+GROUPS = [
+    ("전 체", ["전 체"]),
+    ("성별", ["남자", "여자"]),
+    ("연령", ["20대", "30대", "40대", "50대", "60세 이상"]),
+    ("지역", ["서울", "인천/경기", "대전/충청", "광주/전라", "대구/경북", "부산/울산/경남", "강원/제주"]),
+    ("소득", ["200만원 미만", "200~400만원", "400~600만원", "600만원 이상"]),
+]
+
+SCALE_HEADERS = [
+    (["관심없다", "보통", "관심있다", "평균"], ["관심없다 %", "보통 %", "관심있다 %", "(5점척도)"]),
+    (["전혀 그렇지 않다", "그렇지 않다", "보통", "그렇다", "매우 그렇다"], ["%", "%", "%", "%", "%"]),
+    (["예", "아니오"], ["%", "%"]),
+]
+
+def _question_key(q: int, rng) -> str:
+    kind = q % 7
+    if kind == 3:
+        return f"SQ{q}-{int(rng.integers(1, 4))}"
+    if kind == 5:
+        return f"B{q}.{int(rng.integers(1, 4))}"
+    if kind == 6 and q > 6:
+        # 이전 질문과 같은 key → 파서가 _2, _3 suffix 를 붙임
+        return f"A{q - 6}"
+    return f"A{q}"
+
+def iter_survey_rows(n_questions: int, seed: int = 0):
+    """
+    통계표 시트의 행(list)을 위에서부터 순서대로 생성합니다.
+    """
+    rng = np.random.default_rng(seed)
+    for q in range(1, n_questions + 1):
+        key = _question_key(q, rng)
+        first_labels, second_labels = SCALE_HEADERS[q % len(SCALE_HEADERS)]
+        n_values = len(first_labels)
+        has_title = q % 2 == 0
+        has_blank_col = q % 4 == 1
+        width = 3 + (1 if has_title else 0) + n_values + (1 if has_blank_col else 0)
+
+        yield [f"{key}. 질문 {q} 에 대한 응답 분포는?"] + [None] * (width - 1)
+
+        first = [None, None, None] + (["응답 분포"] if has_title else []) + list(first_labels)
+        second = [None, None, None] + (["사례수 대비"] if has_title else []) + list(second_labels)
+        if has_blank_col:
+            first.append(None)
+            second.append(None)
+        yield first
+        yield second
+
+        n_groups = 1 + int(rng.integers(1, len(GROUPS)))
+        for label, subs in GROUPS[:n_groups]:
+            for i, sub in enumerate(subs):
+                shares = rng.dirichlet(np.ones(n_values)) * 100
+                row = [label if i == 0 else None, sub, int(rng.integers(30, 1500))]
+                if has_title:
+                    row.append(round(float(rng.uniform(0, 100)), 2))
+                row.extend(round(float(v), 3) for v in shares)
+                if has_blank_col:
+                    row.append(None)
+                yield row
+
+        yield ["합계", None, int(rng.integers(1000, 3000))] + [None] * (width - 3)
+        yield [None] * width
+
+def make_survey_workbook(n_questions: int, seed: int = 0) -> bytes:
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(SHEET_NAME)
+    for row in iter_survey_rows(n_questions, seed):
+        sheet.append(row)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+DEMO_LABELS = [
+    ("성별", 2), ("연령", 5), ("지역", 7), ("소득", 4), ("직업", 6), ("학력", 4),
+    ("혼인여부", 3), ("가구원수", 5), ("주거형태", 4), ("거주기간", 5), ("자녀유무", 2), ("차량보유", 2),
+]
+
+def make_raw_data_workbook(question_keys, n_respondents: int, n_demographics: int, seed: int = 0) -> bytes:
+    """
+    Raw Data 엑셀 (DATA 시트: ID + 질문 key 별 1~5점 응답 + DEMO 컬럼, DEMO 시트: "DEMO1 '성별'" 형식 매핑)
+    일부 DEMO 그룹은 응답 평균이 달라 F/T-test / Chi-square 에서 유의한 결과가 나오도록 생성
+    """
+    rng = np.random.default_rng(seed)
+    demos = [DEMO_LABELS[i % len(DEMO_LABELS)] for i in range(n_demographics)]
+    demo_codes = np.column_stack([rng.integers(1, n + 1, size=n_respondents) for _, n in demos])
+
+    workbook = openpyxl.Workbook(write_only=True)
+    data_sheet = workbook.create_sheet("DATA")
+    keys = list(dict.fromkeys(question_keys))
+    data_sheet.append(["ID"] + keys + [f"DEMO{i + 1}" for i in range(n_demographics)])
+
+    responses = np.empty((n_respondents, len(keys)), dtype=object)
+    for j in range(len(keys)):
+        demo_idx = j % n_demographics
+        effect = rng.normal(0, 0.6, size=demos[demo_idx][1] + 1)
+        latent = 3 + effect[demo_codes[:, demo_idx]] + rng.normal(0, 1.0, size=n_respondents)
+        values = np.clip(np.rint(latent), 1, 5).astype(int).astype(object)
+        values[rng.random(n_respondents) < 0.02] = None   # 무응답
+        responses[:, j] = values
+
+    for i in range(n_respondents):
+        data_sheet.append([i + 1] + responses[i].tolist() + demo_codes[i].tolist())
+
+    demo_sheet = workbook.create_sheet("DEMO")
+    demo_sheet.append([None, "DEMO 정의"])
+    for i, (label, _) in enumerate(demos):
+        demo_sheet.append([f"DEMO{i + 1} '{label}'"])
+    # 실제 파일처럼 매핑 목록 뒤에 코드표가 이어짐 ('DEMO1' 행에서 매핑 추출 중단)
+    for i, (label, n) in enumerate(demos):
+        demo_sheet.append([f"DEMO{i + 1}", label])
+        for code in range(1, n + 1):
+            demo_sheet.append([code, f"{label} {code}"])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
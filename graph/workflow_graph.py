@@ -6,6 +6,7 @@ from agents.planner_agent import planner_node
 from agents.tools import tool_caller_node
 from agents.critic_agent import critic_node
 from agents.responder_agent import responder_node
+from streamlit_app.graph_tracing import trace_node, trace_graph
 
 class AgentState(TypedDict):
     query: Annotated[str, "query"]
@@ -21,13 +22,13 @@ def build_workflow_graph() -> Runnable:
     # 🧩 Node 등록
 
     ## 어떤 tool을 사용할지 planning node
-    builder.add_node("planner", planner_node)
+    builder.add_node("planner", trace_node("workflow", "planner", planner_node))
     ## plan 속에 포함 된 tool을 실행 시키는 node
-    builder.add_node("tool_caller", tool_caller_node)
+    builder.add_node("tool_caller", trace_node("workflow", "tool_caller", tool_caller_node))
     ## tool 실행 결과, plan 등을 전반적으로 평가하여 accept, reject을 평가하는 node
-    builder.add_node("critic", critic_node)
+    builder.add_node("critic", trace_node("workflow", "critic", critic_node))
     ## tool 실행 결과, user query를 활용하여 최종 final response를 생성하는 node
-    builder.add_node("responder", responder_node)
+    builder.add_node("responder", trace_node("workflow", "responder", responder_node))
 
     # ▶️ Entry Point
     builder.set_entry_point("planner")
@@ -52,4 +53,4 @@ def build_workflow_graph() -> Runnable:
     # 📍 조건부 분기 등록 (END 포함)
     builder.add_conditional_edges("critic", route_critic, ["responder", "planner"])
 
-    return builder.compile()
\ No newline at end of file
+    return trace_graph("workflow", builder.compile(), question_field="query")
\ No newline at end of file
@@ -0,0 +1,16 @@
+'''
+streamlit_app 모듈은 두 가지 방식으로 import 됩니다.
+
+- flat import: streamlit run streamlit_app/app.py (streamlit_app 디렉토리가 sys.path 에 들어감) → import llm_gateway
+- 패키지 import: agents/, benchmarks/ 를 repo root 에서 실행 → from streamlit_app import llm_gateway
+
+agents 와 함께 쓰는 공유 모듈(llm_gateway, embedding_cache, workbook_cache, ...)이 sibling 모듈을 import 할 때는
+flat import 를 먼저 시도하고 ImportError 이면 패키지 import 로 다시 시도합니다.
+    try:
+        from llm_backends import get_chat_model
+    except ImportError:
+        from streamlit_app.llm_backends import get_chat_model
+두 방식이 한 프로세스에 섞이면 같은 모듈이 두 이름으로 따로 로딩되어 모듈 수준 캐시 / 통계도 따로 관리됨
+table_linearizer / survey_table_parser / llm_backends / graph_tracing 처럼 다른 streamlit_app 모듈을 import 하지 않는 모듈은
+어느 방식으로든 그대로 import 됨
+'''
@@ -20,9 +20,13 @@ try:
     from dotenv import load_dotenv
     # Try importing your custom modules with error handling
     try:
-        from table_analysis_graph import build_table_graph
-        from stable_analysis_table_parser import load_survey_tables
+        from table_analysis_graph import build_table_graph, build_async_table_graph, TABLE_GRAPH_MODE
+        from stable_analysis_table_parser import load_survey_tables, list_survey_questions, load_survey_question
+        from workbook_cache import get_parsed_workbook, get_workbook_index, get_parsed_question
+        from raw_data_session import get_raw_data_session
         from planner_graph import planner_graph
+        from batch_executor import run_batch_async
+        from graph_tracing import trace_run, recent_traces, summarize_traces
     except ImportError as e:
         st.error(f"❌ Failed to import required modules: {e}")
         logger.error(f"Import error: {e}")
@@ -56,6 +60,25 @@ except Exception as e:
 def normalize_key(key: str) -> str:
     return key.replace("-", "_").lower()
 
+def render_trace_summary():
+    """
+    마지막 실행(단일 질문 / batch / 설문 설계)의 노드별 소요 시간, 토큰, 캐시 hit 을 sidebar 에 요약
+    """
+    run_id = st.session_state.get("trace_run_id")
+    with st.sidebar.expander(TEXT["trace_summary"]["title"][lang]):
+        traces = recent_traces(run_id=run_id) if run_id else []
+        if not traces:
+            st.caption(TEXT["trace_summary"]["empty"][lang])
+            return
+        summary = summarize_traces(traces)
+        st.caption(TEXT["trace_summary"]["totals"][lang].format(**summary))
+        st.dataframe(
+            [{key: row[key] for key in ("node", "calls", "seconds", "share", "avg_seconds",
+                                        "prompt_tokens", "completion_tokens", "cache_hits")}
+             for row in summary["nodes"]],
+            hide_index=True,
+        )
+
 def main():
     try:
         page = st.sidebar.radio("📄 Page", TEXT["page_selector"][lang])
@@ -111,7 +134,9 @@ def main():
                     st.warning("📝 조사 주제를 입력해주세요." if lang == "한국어" else "📝 Please enter a survey topic.")
                     st.stop()
 
-                with st.spinner("🔍 설문조사 설계 중..." if lang == "한국어" else "🔍 Planning your survey..."):
+                with st.spinner("🔍 설문조사 설계 중..." if lang == "한국어" else "🔍 Planning your survey..."), \
+                        trace_run() as run_id:
+                    st.session_state["trace_run_id"] = run_id
                     planner_result = planner_graph.invoke({
                         "topic": topic,
                         "objective": objective_input,
@@ -144,6 +169,8 @@ def main():
                     TEXT["run_page"]["mode_options"][lang],
                     index=0
                 )
+                # ✅ 단일 호출 실패(schema / 검증) 시에는 자동으로 기존 multi-agent 경로 실행
+                fused_mode = st.checkbox(TEXT["run_page"]["fused_mode_label"][lang], value=TABLE_GRAPH_MODE == "fused")
                 # For both languages, "Single Question" is always first
                 if lang == "한국어":
                     analysis_type_flag = analysis_type.startswith("단일")
@@ -164,8 +191,14 @@ def main():
                     # Reset file pointer for future use
                     uploaded_file.seek(0)
 
-                    tables, question_texts, question_keys = load_survey_tables(file_bytes)
-                    logger.info(f"Successfully loaded {len(tables)} tables")
+                    if analysis_type_flag:
+                        # 단일 질문 모드는 질문 목록만 먼저 읽고, 테이블은 선택된 질문 하나만 로딩
+                        question_keys, question_texts = get_workbook_index(file_bytes, list_survey_questions)
+                        tables = {}
+                        logger.info(f"Successfully indexed {len(question_keys)} questions")
+                    else:
+                        tables, question_texts, question_keys = get_parsed_workbook(file_bytes, load_survey_tables)
+                        logger.info(f"Successfully loaded {len(tables)} tables")
                 except Exception as e:
                     logger.error(f"Error loading tables: {traceback.format_exc()}")
                     st.error(f"{TEXT['run_page']['upload_table_error'][lang]} {str(e)}")
@@ -197,16 +230,12 @@ def main():
                     selected_option = st.selectbox(TEXT["run_page"]["selectbox_label"][lang], options)
                     selected_index = options.index(selected_option)
                     selected_question_key = question_keys[selected_index].strip()
-                    selected_key = normalize_key(selected_question_key)
-                    normalized_tables = {normalize_key(k): v for k, v in tables.items()}
-                    normalized_questions = {normalize_key(k): v for k, v in question_texts.items()}
-                    
-                    if selected_key not in normalized_tables:
-                        st.error(f"❌ 선택된 질문 키 '{selected_key}' 에 해당하는 테이블이 존재하지 않습니다.")
+                    # ✅ 파서는 key 를 대소문자 구분해서 찾으므로 파서가 돌려준 key 그대로 조회 (normalize_key 는 소문자화)
+                    selected_table, selected_question = get_parsed_question(file_bytes, load_survey_question, selected_question_key)
+
+                    if selected_table is None:
+                        st.error(f"❌ 선택된 질문 키 '{selected_question_key}' 에 해당하는 테이블이 존재하지 않습니다.")
                         st.stop()
-                    
-                    selected_table = normalized_tables[selected_key]
-                    selected_question = normalized_questions[selected_key]
 
                     st.success(f"{TEXT['run_page']['selected_question'][lang]} {selected_question}")
                     st.dataframe(selected_table.head(), use_container_width=True)
@@ -355,6 +384,8 @@ def main():
                     raw_data_stream = io.BytesIO(raw_data_file.read())
                     # Reset file pointer for future use
                     raw_data_file.seek(0)
+                    # DATA / DEMO 시트는 업로드당 한 번만 로딩하여 모든 질문이 공유
+                    raw_data_session = get_raw_data_session(raw_data_content)
                 except Exception as e:
                     logger.error(f"Raw data file processing error: {traceback.format_exc()}")
                     st.error(f"{TEXT['run_page']['raw_file_processing_error'][lang]} {str(e)}")
@@ -362,7 +393,7 @@ def main():
 
                 try:
                     logger.info("Building table graph workflow")
-                    workflow = build_table_graph()
+                    workflow = build_table_graph(fused=fused_mode)
                 except Exception as e:
                     logger.error(f"Error building workflow: {traceback.format_exc()}")
                     st.error(f"{TEXT['run_page']['workflow_build_error'][lang]} {str(e)}")
@@ -373,6 +404,7 @@ def main():
                     "analysis_type": analysis_type_flag,
                     "uploaded_file": io.BytesIO(uploaded_file.read()),
                     "raw_data_file": raw_data_stream,
+                    "raw_data_session": raw_data_session,
                     "lang": lang
                 }
 
@@ -383,11 +415,13 @@ def main():
                 if analysis_type_flag:
                     try:
                         logger.info("Invoking workflow")
-                        if init_state.get("analysis_type", True):
-                            with st.spinner(TEXT["run_page"]["analyzing_spinner"][lang]):
+                        with trace_run() as run_id:
+                            st.session_state["trace_run_id"] = run_id
+                            if init_state.get("analysis_type", True):
+                                with st.spinner(TEXT["run_page"]["analyzing_spinner"][lang]):
+                                    result = workflow.invoke(init_state)
+                            else:
                                 result = workflow.invoke(init_state)
-                        else:
-                            result = workflow.invoke(init_state)
                         logger.info("Workflow completed successfully")
                     except Exception as e:
                         logger.error(f"Workflow execution error: {traceback.format_exc()}")
@@ -406,6 +440,8 @@ def main():
                 # Batch analysis for all questions
                 elif not analysis_type_flag:
                     all_results = {}
+                    batch_states = []
+                    decision_states = []
                     for key in question_keys:
                         plan = st.session_state.get("user_analysis_plan", {}).get(key, {})
                         if not plan.get("do_analyze", True):
@@ -423,51 +459,76 @@ def main():
                             "selected_key": key.strip(),
                             "uploaded_file": io.BytesIO(uploaded_file_content),
                             "raw_data_file": io.BytesIO(raw_data_content),
+                            "raw_data_session": raw_data_session,
                             "lang": lang
                         }
 
-                        # If override_type is None, determine LLM-based test type and inject to init_state_loop
+                        # If override_type is None, determine LLM-based test type (아래에서 동시에 실행)
                         if override_type is None:
                             # 자동 결정 시 LLM 기반 통계 검정 방법 추천
-                            selected_table = tables.get(key)
-                            selected_key = normalize_key(key)
-
                             # test_type 추론을 위한 state 구성
-                            llm_state = {
+                            decision_states.append((key, {
                                 "analysis_type": False,
-                                "selected_key": selected_key,
-                                "selected_table": selected_table,
+                                "selected_key": normalize_key(key),
+                                "selected_table": tables.get(key),
                                 "lang": lang,
                                 "user_analysis_plan": user_analysis_plan
-                            }
-
-                            # LLM 기반 test_type 결정 함수 호출
-                            try:
-                                from table_analysis_decision_test_type import streamlit_test_type_decision_fn
-                                
-                                llm_result = streamlit_test_type_decision_fn(llm_state)
-                                inferred_test_type = llm_result.get("test_type", None)
-                                if inferred_test_type in ["ft_test", "chi_square"]:
-                                    init_state_loop["test_type_override"] = inferred_test_type
-                                    # Update user_analysis_plan to show display-friendly type
-                                    test_type_label = "F/T Test" if inferred_test_type == "ft_test" else "Chi-Square"
-                                    user_analysis_plan[key]["analysis_type"] = f"추천 ({test_type_label})"
-                                    st.session_state["user_analysis_plan"] = user_analysis_plan
-                            except Exception as e:
-                                logger.error(f"LLM test type decision error for key {key}: {traceback.format_exc()}")
-                                # continue without test_type_override if error
-
+                            }))
                         else:
                             init_state_loop["test_type_override"] = override_type
 
-                        try:
-                            result = workflow.invoke(init_state_loop)
-                            if "polishing_result" in result:
-                                all_results[key] = result["polishing_result"]
-                        except Exception as e:
-                            logger.error(f"Workflow execution error for key {key}: {traceback.format_exc()}")
-                            st.error(f"❌ {key} 분석 중 오류 발생: {str(e)}")
+                        batch_states.append((key, init_state_loop))
+
+                    # ✅ LLM 기반 test_type 결정을 질문별로 동시에 실행 (async, script 스레드의 event loop 하나에서)
+                    if decision_states:
+                        from table_analysis_decision_test_type import streamlit_test_type_decision_afn
+                        states_by_key = dict(batch_states)
+                        for item in run_batch_async(streamlit_test_type_decision_afn, decision_states):
+                            key = item["key"]
+                            if item["status"] != "ok":
+                                # continue without test_type_override if error
+                                logger.error(f"LLM test type decision error for key {key}: {item['error']!r}")
+                                continue
+                            inferred_test_type = item["result"].get("test_type", None)
+                            if inferred_test_type in ["ft_test", "chi_square"]:
+                                states_by_key[key]["test_type_override"] = inferred_test_type
+                                # Update user_analysis_plan to show display-friendly type
+                                test_type_label = "F/T Test" if inferred_test_type == "ft_test" else "Chi-Square"
+                                user_analysis_plan[key]["analysis_type"] = f"추천 ({test_type_label})"
+                        st.session_state["user_analysis_plan"] = user_analysis_plan
+
+                    # ✅ 모든 질문의 통계 검정을 업로드 단위로 한 번에 계산 → 각 질문 노드는 매트릭스 조회만 수행
+                    question_tests = {
+                        state_loop["selected_key"]: state_loop["test_type_override"]
+                        for _, state_loop in batch_states
+                        if "test_type_override" in state_loop
+                    }
+                    try:
+                        statistics_matrix = raw_data_session.statistics_matrix(question_tests)
+                    except Exception as e:
+                        logger.error(f"Statistics matrix error: {traceback.format_exc()}")
+                        statistics_matrix = None
+
+                    for _, init_state_loop in batch_states:
+                        init_state_loop["statistics_matrix"] = statistics_matrix
+
+                    # ✅ 질문별 async workflow 를 BATCH_MAX_CONCURRENCY 개씩 동시에 실행, 결과는 question_keys 순서로 수집
+                    async_workflow = build_async_table_graph(fused=fused_mode)
+                    progress = st.progress(0.0)
+                    with trace_run() as run_id:
+                        st.session_state["trace_run_id"] = run_id
+                        batch_results = run_batch_async(
+                            async_workflow.ainvoke, batch_states,
+                            on_done=lambda item, n_done, n_total: progress.progress(n_done / n_total),
+                        )
+                    for item in batch_results:
+                        key = item["key"]
+                        if item["status"] == "ok":
+                            if "polishing_result" in item["result"]:
+                                all_results[key] = item["result"]["polishing_result"]
                             continue
+                        logger.error(f"Workflow execution error for key {key}: {item['error']!r}")
+                        st.error(f"❌ {key} 분석 중 오류 발생: {str(item['error'])}")
 
                     combined_result = "\n\n---\n\n".join(f"### [{k}]\n{v}" for k, v in all_results.items())
                     st.markdown(TEXT["run_page"]["final_result_title"][lang])
@@ -478,4 +539,8 @@ def main():
         st.error(f"{TEXT['run_page']['unexpected_error'][lang]} {str(e)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # ✅ st.stop() 으로 중간에 끝난 실행도 sidebar 요약은 표시
+    try:
+        main()
+    finally:
+        render_trace_summary()
\ No newline at end of file
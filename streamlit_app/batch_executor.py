@@ -0,0 +1,76 @@
+import os
+import time
+import asyncio
+
+try:
+    from llm_scheduler import llm_priority, PRIORITY_BATCH
+except ImportError:
+    from streamlit_app.llm_scheduler import llm_priority, PRIORITY_BATCH
+
+'''
+여러 질문에 대한 async graph 실행(build_async_table_graph 의 ainvoke)을 동시에 수행하는 batch executor
+
+사용법:
+    results = run_batch_async(async_workflow.ainvoke, [(key, state), ...], max_concurrency=4, timeout=600)
+    results = await arun_batch(async_workflow.ainvoke, [(key, state), ...])     # 이미 event loop 안이면
+    for item in results:          # 입력 순서(question_keys 순서) 그대로
+        item["key"], item["status"], item["result"], item["error"], item["seconds"]
+
+- status: "ok" | "error" | "timeout"
+- timeout 은 질문별로 실행이 시작된 시점부터 계산 (대기 시간은 포함하지 않음)
+- 모든 질문이 하나의 event loop 를 공유하고, 시간 초과된 질문은 task 를 취소
+- on_done(item, n_done, n_total) 콜백은 호출한 스레드(Streamlit script thread 등)에서 실행되므로 UI 갱신에 사용 가능
+- batch 로 실행되는 질문의 LLM 호출은 llm_scheduler 에서 단일 질문(interactive) 호출보다 낮은 우선순위
+'''
+
+# ✅ 동시에 실행할 질문 수 / 질문별 시간 제한(초, 0 이면 제한 없음)
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+BATCH_QUESTION_TIMEOUT = float(os.getenv("BATCH_QUESTION_TIMEOUT_SECONDS", "600"))
+
+def _result_item(key, status, result=None, error=None, seconds=0.0) -> dict:
+    return {"key": key, "status": status, "result": result, "error": error, "seconds": round(seconds, 3)}
+
+async def arun_batch(ainvoke, items, max_concurrency: int = None, timeout: float = None, on_done=None) -> list:
+    """
+    items = [(key, state), ...] 각각에 대해 await ainvoke(state) 를 최대 max_concurrency 개씩 동시에 실행
+    """
+    items = list(items)
+    max_concurrency = max(1, max_concurrency or BATCH_MAX_CONCURRENCY)
+    timeout = BATCH_QUESTION_TIMEOUT if timeout is None else timeout
+    results = [None] * len(items)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    n_done = 0
+
+    async def invoke_batch(state):
+        with llm_priority(PRIORITY_BATCH):
+            return await ainvoke(state)
+
+    async def run(idx, key, state):
+        nonlocal n_done
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                if timeout and timeout > 0:
+                    result = await asyncio.wait_for(invoke_batch(state), timeout)
+                else:
+                    result = await invoke_batch(state)
+                item = _result_item(key, "ok", result=result, seconds=time.monotonic() - start)
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"질문 '{key}' 분석이 {timeout:g}초를 초과했습니다.")
+                item = _result_item(key, "timeout", error=error, seconds=time.monotonic() - start)
+            except Exception as e:
+                item = _result_item(key, "error", error=e, seconds=time.monotonic() - start)
+        results[idx] = item
+        n_done += 1
+        if on_done is not None:
+            on_done(item, n_done, len(items))
+
+    await asyncio.gather(*(run(idx, key, state) for idx, (key, state) in enumerate(items)))
+    return results
+
+def run_batch_async(ainvoke, items, max_concurrency: int = None, timeout: float = None, on_done=None) -> list:
+    """
+    event loop 가 없는 스레드(Streamlit script thread, CLI)에서 arun_batch 실행
+    → async 노드가 호출한 스레드에서 실행되므로 Streamlit UI 호출이 그대로 동작
+    """
+    return asyncio.run(arun_batch(ainvoke, items, max_concurrency=max_concurrency, timeout=timeout, on_done=on_done))
@@ -0,0 +1,253 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    from llm_backends import get_embeddings, llm_backend
+    from graph_tracing import record_cache_hit
+except ImportError:
+    from streamlit_app.llm_backends import get_embeddings, llm_backend
+    from streamlit_app.graph_tracing import record_cache_hit
+
+'''
+공유 embedding 캐시 — retriever, table 파일 라우팅, 논문 인덱스 빌드 / 증분 반영이 OpenAIEmbeddings 대신 사용합니다.
+
+사용법:
+    embedding_model = get_cached_embeddings(model="text-embedding-3-small")
+    embedding_model.embed_query(text)          # 같은 (model, text) 는 프로세스가 달라도 한 번만 API 호출
+    embedding_model.embed_documents(texts)     # 캐시에 없는 text 만 모아서 embed_documents 한 번으로 요청
+    embedding_cache_stats()                    # {"hits": .., "misses": .., "evictions": .., "api_calls": ..}
+
+- key: sha256(model, text) → SQLite 인덱스(model, slot, last_access) + model 별 float32 memory map 파일의 slot 행
+- model 당 EMBEDDING_CACHE_MAX_ENTRIES 개를 넘으면 가장 오래 사용하지 않은 slot 을 재사용 (LRU)
+- memmap 읽기 / 쓰기는 SQLite 쓰기 잠금(BEGIN IMMEDIATE) 안에서 실행 → 여러 프로세스가 같은 캐시를 공유해도 안전
+- OpenAI / fake embedding 은 embed_query 와 embed_documents 결과가 같으므로 query / 문서 구분 없이 공유
+- EMBEDDING_CACHE_DIR 을 빈 문자열로 두면 캐시를 거치지 않음
+- API 호출 없이 모두 캐시에서 찾은 호출은 graph_tracing 의 현재 노드 span 에 cache hit 으로 기록
+'''
+
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings"),
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+INDEX_FILE = "embedding_index.sqlite3"
+# ✅ SQLite 한 쿼리의 placeholder 수 제한 대응
+LOOKUP_CHUNK = 500
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "api_calls": 0}
+_initialized_paths = set()
+_memmaps = {}
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+def _connect(cache_dir: str) -> sqlite3.Connection:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, INDEX_FILE)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    if path not in _initialized_paths:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                dim INTEGER,
+                slot INTEGER,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_cache_slot ON embedding_cache(model, slot)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_access ON embedding_cache(model, last_access)")
+        _initialized_paths.add(path)
+    return conn
+
+@contextmanager
+def _transaction(cache_dir: str):
+    with _lock:
+        conn = _connect(cache_dir)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+def _memmap_path(cache_dir: str, model: str, dim: int) -> str:
+    return os.path.join(cache_dir, f"{re.sub(r'[^0-9A-Za-z_.-]', '_', model)}-{dim}.f32")
+
+def _memmap(cache_dir: str, model: str, dim: int, min_rows: int = 0) -> np.memmap:
+    """
+    model 별 (rows, dim) float32 memmap — sparse 파일로 미리 늘려 두고, 다른 프로세스가 늘린 경우 다시 연다
+    """
+    path = _memmap_path(cache_dir, model, dim)
+    row_bytes = dim * np.dtype(np.float32).itemsize
+    mapped = _memmaps.get(path)
+    if mapped is not None and mapped.shape[0] >= min_rows and os.path.getsize(path) == mapped.shape[0] * row_bytes:
+        return mapped
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size < min_rows * row_bytes:
+        with open(path, "ab") as f:
+            f.truncate(min_rows * row_bytes)
+        size = min_rows * row_bytes
+    mapped = np.memmap(path, dtype=np.float32, mode="r+", shape=(size // row_bytes, dim))
+    _memmaps[path] = mapped
+    return mapped
+
+def _lookup(cache_dir: str, model: str, keys: list) -> dict:
+    found = {}
+    now = time.time()
+    with _transaction(cache_dir) as conn:
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            rows = conn.execute(
+                f"SELECT key, dim, slot FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk,
+            ).fetchall()
+            if not rows:
+                continue
+            mapped = _memmap(cache_dir, model, rows[0][1], max(slot for _, _, slot in rows) + 1)
+            vectors = mapped[[slot for _, _, slot in rows]]
+            found.update(zip((key for key, _, _ in rows), vectors))
+        if found:
+            conn.executemany("UPDATE embedding_cache SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+    return found
+
+def _allocate_slots(conn, model: str, n: int, capacity: int) -> list:
+    # slot 은 지우지 않고 재사용만 하므로 0..count-1 이 항상 사용 중 → 빈 slot 이 없으면 LRU 항목의 slot 을 가져옴
+    used = conn.execute("SELECT COUNT(*) FROM embedding_cache WHERE model = ?", (model,)).fetchone()[0]
+    slots = list(range(used, min(capacity, used + n)))
+    if len(slots) < n:
+        victims = conn.execute(
+            "SELECT key, slot FROM embedding_cache WHERE model = ? ORDER BY last_access ASC LIMIT ?",
+            (model, n - len(slots)),
+        ).fetchall()
+        conn.executemany("DELETE FROM embedding_cache WHERE key = ?", [(key,) for key, _ in victims])
+        slots += [slot for _, slot in victims]
+        _stats["evictions"] += len(victims)
+    return slots
+
+def _store(cache_dir: str, model: str, vectors: dict, capacity: int):
+    now = time.time()
+    dim = len(next(iter(vectors.values())))
+    with _transaction(cache_dir) as conn:
+        # 조회 이후 다른 프로세스가 먼저 저장한 key 는 건너뜀
+        keys = list(vectors)
+        existing = set()
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            existing.update(key for (key,) in conn.execute(
+                f"SELECT key FROM embedding_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk,
+            ))
+        items = [(key, vector) for key, vector in vectors.items() if key not in existing]
+        if not items:
+            return
+        slots = _allocate_slots(conn, model, len(items), capacity)
+        items = items[:len(slots)]
+        mapped = _memmap(cache_dir, model, dim, max(capacity, max(slots) + 1))
+        for (_, vector), slot in zip(items, slots):
+            mapped[slot] = vector
+        mapped.flush()
+        conn.executemany(
+            "INSERT INTO embedding_cache VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, model, dim, slot, now, now) for (key, _), slot in zip(items, slots)],
+        )
+
+class CachedEmbeddings(Embeddings):
+    """
+    embedding model(LLM_BACKEND 에 따라 OpenAIEmbeddings / FakeEmbeddings)을 감싸 결과를 디스크에 캐싱합니다. (모델은 첫 cache miss 때 생성)
+    """
+
+    def __init__(self, model: str = "text-embedding-3-small", cache_dir: str = None,
+                 max_entries: int = None, **kwargs):
+        self.model = model
+        self.cache_dir = EMBEDDING_CACHE_DIR if cache_dir is None else cache_dir
+        self.max_entries = EMBEDDING_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._kwargs = kwargs
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_embeddings(model=self.model, **self._kwargs)
+        return self._client
+
+    @property
+    def cache_model(self) -> str:
+        # ✅ fake backend 벡터가 실제 모델 캐시에 섞이지 않도록 backend 별로 분리, 차원 축소 옵션도 key 에 포함
+        backend = llm_backend()
+        model = self.model if backend == "openai" else f"{backend}:{self.model}"
+        dimensions = self._kwargs.get("dimensions")
+        return f"{model}@{dimensions}" if dimensions else model
+
+    def _embed_missing(self, texts: list) -> list:
+        with _lock:
+            _stats["api_calls"] += 1
+        return self.client.embed_documents(texts)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not self.cache_dir or not texts:
+            return self._embed_missing(texts) if texts else []
+
+        model = self.cache_model
+        keys = [embedding_key(model, text) for text in texts]
+        try:
+            vectors = _lookup(self.cache_dir, model, list(dict.fromkeys(keys)))
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"⚠️ embedding 캐시 조회 실패: {e}")
+            vectors = {}
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        with _lock:
+            _stats["hits"] += sum(1 for key in keys if key in vectors)
+            _stats["misses"] += len(missing)
+        if not missing:
+            record_cache_hit()
+            return [vectors[key].tolist() for key in keys]
+
+        embedded = dict(zip(missing, (np.asarray(vector, dtype=np.float32) for vector in self._embed_missing(list(missing.values())))))
+        try:
+            _store(self.cache_dir, model, embedded, self.max_entries)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"⚠️ embedding 캐시 저장 실패: {e}")
+        vectors.update(embedded)
+        return [vectors[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+def get_cached_embeddings(model: str = "text-embedding-3-small", **kwargs) -> CachedEmbeddings:
+    return CachedEmbeddings(model=model, **kwargs)
+
+def embedding_cache_stats() -> dict:
+    with _lock:
+        return dict(_stats)
+
+def reset_embedding_cache_stats():
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+def clear_embedding_cache(cache_dir: str = None):
+    cache_dir = EMBEDDING_CACHE_DIR if cache_dir is None else cache_dir
+    if not cache_dir or not os.path.exists(os.path.join(cache_dir, INDEX_FILE)):
+        return
+    with _transaction(cache_dir) as conn:
+        conn.execute("DELETE FROM embedding_cache")
+        for name in os.listdir(cache_dir):
+            if name.endswith(".f32"):
+                path = os.path.join(cache_dir, name)
+                _memmaps.pop(path, None)
+                os.remove(path)
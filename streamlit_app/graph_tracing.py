@@ -0,0 +1,337 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import threading
+import contextlib
+import contextvars
+from collections import deque
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.tracers.context import register_configure_hook
+
+'''
+LangGraph 실행 추적 — 노드별 실행 시간, LLM 토큰, 캐시 hit, revision 반복 횟수를 span 으로 기록
+
+사용법:
+    builder.add_node("table_analyzer", trace_node("table_analysis", "table_analyzer", streamlit_table_anaylsis_node))
+    graph = trace_graph("table_analysis", builder.compile(), question_field="selected_key",
+                        revision_nodes=("revise_table_analysis",))
+    result = graph.invoke(state)                 # 질문 1건 = trace 1개 (graph span + 노드 span)
+
+    with trace_run() as run_id:                  # 버튼 클릭 / batch 실행 단위로 trace 를 묶음
+        run_batch_async(graph.ainvoke, batch_states)
+    summarize_traces(recent_traces(run_id=run_id))   # 노드별 합계 → Streamlit sidebar
+
+- span 은 OpenTelemetry 형식(trace_id / span_id / parent_span_id / attributes)의 JSON lines 로 GRAPH_TRACE_PATH 에 추가
+  (질문 1건이 끝날 때 해당 trace 의 span 을 한 번에 기록, GRAPH_TRACE_PATH 를 빈 문자열로 두면 파일 기록 안 함)
+- 파일이 GRAPH_TRACE_MAX_BYTES 를 넘으면 .1, .2 ... 로 rotate 하고 GRAPH_TRACE_BACKUPS 개까지만 보관
+  (질문 문장이 span attribute 에 남으므로 보관 기간을 길게 두지 않음)
+- LLM 토큰은 LangChain callback 으로 수집 → ChatOpenAI / FakeChatModel / llm_gateway 모두 동일하게 집계
+- 캐시 hit 은 llm_gateway 가 record_cache_hit() 로 알림 (API 호출이 없으므로 토큰은 0)
+- 노드는 annotate_trace(key=value) 로 graph span 에 attribute 를 추가할 수 있음 (revision_loop 통계 등)
+- graph 안에서 다른 graph 를 호출하면 (top-level tool_caller → table graph) 하위 graph span 이 노드 span 아래에 연결되고,
+  토큰 / 캐시 hit 은 부모 span 에도 합산됨
+- GRAPH_TRACING=0 이면 trace_node / trace_graph 가 원래 노드 / graph 를 그대로 반환
+'''
+
+GRAPH_TRACING = os.getenv("GRAPH_TRACING", "1") != "0"
+GRAPH_TRACE_PATH = os.getenv(
+    "GRAPH_TRACE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "graph_traces.jsonl"),
+)
+# ✅ trace 파일 크기 상한 / rotate 후 보관하는 이전 파일 수 (0 이면 넘을 때 지우고 새로 시작)
+GRAPH_TRACE_MAX_BYTES = int(os.getenv("GRAPH_TRACE_MAX_BYTES", str(20 * 1024 * 1024)))
+GRAPH_TRACE_BACKUPS = int(os.getenv("GRAPH_TRACE_BACKUPS", "2"))
+# ✅ sidebar 요약용으로 메모리에 보관하는 최근 trace 수
+GRAPH_TRACE_MAX_TRACES = int(os.getenv("GRAPH_TRACE_MAX_TRACES", "2000"))
+
+COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "cache_hits")
+
+_current_span = contextvars.ContextVar("graph_trace_span", default=None)
+_run_id = contextvars.ContextVar("graph_trace_run_id", default=None)
+
+_lock = threading.Lock()
+_traces = deque(maxlen=GRAPH_TRACE_MAX_TRACES)
+
+class _Span:
+    def __init__(self, name: str, kind: str, graph: str, parent, question=None, revision_nodes=()):
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.graph = graph
+        if question is None and parent is not None:
+            question = parent.question
+        self.question = None if question is None else str(question)[:200]
+        self.run_id = _run_id.get()
+        self.revision_nodes = tuple(revision_nodes)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.node_calls = {}
+        self.records = []          # graph span: 완료된 하위 span record (파일에 한 번에 기록)
+        self.attributes = {}
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+        self.status = "ok"
+        self.error = None
+
+    def add(self, counts: dict):
+        with _lock:
+            for key, value in counts.items():
+                self.counters[key] += value
+
+    def enclosing_graph(self):
+        span = self.parent
+        while span is not None and span.kind != "graph":
+            span = span.parent
+        return span
+
+    def record(self) -> dict:
+        attributes = {"graph": self.graph, "question": self.question, "run_id": self.run_id,
+                      **self.counters, **self.attributes}
+        if self.kind == "graph":
+            attributes["node_calls"] = dict(self.node_calls)
+            attributes["revision_iterations"] = sum(self.node_calls.get(node, 0) for node in self.revision_nodes)
+        else:
+            attributes["node"] = self.name
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name if self.kind == "graph" else f"{self.graph}.{self.name}",
+            "kind": self.kind,
+            "start_time": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": attributes,
+        }
+
+def _rotate(path: str):
+    # path → path.1 → path.2 ... (GRAPH_TRACE_BACKUPS 를 넘는 가장 오래된 파일은 덮어써서 삭제)
+    if GRAPH_TRACE_BACKUPS <= 0:
+        os.remove(path)
+        return
+    for idx in range(GRAPH_TRACE_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{idx}"):
+            os.replace(f"{path}.{idx}", f"{path}.{idx + 1}")
+    os.replace(path, f"{path}.1")
+
+def _export(records: list):
+    if not GRAPH_TRACE_PATH or not records:
+        return
+    lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(os.path.abspath(GRAPH_TRACE_PATH)), exist_ok=True)
+            if os.path.exists(GRAPH_TRACE_PATH) \
+                    and os.path.getsize(GRAPH_TRACE_PATH) + len(lines.encode("utf-8")) > GRAPH_TRACE_MAX_BYTES:
+                _rotate(GRAPH_TRACE_PATH)
+            with open(GRAPH_TRACE_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+    except OSError as e:
+        print(f"⚠️ trace 기록 실패: {e}")
+
+def _finish(span: _Span):
+    span.duration = time.perf_counter() - span._started
+    record = span.record()
+
+    if span.parent is not None:
+        span.parent.add(span.counters)
+        if span.kind == "node":
+            with _lock:
+                span.parent.node_calls[span.name] = span.parent.node_calls.get(span.name, 0) + 1
+
+    graph_span = span.enclosing_graph()
+    if graph_span is not None:
+        with _lock:
+            graph_span.records.extend(span.records)
+            graph_span.records.append(record)
+        return
+
+    # ✅ 최상위 span → trace 완료: 메모리 보관 + 파일 기록
+    records = span.records + [record]
+    if span.kind == "graph":
+        with _lock:
+            _traces.append({**record, "spans": records})
+    _export(records)
+
+@contextlib.contextmanager
+def _span(name: str, kind: str, graph: str, question=None, revision_nodes=()):
+    span = _Span(name, kind, graph, _current_span.get(), question=question, revision_nodes=revision_nodes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except asyncio.CancelledError:
+        span.status = "cancelled"
+        raise
+    except BaseException as e:
+        span.status = "error"
+        span.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(span)
+
+class _LLMUsageHandler(BaseCallbackHandler):
+    """
+    노드 안에서 실행된 모든 LLM 호출의 usage 를 현재 span 에 합산
+    """
+
+    run_inline = True
+
+    def on_llm_end(self, response, **kwargs):
+        span = _current_span.get()
+        if span is None:
+            return
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+        if not (prompt_tokens or completion_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+        span.add({"llm_calls": 1, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens})
+
+# ✅ 모든 LangChain 실행에 handler 를 자동으로 붙임 (graph 밖의 호출은 span 이 없으므로 무시)
+_handler_var = contextvars.ContextVar(
+    "graph_trace_handler", default=_LLMUsageHandler() if GRAPH_TRACING else None,
+)
+register_configure_hook(_handler_var, inheritable=True)
+
+def record_cache_hit():
+    span = _current_span.get()
+    if span is not None:
+        span.add({"cache_hits": 1})
+
+def annotate_trace(**attributes):
+    """
+    현재 질문의 graph span 에 attribute 추가 (예: revision loop 통계) — 같은 key 는 마지막 값으로 덮어씀
+    """
+    span = _current_span.get()
+    if span is not None and span.kind != "graph":
+        span = span.enclosing_graph()
+    if span is not None:
+        with _lock:
+            span.attributes.update(attributes)
+
+def trace_node(graph: str, name: str, node) -> Runnable:
+    """
+    노드 실행을 span 으로 감쌈 (sync invoke / async ainvoke 모두 지원)
+    """
+    if not GRAPH_TRACING:
+        return node
+    runnable = node if isinstance(node, Runnable) else RunnableLambda(node)
+
+    def func(state):
+        with _span(name, "node", graph):
+            return runnable.invoke(state)
+
+    async def afunc(state):
+        with _span(name, "node", graph):
+            return await runnable.ainvoke(state)
+
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+class TracedGraph(Runnable):
+    """
+    compile 된 graph 의 invoke / ainvoke 1회를 trace 1개로 기록 (get_graph 등 나머지 속성은 원래 graph 로 위임)
+    """
+
+    def __init__(self, name: str, graph: Runnable, question_field: str = None, revision_nodes=()):
+        self.name = name
+        self.graph = graph
+        self.question_field = question_field
+        self.revision_nodes = tuple(revision_nodes)
+
+    def _question(self, state):
+        if self.question_field and isinstance(state, dict):
+            return state.get(self.question_field)
+        return None
+
+    def invoke(self, input, config=None, **kwargs):
+        with _span(self.name, "graph", self.name, self._question(input), self.revision_nodes):
+            return self.graph.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        with _span(self.name, "graph", self.name, self._question(input), self.revision_nodes):
+            return await self.graph.ainvoke(input, config, **kwargs)
+
+    def get_graph(self, *args, **kwargs):
+        return self.graph.get_graph(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name == "graph":
+            raise AttributeError(name)
+        return getattr(self.graph, name)
+
+def trace_graph(name: str, graph: Runnable, question_field: str = None, revision_nodes=()) -> Runnable:
+    if not GRAPH_TRACING:
+        return graph
+    return TracedGraph(name, graph, question_field=question_field, revision_nodes=revision_nodes)
+
+@contextlib.contextmanager
+def trace_run(run_id: str = None):
+    run_id = run_id or uuid.uuid4().hex[:12]
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
+
+def recent_traces(run_id: str = None, graph: str = None, limit: int = None) -> list:
+    with _lock:
+        traces = list(_traces)
+    traces = [
+        trace for trace in traces
+        if (run_id is None or trace["attributes"]["run_id"] == run_id)
+        and (graph is None or trace["name"] == graph)
+    ]
+    return traces[-limit:] if limit else traces
+
+def summarize_traces(traces: list) -> dict:
+    """
+    trace 목록 → 전체 합계 + 노드별 (호출 수, 시간, 토큰, 캐시 hit) — 시간이 많이 걸린 노드 순
+    """
+    summary = {"traces": len(traces), "errors": 0, "seconds": 0.0, "revision_iterations": 0,
+               **dict.fromkeys(COUNTERS, 0), "loop_stops": {}}
+    nodes = {}
+    for trace in traces:
+        attributes = trace["attributes"]
+        summary["errors"] += trace["status"] != "ok"
+        summary["seconds"] += trace["duration_ms"] / 1000
+        summary["revision_iterations"] += attributes.get("revision_iterations", 0)
+        stop_reason = (attributes.get("revision_loop") or {}).get("stop_reason")
+        if stop_reason:
+            summary["loop_stops"][stop_reason] = summary["loop_stops"].get(stop_reason, 0) + 1
+        for key in COUNTERS:
+            summary[key] += attributes.get(key, 0)
+        for span in trace["spans"]:
+            if span["kind"] != "node":
+                continue
+            row = nodes.setdefault(span["name"], {"node": span["name"], "calls": 0, "seconds": 0.0,
+                                                  **dict.fromkeys(COUNTERS, 0)})
+            row["calls"] += 1
+            row["seconds"] += span["duration_ms"] / 1000
+            for key in COUNTERS:
+                row[key] += span["attributes"].get(key, 0)
+
+    node_seconds = sum(row["seconds"] for row in nodes.values()) or 1.0
+    for row in nodes.values():
+        row["avg_seconds"] = round(row["seconds"] / row["calls"], 3)
+        row["share"] = round(row["seconds"] / node_seconds, 3)
+        row["seconds"] = round(row["seconds"], 3)
+    summary["seconds"] = round(summary["seconds"], 3)
+    summary["nodes"] = sorted(nodes.values(), key=lambda row: row["seconds"], reverse=True)
+    return summary
+
+def clear_traces():
+    with _lock:
+        _traces.clear()
@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+
+import numpy as np
+from pydantic import Field
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+'''
+LLM / embedding backend 선택 (LLM_BACKEND 환경변수)
+
+사용법:
+    llm = get_chat_model(model="gpt-4o-mini", temperature=0.3)          # ChatOpenAI 또는 FakeChatModel
+    embedding_model = get_embeddings(model="text-embedding-3-small")    # OpenAIEmbeddings 또는 FakeEmbeddings
+
+    LLM_BACKEND=fake streamlit run streamlit_app/app.py                 # API key 없이 graph 전체 실행
+
+- openai (기본값): ChatOpenAI / OpenAIEmbeddings
+- fake: 네트워크 호출 없이 결정적(deterministic) 응답을 돌려주는 로컬 모델 → CI, 오프라인 벤치마크, 부하 테스트용
+    - 검증 프롬프트(accept / reject) → "accept" (FAKE_LLM_REJECT_RATE 비율만큼 프롬프트 해시 기준으로 "reject: ...")
+    - 검정 방법 프롬프트(ft_test / chi_square) → "ft_test"
+    - function calling(model_kwargs["functions"]) → 질문 키워드로 고른 도구의 function_call
+    - structured output(model_kwargs["response_format"] json_schema) → schema 를 채운 JSON (문자열은 고정 문장, enum 은 첫 값)
+    - 그 외 → 프롬프트 해시로 만든 고정 문장
+    - FAKE_LLM_SCRIPT: [{"pattern": "정규식", "response": "응답"}, ...] JSON 파일, 기본 규칙보다 먼저 적용
+    - FAKE_LLM_LATENCY_SECONDS (+ FAKE_LLM_LATENCY_PER_TOKEN_SECONDS × 출력 토큰, ± FAKE_LLM_LATENCY_JITTER) 만큼 대기
+'''
+
+LLM_BACKENDS = ("openai", "fake")
+
+def llm_backend() -> str:
+    # 벤치마크가 실행 중에 backend 를 바꿀 수 있도록 호출 시점에 읽음
+    backend = os.getenv("LLM_BACKEND", "openai").strip().lower()
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"❌ 지원하지 않는 LLM_BACKEND 입니다: {backend} (가능: {', '.join(LLM_BACKENDS)})")
+    return backend
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:12], 16)
+
+def _estimate_tokens(text: str) -> int:
+    # 한글 등 비 ASCII 문자는 1자 ≈ 1토큰, ASCII 는 4자 ≈ 1토큰 (tiktoken 없이 usage_metadata 근사)
+    n_ascii = sum(1 for ch in text if ch.isascii())
+    return (len(text) - n_ascii) + (n_ascii + 3) // 4
+
+def _messages_text(messages) -> str:
+    return "\n".join(
+        message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+        for message in messages
+    )
+
+def _load_script(path: str) -> list:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [(re.compile(rule["pattern"], re.S), rule["response"]) for rule in json.load(f)]
+
+FAKE_SENTENCES = [
+    "주요 항목에서 상대적으로 높은 경향 보였음.",
+    "연령대가 높을수록 응답 비율이 높게 나타났음.",
+    "성별에 따라 뚜렷한 차이는 확인되지 않았음.",
+    "거주 지역별로 일부 항목에서 차이를 보였음.",
+    "전반적으로 긍정적인 응답이 우세했음.",
+]
+
+# ✅ function calling 도구 선택 규칙 (질문 키워드 → tool_name)
+FAKE_TOOL_KEYWORDS = [
+    ("table_analyzer", ("조사", "통계", "표", "설문", "survey", "table")),
+    ("paper_abstract", ("논문", "연구", "paper", "abstract")),
+]
+
+def _fake_json(schema: dict, digest: int):
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        return {
+            key: _fake_json(sub_schema, digest >> (3 * i))
+            for i, (key, sub_schema) in enumerate(schema.get("properties", {}).items())
+        }
+    if kind == "array":
+        return [_fake_json(schema.get("items", {}), digest >> (4 * i)) for i in range(2)]
+    if kind in ("number", "integer"):
+        return 0
+    if kind == "boolean":
+        return True
+    return " ".join(FAKE_SENTENCES[(digest >> (4 * i)) % len(FAKE_SENTENCES)] for i in range(2))
+
+class FakeChatModel(BaseChatModel):
+    """
+    ChatOpenAI 대신 사용하는 결정적 로컬 chat model (invoke / ainvoke / function calling 지원)
+    """
+
+    model_name: str = "fake"
+    temperature: float = 0.0
+    model_kwargs: dict = Field(default_factory=dict)
+    latency_seconds: float = Field(default_factory=lambda: _env_float("FAKE_LLM_LATENCY_SECONDS", 0.0))
+    latency_per_token_seconds: float = Field(default_factory=lambda: _env_float("FAKE_LLM_LATENCY_PER_TOKEN_SECONDS", 0.0))
+    latency_jitter: float = Field(default_factory=lambda: _env_float("FAKE_LLM_LATENCY_JITTER", 0.0))
+    reject_rate: float = Field(default_factory=lambda: _env_float("FAKE_LLM_REJECT_RATE", 0.0))
+    script: list = Field(default_factory=lambda: _load_script(os.getenv("FAKE_LLM_SCRIPT", "")))
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _reply(self, prompt: str) -> AIMessage:
+        for pattern, response in self.script:
+            if pattern.search(prompt):
+                return AIMessage(content=response)
+
+        functions = self.model_kwargs.get("functions")
+        if functions:
+            lowered = prompt.lower()
+            tool_name = os.getenv("FAKE_LLM_TOOL") or next(
+                (tool for tool, keywords in FAKE_TOOL_KEYWORDS if any(k in lowered for k in keywords)),
+                "web_search",
+            )
+            arguments = json.dumps({"tool_name": tool_name, "reason": "fake backend 규칙 기반 선택"}, ensure_ascii=False)
+            return AIMessage(content="", additional_kwargs={
+                "function_call": {"name": functions[0]["name"], "arguments": arguments},
+            })
+
+        response_format = self.model_kwargs.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            return AIMessage(content=json.dumps(_fake_json(schema, _digest(prompt)), ensure_ascii=False))
+
+        if "ft_test" in prompt and "chi_square" in prompt:
+            return AIMessage(content="ft_test")
+        if "accept" in prompt and "reject" in prompt:
+            if (_digest(prompt) % 1000) / 1000 < self.reject_rate:
+                return AIMessage(content="reject: 유의미한 대분류의 경향이 요약에서 누락되었음")
+            return AIMessage(content="accept")
+
+        digest = _digest(prompt)
+        sentences = [FAKE_SENTENCES[(digest >> (4 * i)) % len(FAKE_SENTENCES)] for i in range(3)]
+        return AIMessage(content=" ".join(sentences))
+
+    def _respond(self, messages: list) -> tuple:
+        prompt = _messages_text(messages)
+        message = self._reply(prompt)
+        input_tokens = _estimate_tokens(prompt)
+        output_tokens = _estimate_tokens(message.content) or 1
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        message.response_metadata = {"model_name": self.model_name, "llm_backend": "fake"}
+        latency = self.latency_seconds + self.latency_per_token_seconds * output_tokens
+        if self.latency_jitter:
+            latency += random.uniform(-self.latency_jitter, self.latency_jitter)
+        return message, max(0.0, latency)
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._respond(messages)
+        if latency:
+            time.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, latency = self._respond(messages)
+        if latency:
+            await asyncio.sleep(latency)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+class FakeEmbeddings(Embeddings):
+    """
+    단어 / 글자 bigram 을 hashing 한 정규화 벡터 — 겹치는 단어가 많을수록 cosine 유사도가 높음
+    """
+
+    def __init__(self, size: int = None):
+        self.size = size or int(os.getenv("FAKE_EMBEDDING_DIM", "256"))
+
+    def _embed(self, text: str) -> list:
+        vector = np.zeros(self.size, dtype=np.float32)
+        words = re.findall(r"\w+", text.lower())
+        features = words + [word[i:i + 2] for word in words for i in range(len(word) - 1)]
+        for feature in features:
+            digest = _digest(feature)
+            vector[digest % self.size] += 1.0 if (digest >> 20) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[_digest(text) % self.size] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+def get_chat_model(model: str, temperature: float = 0.0, **kwargs):
+    if llm_backend() == "fake":
+        return FakeChatModel(model_name=model, temperature=temperature, model_kwargs=kwargs.get("model_kwargs", {}))
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature, **kwargs)
+
+def get_embeddings(model: str = "text-embedding-3-small", **kwargs):
+    if llm_backend() == "fake":
+        return FakeEmbeddings()
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=model, **kwargs)
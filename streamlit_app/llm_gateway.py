@@ -0,0 +1,267 @@
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import threading
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+try:
+    from llm_scheduler import schedule_call, aschedule_call
+    from llm_backends import get_chat_model, llm_backend
+    from graph_tracing import record_cache_hit
+except ImportError:
+    from streamlit_app.llm_scheduler import schedule_call, aschedule_call
+    from streamlit_app.llm_backends import get_chat_model, llm_backend
+    from streamlit_app.graph_tracing import record_cache_hit
+
+'''
+공유 LLM gateway — table_analysis_* / planner_* (streamlit), agents/ 의 planner · critic · responder · abstract agent 가
+ChatOpenAI 대신 사용합니다.
+
+사용법:
+    llm = get_llm(model="gpt-4o-mini", temperature=0.3, openai_api_key=api_key)
+    response = llm.invoke(prompt)          # 기존 ChatOpenAI.invoke 와 같이 .content 를 가진 message 반환
+    response = await llm.ainvoke(prompt)   # async 노드용 (캐시 조회/저장은 worker 스레드에서 실행)
+    llm_cache_stats()                      # {"hits": .., "misses": .., "bypass": .., ...}
+
+- 응답은 (model, temperature, top_p, 생성 옵션, prompt) 해시를 key 로 SQLite 파일에 저장 → 같은 통계표를 다시 돌리면 API 호출 없음
+  생성 옵션 = get_llm 의 kwargs(model_kwargs 등, api key / 연결 설정 제외) + invoke kwargs(config 제외)
+- LLM_CACHE_TTL_SECONDS 가 지나면 만료, LLM_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+- temperature 가 LLM_CACHE_MAX_TEMPERATURE(기본 0.3) 보다 높거나 invoke(..., use_cache=False) 이면
+  캐시를 거치지 않음 — 샘플링 결과가 캐시에 고정되지 않도록
+  기본값은 통계표 파이프라인의 분석 / 가설 / polish / fused(0.3), 검정 방법 결정 / hallucination check(0) 를 캐싱
+  → 검증을 통과한 통계표는 다시 돌려도 API 호출 없음. revision(0.7), critic(0.5) 처럼 다양한 출력이 필요한 agent 는
+  매번 새로 샘플링하므로, reject 된 초안의 revision 은 재실행 때도 API 를 호출
+- LLM_CACHE_PATH 를 빈 문자열로 두면 디스크 캐시 사용 안 함
+- cache hit 은 graph_tracing 의 현재 노드 span 에 기록
+- 실제 API 호출(cache miss / bypass)은 llm_scheduler 를 거쳐 RPM/TPM 한도, 재시도, 우선순위가 적용됨
+  (재시도는 scheduler 가 담당하므로 ChatOpenAI 자체 재시도는 max_retries=0 으로 끔)
+- function calling 응답의 additional_kwargs(function_call 등)도 함께 캐싱
+'''
+
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite3"),
+)
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+# ✅ 이 값보다 높은 temperature 는 매번 새로 샘플링 (기본 0.3 → 파이프라인의 temperature 0 / 0.3 agent 캐싱)
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+# ✅ 응답 내용과 무관한 client 설정 → cache key 에서 제외
+NON_GENERATION_KWARGS = {"openai_api_key", "api_key", "base_url", "openai_api_base", "organization",
+                         "timeout", "request_timeout", "max_retries", "config", "callbacks"}
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypass": 0, "evictions": 0}
+_initialized_paths = set()
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _initialized_paths:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                temperature REAL,
+                content TEXT,
+                metadata TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        conn.commit()
+        _initialized_paths.add(path)
+    return conn
+
+def _prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, BaseMessage):
+        prompt = [prompt]
+    if isinstance(prompt, (list, tuple)):
+        return json.dumps([
+            {"type": message.type, "content": message.content} if isinstance(message, BaseMessage) else message
+            for message in prompt
+        ], ensure_ascii=False, default=str)
+    return str(prompt)
+
+def _generation_options(kwargs: dict) -> dict:
+    return {name: value for name, value in kwargs.items() if name not in NON_GENERATION_KWARGS}
+
+def cache_key(model: str, temperature: float, prompt, top_p: float = None, options: dict = None) -> str:
+    prompt_hash = hashlib.sha256(_prompt_text(prompt).encode("utf-8")).hexdigest()
+    parts = [model, temperature, top_p, prompt_hash]
+    if options:
+        # 옵션이 없는 호출은 기존 key 그대로 유지
+        parts.append(json.dumps(options, sort_keys=True, ensure_ascii=False, default=str))
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+def _lookup(path: str, key: str):
+    now = time.time()
+    with _lock:
+        conn = _connect(path)
+        try:
+            row = conn.execute("SELECT content, metadata, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            content, metadata, created_at = row
+            if LLM_CACHE_TTL_SECONDS > 0 and now - created_at > LLM_CACHE_TTL_SECONDS:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                _stats["evictions"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return content, json.loads(metadata or "{}")
+        finally:
+            conn.close()
+
+def _store(path: str, key: str, model: str, temperature: float, content: str, metadata: dict):
+    now = time.time()
+    with _lock:
+        conn = _connect(path)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, content, json.dumps(metadata, ensure_ascii=False, default=str), now, now),
+            )
+            # ✅ LRU: 최대 개수를 넘으면 가장 오래 전에 사용한 항목부터 삭제
+            count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > LLM_CACHE_MAX_ENTRIES:
+                overflow = count - LLM_CACHE_MAX_ENTRIES
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                _stats["evictions"] += overflow
+            conn.commit()
+        finally:
+            conn.close()
+
+class CachedChatModel:
+    """
+    chat model(LLM_BACKEND 에 따라 ChatOpenAI / FakeChatModel)을 감싸 invoke 결과를 디스크에 캐싱합니다. (모델은 첫 cache miss 때 생성)
+    """
+
+    def __init__(self, model: str, temperature: float = 0.0, cache_path: str = None, **kwargs):
+        self.model = model
+        self.temperature = temperature
+        self.top_p = kwargs.get("top_p")
+        self.options = _generation_options({name: value for name, value in kwargs.items() if name != "top_p"})
+        self.cache_path = LLM_CACHE_PATH if cache_path is None else cache_path
+        self._kwargs = kwargs
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # ✅ ChatOpenAI 기본 재시도(2회)가 scheduler 의 tenacity 재시도와 겹치지 않도록
+            self._client = get_chat_model(model=self.model, temperature=self.temperature,
+                                          **{"max_retries": 0, **self._kwargs})
+        return self._client
+
+    @property
+    def cache_model(self) -> str:
+        # ✅ fake backend 응답이 실제 모델 캐시에 섞이지 않도록 backend 별로 key 분리
+        backend = llm_backend()
+        return self.model if backend == "openai" else f"{backend}:{self.model}"
+
+    def cacheable(self) -> bool:
+        return bool(self.cache_path) and self.temperature <= LLM_CACHE_MAX_TEMPERATURE
+
+    def _cache_key(self, prompt, kwargs: dict) -> str:
+        return cache_key(self.cache_model, self.temperature, prompt, self.top_p,
+                         {**self.options, **_generation_options(kwargs)})
+
+    def _cached_response(self, key: str):
+        try:
+            cached = _lookup(self.cache_path, key)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ LLM 캐시 조회 실패: {e}")
+            cached = None
+
+        with _lock:
+            _stats["hits" if cached is not None else "misses"] += 1
+        if cached is None:
+            return None
+        record_cache_hit()
+        content, metadata = cached
+        additional_kwargs = metadata.pop("additional_kwargs", {})
+        return AIMessage(content=content, additional_kwargs=additional_kwargs,
+                         response_metadata={**metadata, "llm_cache": "hit"})
+
+    def _store_response(self, key: str, response):
+        try:
+            metadata = dict(getattr(response, "response_metadata", {}) or {})
+            if getattr(response, "additional_kwargs", None):
+                metadata["additional_kwargs"] = response.additional_kwargs
+            _store(self.cache_path, key, self.cache_model, self.temperature, response.content, metadata)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ LLM 캐시 저장 실패: {e}")
+
+    def _call(self, prompt, **kwargs):
+        return schedule_call(self.model, _prompt_text(prompt), lambda: self.client.invoke(prompt, **kwargs))
+
+    async def _acall(self, prompt, **kwargs):
+        return await aschedule_call(self.model, _prompt_text(prompt), lambda: self.client.ainvoke(prompt, **kwargs))
+
+    def invoke(self, prompt, use_cache: bool = True, **kwargs):
+        if not (use_cache and self.cacheable()):
+            with _lock:
+                _stats["bypass"] += 1
+            return self._call(prompt, **kwargs)
+
+        key = self._cache_key(prompt, kwargs)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        response = self._call(prompt, **kwargs)
+        self._store_response(key, response)
+        return response
+
+    async def ainvoke(self, prompt, use_cache: bool = True, **kwargs):
+        if not (use_cache and self.cacheable()):
+            with _lock:
+                _stats["bypass"] += 1
+            return await self._acall(prompt, **kwargs)
+
+        # ✅ SQLite 조회/저장은 blocking → event loop 를 막지 않도록 worker 스레드에서 실행
+        key = self._cache_key(prompt, kwargs)
+        cached = await asyncio.to_thread(self._cached_response, key)
+        if cached is not None:
+            return cached
+
+        response = await self._acall(prompt, **kwargs)
+        await asyncio.to_thread(self._store_response, key, response)
+        return response
+
+def get_llm(model: str, temperature: float = 0.0, **kwargs) -> CachedChatModel:
+    return CachedChatModel(model=model, temperature=temperature, **kwargs)
+
+def llm_cache_stats() -> dict:
+    with _lock:
+        return dict(_stats)
+
+def reset_llm_cache_stats():
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+def clear_llm_cache(cache_path: str = None):
+    path = LLM_CACHE_PATH if cache_path is None else cache_path
+    if not path or not os.path.exists(path):
+        return
+    with _lock:
+        conn = _connect(path)
+        try:
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextlib
+import contextvars
+
+from tenacity import (
+    Retrying, AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential,
+)
+
+try:
+    from table_linearizer import count_tokens
+except ImportError:
+    from streamlit_app.table_linearizer import count_tokens
+
+'''
+모든 LLM 호출이 거쳐가는 rate-limit scheduler (llm_gateway.CachedChatModel 이 cache miss 때 사용)
+
+사용법:
+    response = schedule_call(model, prompt_text, lambda: client.invoke(prompt))
+    response = await aschedule_call(model, prompt_text, lambda: client.ainvoke(prompt))
+    with llm_priority(PRIORITY_BATCH): ...     # batch_executor 가 질문별 실행을 감쌈
+    llm_scheduler_stats()                       # {"requests": .., "waited_seconds": .., "retries": .., "rate_limited": ..}
+
+- 모델별 requests-per-minute / tokens-per-minute token bucket (토큰 수는 tiktoken 으로 prompt 를 추정 + 예상 출력 토큰)
+- 응답의 usage_metadata 로 실제 사용 토큰을 받아 TPM bucket 을 보정
+- 같은 모델을 기다리는 호출은 (우선순위, 도착 순서)로 줄을 서고, 단일 질문(interactive) 호출이 batch 호출보다 먼저 처리됨
+- 429 / 5xx / timeout / 연결 오류는 tenacity 로 exponential backoff + jitter 재시도 (재시도마다 bucket 을 다시 통과)
+- 한도는 LLM_RATE_LIMITS 환경변수(JSON)로 변경: '{"gpt-4o": {"rpm": 500, "tpm": 30000}}'
+'''
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+# ✅ 모델별 기본 한도 (OpenAI tier-1 기준), 목록에 없는 모델은 "default"
+DEFAULT_RATE_LIMITS = {
+    "gpt-4o": {"rpm": 500, "tpm": 30000},
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+    "default": {"rpm": 500, "tpm": 30000},
+}
+RATE_LIMITS = {**DEFAULT_RATE_LIMITS, **json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))}
+
+# ✅ TPM 추정 시 prompt 토큰에 더하는 예상 출력 토큰 수 / 재시도 횟수 / backoff 최대 대기(초)
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "512"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "6"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+_priority = contextvars.ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "waited_seconds": 0.0, "retries": 0, "rate_limited": 0}
+
+@contextlib.contextmanager
+def llm_priority(priority: int):
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class TokenBucket:
+    """
+    1분에 capacity 만큼 채워지는 bucket — amount 만큼 꺼낼 수 있을 때까지의 대기 시간을 계산
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_seconds(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # 한도보다 큰 요청은 bucket 이 가득 찼을 때 통과 (영원히 기다리지 않도록)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+class _ModelQueue:
+    def __init__(self, limits: dict):
+        self.requests = TokenBucket(limits["rpm"])
+        self.tokens = TokenBucket(limits["tpm"])
+        self.waiting = []    # heap of (priority, seq)
+
+class RateLimitScheduler:
+    def __init__(self, rate_limits: dict = None):
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._queues = {}
+        self._seq = itertools.count()
+
+    def _queue(self, model: str) -> _ModelQueue:
+        if model not in self._queues:
+            limits = self.rate_limits.get(model, self.rate_limits["default"])
+            self._queues[model] = _ModelQueue(limits)
+        return self._queues[model]
+
+    def _enter(self, model: str, priority: int):
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._queue(model).waiting, ticket)
+        return ticket
+
+    def _try_acquire(self, model: str, ticket, tokens: int):
+        """
+        줄의 맨 앞이고 두 bucket 모두 여유가 있으면 꺼내고 0, 아니면 다시 확인할 때까지의 대기 시간(초)
+        """
+        queue = self._queue(model)
+        if queue.waiting[0] != ticket:
+            return 0.05
+        now = time.monotonic()
+        wait = max(queue.requests.wait_seconds(1, now), queue.tokens.wait_seconds(tokens, now))
+        if wait > 0:
+            return wait
+        queue.requests.take(1)
+        queue.tokens.take(min(tokens, queue.tokens.capacity))
+        heapq.heappop(queue.waiting)
+        self._cond.notify_all()
+        return 0.0
+
+    def acquire(self, model: str, tokens: int, priority: int = None):
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+        ticket = self._enter(model, priority)
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_acquire(model, ticket, tokens)
+                    if wait == 0:
+                        break
+                    self._cond.wait(timeout=wait)
+        except BaseException:
+            self._leave(model, ticket)
+            raise
+        self._record_wait(time.monotonic() - start)
+
+    async def aacquire(self, model: str, tokens: int, priority: int = None):
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+        ticket = self._enter(model, priority)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_acquire(model, ticket, tokens)
+                if wait == 0:
+                    break
+                await asyncio.sleep(min(wait, 0.25))
+        except BaseException:
+            # 취소(timeout) 된 질문은 줄에서 빠져야 뒤의 호출이 막히지 않음
+            self._leave(model, ticket)
+            raise
+        self._record_wait(time.monotonic() - start)
+
+    def _leave(self, model: str, ticket):
+        with self._cond:
+            queue = self._queue(model)
+            if ticket in queue.waiting:
+                queue.waiting.remove(ticket)
+                heapq.heapify(queue.waiting)
+                self._cond.notify_all()
+
+    def settle(self, model: str, estimated_tokens: int, response):
+        """
+        실제 사용 토큰(usage_metadata)과 추정치의 차이만큼 TPM bucket 보정
+        """
+        usage = getattr(response, "usage_metadata", None) or {}
+        actual = usage.get("total_tokens")
+        if not actual:
+            return
+        with self._cond:
+            self._queue(model).tokens.take(actual - estimated_tokens)
+            self._cond.notify_all()
+
+    def _record_wait(self, seconds: float):
+        with _stats_lock:
+            _stats["requests"] += 1
+            _stats["waited_seconds"] += seconds
+
+_scheduler = RateLimitScheduler()
+
+def get_scheduler() -> RateLimitScheduler:
+    return _scheduler
+
+def _status_code(error):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+def is_retryable(error: BaseException) -> bool:
+    try:
+        import openai
+        if isinstance(error, (openai.RateLimitError, openai.APITimeoutError,
+                              openai.APIConnectionError, openai.InternalServerError)):
+            return True
+    except ImportError:
+        pass
+    status = _status_code(error)
+    return status == 429 or (status is not None and status >= 500)
+
+def _before_retry(retry_state):
+    error = retry_state.outcome.exception()
+    with _stats_lock:
+        _stats["retries"] += 1
+        if _status_code(error) == 429 or type(error).__name__ == "RateLimitError":
+            _stats["rate_limited"] += 1
+    print(f"⚠️ LLM 호출 재시도 ({retry_state.attempt_number}/{LLM_MAX_ATTEMPTS}): {type(error).__name__}")
+
+def _retry_kwargs() -> dict:
+    return {
+        "retry": retry_if_exception(is_retryable),
+        "wait": wait_random_exponential(multiplier=1, max=LLM_BACKOFF_MAX_SECONDS),
+        "stop": stop_after_attempt(LLM_MAX_ATTEMPTS),
+        "before_sleep": _before_retry,
+        "reraise": True,
+    }
+
+def estimate_tokens(model: str, prompt_text: str) -> int:
+    return count_tokens(prompt_text, model) + LLM_EXPECTED_COMPLETION_TOKENS
+
+def schedule_call(model: str, prompt_text: str, call):
+    """
+    call() 을 rate limit 안에서 실행하고, 재시도 가능한 오류는 backoff 후 다시 시도
+    """
+    tokens = estimate_tokens(model, prompt_text)
+    for attempt in Retrying(**_retry_kwargs()):
+        with attempt:
+            _scheduler.acquire(model, tokens)
+            response = call()
+    _scheduler.settle(model, tokens, response)
+    return response
+
+async def aschedule_call(model: str, prompt_text: str, acall):
+    tokens = estimate_tokens(model, prompt_text)
+    async for attempt in AsyncRetrying(**_retry_kwargs()):
+        with attempt:
+            await _scheduler.aacquire(model, tokens)
+            response = await acall()
+    _scheduler.settle(model, tokens, response)
+    return response
+
+def llm_scheduler_stats() -> dict:
+    with _stats_lock:
+        return {**_stats, "waited_seconds": round(_stats["waited_seconds"], 3)}
+
+def reset_llm_scheduler_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0 if key != "waited_seconds" else 0.0
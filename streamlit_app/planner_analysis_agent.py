@@ -1,11 +1,11 @@
 from langchain_core.runnables import RunnableLambda
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = ChatOpenAI(temperature=0.3, model="gpt-4o-mini", openai_api_key=os.getenv("OPENAI_API_KEY"))
+llm = get_llm(temperature=0.3, model="gpt-4o-mini", openai_api_key=os.getenv("OPENAI_API_KEY"))
 
 ANALYSIS_SUGGESTION_PROMPT = {
     "한국어": """
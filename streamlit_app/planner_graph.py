@@ -7,6 +7,7 @@ from planner_audience_agent import audience_agent_node
 from planner_structure_agent import structure_agent_node
 from planner_question_agent import question_agent_node
 from planner_analysis_agent import analysis_agent_node
+from graph_tracing import trace_node, trace_graph
 
 class PlannerState(TypedDict):
     topic: Annotated[str, "사용자가 입력한 조사 주제"]
@@ -21,11 +22,11 @@ class PlannerState(TypedDict):
 def build_planner_graph() -> Runnable:
     builder = StateGraph(state_schema=PlannerState)
 
-    builder.add_node("intro_agent", intro_agent_node)
-    builder.add_node("audience_agent", audience_agent_node)
-    builder.add_node("structure_agent", structure_agent_node)
-    builder.add_node("question_agent", question_agent_node)
-    builder.add_node("analysis_agent", analysis_agent_node)
+    builder.add_node("intro_agent", trace_node("planner", "intro_agent", intro_agent_node))
+    builder.add_node("audience_agent", trace_node("planner", "audience_agent", audience_agent_node))
+    builder.add_node("structure_agent", trace_node("planner", "structure_agent", structure_agent_node))
+    builder.add_node("question_agent", trace_node("planner", "question_agent", question_agent_node))
+    builder.add_node("analysis_agent", trace_node("planner", "analysis_agent", analysis_agent_node))
 
     builder.set_entry_point("intro_agent")
     builder.add_edge("intro_agent", "audience_agent")
@@ -34,6 +35,6 @@ def build_planner_graph() -> Runnable:
     builder.add_edge("question_agent", "analysis_agent")
     builder.add_edge("analysis_agent", END)
 
-    return builder.compile()
+    return trace_graph("planner", builder.compile(), question_field="topic")
 
 planner_graph = build_planner_graph()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import io
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from workbook_cache import read_workbook_bytes
+from table_analysis_stat_engine import factorize_demo_columns, compute_statistics_matrix
+
+'''
+Raw Data 엑셀 파일(DATA / DEMO 시트)을 한 번만 읽어 batch 내 모든 질문이 공유하는 세션 객체입니다.
+
+사용법:
+    session = get_raw_data_session(raw_data_file)
+    session.raw_data                      # 컬럼명이 정규화된 DATA 시트 DataFrame
+    session.demo_mapping                  # {'DEMO1': '성별', ...}
+    session.column_values("A1")           # A1 문항 응답값 (float64, zero-copy view)
+'''
+
+# ✅ 프로세스당 최대 보관 세션 수 (LRU)
+MAX_CACHED_SESSIONS = 4
+
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+# ✅ 컬럼명 정규화: '-' → '_', 그리고 양쪽 공백 제거
+def normalize_column_name(col) -> str:
+    return str(col).replace("-", "_").strip()
+
+# ✅ DEMO 매핑 추출 함수
+def extract_demo_mapping_from_dataframe(df, column="Unnamed: 0"):
+    col = df[column].dropna().astype(str).reset_index(drop=True)
+    cut_idx = None
+    for i, val in enumerate(col):
+        if val.strip() == 'DEMO1':
+            cut_idx = i
+            break
+    sliced = col[:cut_idx] if cut_idx is not None else col
+
+    demo_dict = {}
+    for entry in sliced:
+        entry = str(entry).strip()
+        match = re.match(r"(DEMO\d+)[\s'\"]+(.+?)['\"\s\.]*$", entry)
+        if match:
+            key = match.group(1)
+            label = match.group(2).strip()
+            demo_dict[key] = label
+
+    return demo_dict
+
+class RawDataSession:
+    """
+    DATA 시트, DEMO 시트, DEMO 매핑과 수치형 응답 행렬을 보관합니다.
+    모든 속성은 여러 질문이 공유하므로 읽기 전용으로 다룰 것
+    """
+
+    def __init__(self, raw_data: pd.DataFrame, demo_df: pd.DataFrame, digest: str = ""):
+        raw_data = raw_data.copy(deep=False)
+        raw_data.columns = [normalize_column_name(col) for col in raw_data.columns]
+
+        self.digest = digest
+        self.raw_data = raw_data
+        self.demo_df = demo_df
+        self.demo_mapping = extract_demo_mapping_from_dataframe(demo_df)
+
+        # 중복 컬럼명은 첫 번째 컬럼 기준 (pandas 라벨 조회와 달리 항상 1차원)
+        self.column_index = {}
+        for idx, col in enumerate(raw_data.columns):
+            self.column_index.setdefault(col, idx)
+
+        # ✅ 전체 응답을 한 번만 수치형으로 변환 (column-major → 열 slicing이 연속 메모리 view)
+        self.numeric = np.asfortranarray(
+            raw_data.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        )
+        self._demo_codes = None
+        self._statistics_matrices = {}
+
+    @classmethod
+    def from_file(cls, source, digest: str = None) -> "RawDataSession":
+        data = read_workbook_bytes(source)
+        digest = digest or hashlib.sha256(data).hexdigest()
+        # 두 시트를 하나의 ExcelFile 에서 읽어 zip/xml 로딩도 한 번만 수행
+        with pd.ExcelFile(io.BytesIO(data)) as excel:
+            raw_data = excel.parse(sheet_name="DATA")
+            demo_df = excel.parse(sheet_name="DEMO")
+        return cls(raw_data, demo_df, digest=digest)
+
+    def has_column(self, question_key: str) -> bool:
+        return normalize_column_name(question_key) in self.column_index
+
+    def column_values(self, question_key: str) -> np.ndarray:
+        """
+        문항 컬럼의 응답값을 복사 없이 반환합니다 (비수치 응답은 NaN).
+        """
+        col = normalize_column_name(question_key)
+        if col not in self.column_index:
+            raise KeyError(f"❌ 질문 항목 '{col}' 이(가) 데이터에 존재하지 않습니다.")
+        view = self.numeric[:, self.column_index[col]]
+        view.flags.writeable = False
+        return view
+
+    def demo_codes(self) -> dict:
+        """
+        DEMO 매핑에 있는 컬럼들의 factorize 결과 {demo_col: (codes, n_groups)} — 세션당 한 번만 계산
+        """
+        if self._demo_codes is None:
+            self._demo_codes = factorize_demo_columns(self.raw_data, self.demo_mapping)
+        return self._demo_codes
+
+    def statistics_matrix(self, question_tests: dict, max_workers: int = None) -> pd.DataFrame:
+        """
+        {question_key: test_type} 에 대한 (문항 × DEMO) 통계 매트릭스 — 같은 조합은 세션당 한 번만 계산
+        """
+        cache_key = tuple(sorted(question_tests.items()))
+        if cache_key not in self._statistics_matrices:
+            self._statistics_matrices[cache_key] = compute_statistics_matrix(
+                self.raw_data, self.demo_mapping, question_tests,
+                max_workers=max_workers, demo_codes=self.demo_codes(),
+            )
+        return self._statistics_matrices[cache_key]
+
+def get_raw_data_session(source) -> RawDataSession:
+    """
+    같은 내용의 Raw Data 파일은 한 번만 읽고, 이후에는 캐시된 세션을 반환합니다.
+    """
+    data = read_workbook_bytes(source)
+    digest = hashlib.sha256(data).hexdigest()
+
+    with _lock:
+        session = _sessions.get(digest)
+        if session is not None:
+            _sessions.move_to_end(digest)
+            return session
+
+    session = RawDataSession.from_file(data, digest=digest)
+    with _lock:
+        _sessions[digest] = session
+        while len(_sessions) > MAX_CACHED_SESSIONS:
+            _sessions.popitem(last=False)
+    return session
+
+def clear_raw_data_sessions():
+    with _lock:
+        _sessions.clear()
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import difflib
+
+try:
+    from graph_tracing import annotate_trace
+    from significance_verifier import verify_significance
+except ImportError:
+    from streamlit_app.graph_tracing import annotate_trace
+    from streamlit_app.significance_verifier import verify_significance
+
+'''
+hallucination check ↔ revision 반복(loop) 제어 — 질문별 토큰 / 비용 / 시간 예산과 조기 종료
+
+사용법 (hallucination check 노드):
+    loop, decision, verdict = before_check(state, draft)  # LLM 검증 전에 결정할 수 있으면 "accept" / "reject" / "stop"
+    if decision == "reject":                              # 규칙 검증 reject → verdict["feedback"] 로 revision
+        loop = after_check(loop, decision, llm.model, None, reject_num, max_rejections=4)
+    elif decision is None:
+        response = llm.invoke(prompt)
+        loop = after_check(loop, decision, llm.model, response, reject_num, max_rejections=4)
+    return {**state, ..., "revision_loop": loop}
+
+    loop = after_revision(state, llm.model, response)     # revision 노드
+    if state["revision_loop"]["stop_reason"]: ...          # route_hallucination: 더 이상 revision 하지 않음
+
+- pre-check: significance_verifier 가 초안을 ft_test_result / selected_table 과 대조해 accept / reject 를 확정하면 LLM 검증 생략
+  (uncertain 일 때만 LLM 호출, REVISION_LOOP_PRECHECK=0 이면 항상 LLM 호출)
+- revision 결과가 직전 초안과 거의 같으면(REVISION_LOOP_SIMILARITY 이상) 다시 검증하지 않고 종료 (no_progress)
+- reject 후 사용량이 예산(REVISION_LOOP_MAX_TOKENS / _MAX_COST_USD / _MAX_SECONDS)을 넘으면 종료
+  (예산은 첫 hallucination check 부터 계산, 캐시 hit 응답은 usage 가 없으므로 0)
+- stop_reason: 조기 종료 사유 — max_rejections / no_progress / token_budget / cost_budget / time_budget
+- loop 통계는 state["revision_loop"] 와 graph_tracing 의 graph span attribute 에 기록
+'''
+
+# ✅ 1M 토큰당 가격(USD), 목록에 없는 모델은 "default" — LLM_PRICES 환경변수(JSON)로 변경
+DEFAULT_MODEL_PRICES = {
+    "gpt-4o": {"input": 2.50, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+    "default": {"input": 2.50, "output": 10.00},
+}
+MODEL_PRICES = {**DEFAULT_MODEL_PRICES, **json.loads(os.getenv("LLM_PRICES", "{}"))}
+
+# ✅ 질문별 loop 예산 / 조기 종료 기준
+REVISION_LOOP_MAX_TOKENS = int(os.getenv("REVISION_LOOP_MAX_TOKENS", "20000"))
+REVISION_LOOP_MAX_COST_USD = float(os.getenv("REVISION_LOOP_MAX_COST_USD", "0.01"))
+REVISION_LOOP_MAX_SECONDS = float(os.getenv("REVISION_LOOP_MAX_SECONDS", "120"))
+REVISION_LOOP_SIMILARITY = float(os.getenv("REVISION_LOOP_SIMILARITY", "0.95"))
+REVISION_LOOP_PRECHECK = os.getenv("REVISION_LOOP_PRECHECK", "1") != "0"
+
+def llm_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = MODEL_PRICES.get(model, MODEL_PRICES["default"])
+    return (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1_000_000
+
+def new_loop_stats() -> dict:
+    return {
+        "started": time.time(),
+        "checks": 0,
+        "llm_checks": 0,
+        "precheck_accepts": 0,
+        "precheck_rejects": 0,
+        "revisions": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "stop_reason": None,
+        "last_draft": None,
+    }
+
+def loop_stats(state) -> dict:
+    return dict(state.get("revision_loop") or new_loop_stats())
+
+def _record_usage(loop: dict, model: str, response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    prompt_tokens = usage.get("input_tokens", 0)
+    completion_tokens = usage.get("output_tokens", 0)
+    loop["prompt_tokens"] += prompt_tokens
+    loop["completion_tokens"] += completion_tokens
+    loop["cost_usd"] += llm_cost(model, prompt_tokens, completion_tokens)
+
+def _annotate(loop: dict):
+    annotate_trace(revision_loop={
+        **{key: value for key, value in loop.items() if key not in ("started", "last_draft")},
+        "cost_usd": round(loop["cost_usd"], 6),
+        "seconds": round(time.time() - loop["started"], 3),
+    })
+
+def budget_exhausted(loop: dict):
+    if loop["prompt_tokens"] + loop["completion_tokens"] >= REVISION_LOOP_MAX_TOKENS:
+        return "token_budget"
+    if loop["cost_usd"] >= REVISION_LOOP_MAX_COST_USD:
+        return "cost_budget"
+    if time.time() - loop["started"] >= REVISION_LOOP_MAX_SECONDS:
+        return "time_budget"
+    return None
+
+def text_similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a or "", b or "", autojunk=False).ratio()
+
+def before_check(state, draft: str):
+    """
+    LLM 검증 전 단계 — (loop 통계, LLM 없이 내린 결정 "accept" / "reject" / "stop" 또는 None, 규칙 검증 결과 또는 None)
+    """
+    loop = loop_stats(state)
+    loop["checks"] += 1
+    previous, loop["last_draft"] = loop["last_draft"], draft
+    decision, verdict = None, None
+
+    if previous is not None and text_similarity(previous, draft) >= REVISION_LOOP_SIMILARITY:
+        loop["stop_reason"] = "no_progress"
+        decision = "stop"
+    elif REVISION_LOOP_PRECHECK:
+        verdict = verify_significance(draft, state.get("ft_test_result"), state.get("selected_table"),
+                                      anchor=state.get("anchor"), lang=state.get("lang", "한국어"))
+        if verdict["decision"] in ("accept", "reject"):
+            loop[f"precheck_{verdict['decision']}s"] += 1
+            decision = verdict["decision"]
+
+    _annotate(loop)
+    return loop, decision, verdict
+
+def after_check(loop: dict, decision: str, model: str, response, reject_num: int, max_rejections: int) -> dict:
+    """
+    검증 결과 반영 — response 가 None 이면 규칙 검증(reject)으로 LLM 사용량 없음
+    """
+    loop = dict(loop)
+    if response is not None:
+        loop["llm_checks"] += 1
+        _record_usage(loop, model, response)
+    if decision == "reject":
+        if reject_num >= max_rejections:
+            loop["stop_reason"] = "max_rejections"
+        else:
+            loop["stop_reason"] = budget_exhausted(loop)
+    _annotate(loop)
+    return loop
+
+def after_revision(state, model: str, response) -> dict:
+    loop = loop_stats(state)
+    loop["revisions"] += 1
+    _record_usage(loop, model, response)
+    _annotate(loop)
+    return loop
@@ -0,0 +1,323 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import is_numeric_dtype
+
+try:
+    from table_analysis_get_anchor import get_anchor
+except ImportError:
+    from streamlit_app.table_analysis_get_anchor import get_anchor
+
+'''
+규칙 기반 유의성 일관성 검증 — hallucination check LLM 호출 전에 초안을 F/T 검정 결과와 표 수치로 검사
+
+사용법:
+    verdict = verify_significance(draft, ft_test_result, selected_table, anchor=state.get("anchor"), lang="한국어")
+    verdict["decision"]   # "accept" / "reject" / "uncertain" (uncertain 이면 LLM 검증)
+    verdict["feedback"]   # reject 사유 (revision 노드에 그대로 전달되는 자연어 피드백)
+    verdict["issues"]     # [{"type": "missing_significant" | "contradicted_claim", "category": .., "group": .., ...}]
+    verdict["notes"]      # 판단을 보류한 이유 (유의하지 않은 대분류 언급, 검증할 수 없는 비교 주장 등)
+
+- 언급: 대분류명 또는 그 대분류의 소분류명이 초안에 나오면 언급한 것으로 봄 (공백 차이 무시)
+- 비교 주장: 문장/절 안의 소분류명 + 그 뒤(없으면 앞)의 가장 가까운 방향 표현("높", "많", "낮", "적은", "higher", "lower" ...)
+  "크게" / "최대" 같은 정도 부사는 방향 표현으로 보지 않음
+- 유의한 대분류의 소분류 주장에서 방향 표현을 찾지 못하면("더 만족했음", "앞섰음") 확인할 수 없는 주장으로 보고 판단 보류
+- 비교 기준 그룹: "보다" / "에 비해" / "대비" / "와 비교" 가 붙거나 "than" / "compared to" 뒤에 오는 소분류명은 주장 대상이 아니라
+  기준 → "남성이 여성보다 높았다" 는 남성 값을 여성 값과만 비교 (기준 그룹은 따로 판정하지 않음)
+- 한 절에서 여러 소분류가 같은 방향 표현을 공유하면("남성과 여성 모두 높았다") 누구의 주장인지 알 수 없으므로 판단 보류
+- 비교 기준 값: 절에 응답 항목(컬럼)명이 있으면 그 컬럼, 없으면 평균 컬럼, 없으면 anchor 컬럼 합
+- 소분류 값이 같은 대분류의 나머지 소분류 평균보다 (대분류 내 범위 × SIGNIFICANCE_VERIFIER_MARGIN) 이상 반대 방향이면 모순
+- 유의한 대분류 누락 / 모순된 비교 주장 → reject, 모두 확인되면 accept, 그 밖에 확인할 수 없는 부분이 있으면 uncertain
+'''
+
+# ✅ 비교 주장이 지지/모순으로 판정되기 위한 최소 차이 (대분류 내 값 범위 대비 비율)
+SIGNIFICANCE_VERIFIER_MARGIN = float(os.getenv("SIGNIFICANCE_VERIFIER_MARGIN", "0.1"))
+
+NON_VALUE_COLUMNS = {"대분류", "소분류", "사례수", "대분류_소분류"}
+
+# ✅ 방향 표현 — "상대적으로" / "적극적" 처럼 "적" 이 들어간 다른 단어와 겹치지 않도록 활용형으로 등록
+HIGH_WORDS = ["높", "많", "강한", "강하", "우세", "상회", "최고"]
+LOW_WORDS = ["낮", "적었", "적은", "적게", "적고", "적음", "적어", "작", "하회", "최저"]
+# ✅ 정도 부사 — "크게 낮았다" / "최대 1.2점 낮았음" / "많이 낮았다" 의 방향은 뒤의 서술어가 정하므로 방향 표현에서 제외
+INTENSIFIERS = ["크게", "큰", "많이", "최대", "최소"]
+HIGH_WORDS_EN = ["higher", "highest", "more", "most", "greater", "larger", "above", "stronger"]
+LOW_WORDS_EN = ["lower", "lowest", "less", "least", "fewer", "smaller", "below", "weaker"]
+NEGATIONS = ["지않", "지는않"]
+
+# ✅ 비교 기준 그룹 표지 — 소분류명 바로 뒤(한국어) / 바로 앞(영어)
+REFERENCE_AFTER = re.compile(r"\s*(?:보다|에\s*비해|에\s*비하여|대비|[과와]\s*비교)")
+REFERENCE_BEFORE = re.compile(r"\b(?:than|compared\s+(?:to|with)|relative\s+to|versus|vs\.?)\s+(?:the\s+|those\s+)?$", re.IGNORECASE)
+
+CLAUSE_SPLIT = re.compile(r"(?<!\d)\.(?!\d)|[!?。;\n]|반면|그러나|하지만|\bwhereas\b|\bwhile\b|\bbut\b", re.IGNORECASE)
+
+def _compact(text) -> str:
+    return re.sub(r"\s+", "", str(text))
+
+def _is_total(label) -> bool:
+    return _compact(label) in ("전체", "Total", "total")
+
+def _name_pattern(name: str):
+    # "60세 이상" ↔ "60세이상" 처럼 공백만 다른 표기도 찾도록 글자 사이 공백 허용
+    return re.compile(r"\s*".join(re.escape(ch) for ch in _compact(name)), re.IGNORECASE)
+
+def _column_label(col) -> str:
+    return re.sub(r"\s*%\s*$", "", str(col)).strip()
+
+def _significance_labels(ft_test_result):
+    if not isinstance(ft_test_result, pd.DataFrame) or ft_test_result.empty:
+        return None
+    if not {"대분류", "유의성"} <= set(ft_test_result.columns):
+        return None
+    stars = ft_test_result["유의성"].fillna("").astype(str).str.strip()
+    labels = ft_test_result["대분류"].astype(str).str.strip()
+    return labels[stars != ""].tolist(), labels[stars == ""].tolist()
+
+def _table_values(selected_table):
+    """
+    (대분류 배열, 소분류 배열, 수치 컬럼 목록, 수치 행렬) — 전체 행 제외, 병합 셀로 비어 있는 대분류는 위 행 값으로 채움
+    표는 검증마다 한 번만 수치 변환하고 비교 주장은 numpy 배열로 계산
+    """
+    if not isinstance(selected_table, pd.DataFrame) or not {"대분류", "소분류"} <= set(selected_table.columns):
+        return None
+    categories = selected_table["대분류"].ffill().to_numpy(dtype=object)
+    groups = selected_table["소분류"].to_numpy(dtype=object)
+    keep = np.array([
+        not (pd.isna(category) or pd.isna(group) or _is_total(category) or _is_total(group))
+        for category, group in zip(categories, groups)
+    ], dtype=bool)
+
+    value_columns, columns = [], []
+    for col in selected_table.columns:
+        if str(col).strip() in NON_VALUE_COLUMNS:
+            continue
+        series = selected_table[col]
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan) if is_numeric_dtype(series) \
+            else pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+        values = values[keep]
+        if not np.isnan(values).all():
+            value_columns.append(col)
+            columns.append(values)
+
+    return (
+        np.array([str(category).strip() for category in categories[keep]], dtype=object),
+        np.array([str(group).strip() for group in groups[keep]], dtype=object),
+        value_columns,
+        np.column_stack(columns) if columns else np.empty((int(keep.sum()), 0)),
+    )
+
+def _find_spans(text: str, names: list) -> list:
+    """
+    긴 이름부터 찾고, 이미 찾은 구간과 겹치는 짧은 이름은 무시 → [(start, end, name)]
+    """
+    spans = []
+    for name in sorted(set(names), key=lambda n: len(_compact(n)), reverse=True):
+        if len(_compact(name)) < 2:
+            continue
+        for match in _name_pattern(name).finditer(text):
+            if any(match.start() < end and start < match.end() for start, end, _ in spans):
+                continue
+            spans.append((match.start(), match.end(), name))
+    return sorted(spans)
+
+def _mask(text: str, spans: list) -> str:
+    chars = list(text)
+    for start, end, _ in spans:
+        chars[start:end] = "_" * (end - start)
+    return "".join(chars)
+
+def _direction_marks(masked: str) -> list:
+    """
+    [(위치, "high" / "low")] — 바로 뒤에 부정 표현("높지 않", "not higher")이 붙은 방향 표현과 정도 부사는 제외
+    """
+    marks = []
+    masked = re.sub("|".join(map(re.escape, INTENSIFIERS)), lambda match: "_" * len(match.group()), masked)
+    lowered = masked.lower()
+    for words, direction in ((HIGH_WORDS, "high"), (LOW_WORDS, "low")):
+        for word in words:
+            for match in re.finditer(re.escape(word), masked):
+                tail = _compact(masked[match.end():match.end() + 6])
+                if not any(tail.startswith(neg) for neg in NEGATIONS):
+                    marks.append((match.start(), direction))
+    for words, direction in ((HIGH_WORDS_EN, "high"), (LOW_WORDS_EN, "low")):
+        for word in words:
+            for match in re.finditer(rf"\b{word}\b", lowered):
+                if not lowered[max(0, match.start() - 4):match.start()].strip().endswith("not"):
+                    marks.append((match.start(), direction))
+    return sorted(marks)
+
+def _claim_direction(marks: list, start: int, end: int):
+    """
+    소분류명 뒤(없으면 앞)의 가장 가까운 방향 표현 → (위치, "high" / "low") 또는 None
+    """
+    after = [mark for mark in marks if mark[0] >= end]
+    if after:
+        return after[0]
+    before = [mark for mark in marks if mark[0] < start]
+    return before[-1] if before else None
+
+def _is_reference(clause: str, start: int, end: int) -> bool:
+    return bool(REFERENCE_AFTER.match(clause, end) or REFERENCE_BEFORE.search(clause[:start]))
+
+def _table_anchor(selected_table) -> list:
+    try:
+        return get_anchor(selected_table)
+    except (ValueError, KeyError):
+        return []
+
+def _metric_columns(value_columns: list, clause_columns: list, anchor: list) -> list:
+    if clause_columns:
+        return clause_columns
+    mean_columns = [col for col in value_columns if "평균" in str(col) or "mean" in str(col).lower()]
+    if mean_columns:
+        return mean_columns[:1]
+    return [col for col in anchor if col in value_columns]
+
+def _evaluate_claim(values, category: str, group: str, columns: list, direction: str, references=()):
+    """
+    같은 대분류 안에서 group 값과 비교 대상 평균 비교 → "supported" / "contradicted" / "uncertain"
+    비교 대상: references(비교 기준 소분류)가 있으면 그 소분류들, 없으면 나머지 소분류 전체
+    """
+    categories, groups, value_columns, matrix = values
+    rows = categories == category
+    metric = matrix[np.ix_(rows, [value_columns.index(col) for col in columns])]
+    valid = ~np.isnan(metric).all(axis=1)
+    metric, names = np.nansum(metric, axis=1)[valid], groups[rows][valid]
+    target = names == group
+    others = np.isin(names, list(references)) & ~target if references else ~target
+    if not target.any() or not others.any():
+        return "uncertain"
+    spread = metric.max() - metric.min()
+    if spread <= 0:
+        return "uncertain"
+    diff = (metric[target].mean() - metric[others].mean()) * (1 if direction == "high" else -1)
+    margin = SIGNIFICANCE_VERIFIER_MARGIN * spread
+    if diff >= margin:
+        return "supported"
+    if diff <= -margin:
+        return "contradicted"
+    return "uncertain"
+
+def _feedback(issues: list, lang: str) -> str:
+    lines = []
+    for issue in issues:
+        if issue["type"] == "missing_significant":
+            lines.append(
+                f"유의미한 차이가 확인된 대분류 '{issue['category']}'이(가) 요약에 언급되지 않았음"
+                if lang == "한국어" else
+                f"The significant category '{issue['category']}' is not mentioned in the summary"
+            )
+        else:
+            actual = "낮은데 높다고" if issue["claim"] == "high" else "높은데 낮다고"
+            actual_en = "lower but is described as higher" if issue["claim"] == "high" else "higher but is described as lower"
+            columns = ", ".join(_column_label(col) for col in issue["columns"])
+            references = ", ".join(issue.get("references", []))
+            others = f"'{references}' 그룹" if references else "다른 그룹"
+            others_en = f"the '{references}' group" if references else "the other groups"
+            lines.append(
+                f"'{issue['category']}'의 '{issue['group']}' 그룹은 '{columns}' 기준 {others}보다 {actual} 서술되었음"
+                if lang == "한국어" else
+                f"In '{issue['category']}', the '{issue['group']}' group is {actual_en} than {others_en} on '{columns}'"
+            )
+    return " / ".join(lines)
+
+def verify_significance(draft: str, ft_test_result, selected_table, anchor=None, lang: str = "한국어") -> dict:
+    verdict = {"decision": "uncertain", "feedback": "", "issues": [], "notes": [], "claims": 0}
+    labels = _significance_labels(ft_test_result)
+    if labels is None or not draft:
+        verdict["notes"].append({"type": "no_test_result"})
+        return verdict
+    significant, non_significant = labels
+
+    values = _table_values(selected_table)
+    categories, groups, value_columns, _ = values if values is not None else ([], [], [], None)
+    group_categories = {}
+    for category, group in zip(categories, groups):
+        group_categories.setdefault(group, set()).add(category)
+    column_names = {_column_label(col): col for col in value_columns}
+
+    significant_compact = {_compact(part) for label in significant for part in [label] + str(label).split(" - ")}
+    mentioned = set()
+    for clause in CLAUSE_SPLIT.split(draft):
+        if not clause or not clause.strip():
+            continue
+        category_spans = _find_spans(clause, list(set(categories)) + significant + non_significant)
+        clause_categories = {name for _, _, name in category_spans}
+        mentioned |= clause_categories
+
+        group_spans = _find_spans(_mask(clause, category_spans), list(group_categories))
+        column_spans = _find_spans(_mask(clause, category_spans + group_spans), list(column_names))
+        marks = _direction_marks(_mask(clause, category_spans + group_spans + column_spans))
+        clause_columns = [column_names[name] for _, _, name in column_spans]
+
+        resolved = []
+        for start, end, group in group_spans:
+            # 여러 대분류에 같은 소분류명("있음", "기타" 등)이 있으면 같은 절의 대분류명으로 구분
+            candidates = group_categories[group]
+            if len(candidates) > 1:
+                candidates = candidates & clause_categories
+            if len(candidates) != 1:
+                verdict["notes"].append({"type": "ambiguous_group", "group": group})
+                continue
+            category = next(iter(candidates))
+            mentioned.add(category)
+            resolved.append((start, end, group, category, _is_reference(clause, start, end)))
+
+        # 비교 기준 그룹은 주장 대상이 아님 → 같은 대분류의 주장 그룹과 비교할 때만 사용
+        references = {}
+        for _, _, group, category, is_reference in resolved:
+            if is_reference:
+                references.setdefault(category, set()).add(group)
+        claims = [(group, category, _claim_direction(marks, start, end))
+                  for start, end, group, category, is_reference in resolved if not is_reference]
+        shared = [mark for _, _, mark in claims if mark is not None]
+
+        for group, category, mark in claims:
+            if mark is None:
+                # 방향 표현을 알 수 없는 유의한 대분류의 주장("더 만족했음", "두드러졌음")은 LLM 검증으로 넘김
+                if _compact(category) in significant_compact:
+                    verdict["claims"] += 1
+                    verdict["notes"].append({"type": "unverified_claim", "category": category, "group": group,
+                                             "claim": None})
+                continue
+            direction = mark[1]
+            verdict["claims"] += 1
+            if shared.count(mark) > 1:
+                # "남성과 여성 모두 높았다" 처럼 여러 그룹이 같은 방향 표현을 공유 → 판단 보류
+                verdict["notes"].append({"type": "ambiguous_claim", "category": category, "group": group,
+                                         "claim": direction})
+                continue
+            if not anchor:
+                # anchor 가 없으면(batch 모드는 get_anchor 노드가 생략됨) 첫 비교 주장에서 한 번만 계산
+                anchor = _table_anchor(selected_table)
+            columns = _metric_columns(value_columns, clause_columns, anchor)
+            result = _evaluate_claim(values, category, group, columns, direction, references.get(category, ())) \
+                if columns else "uncertain"
+            if result == "contradicted":
+                verdict["issues"].append({"type": "contradicted_claim", "category": category, "group": group,
+                                          "columns": [str(col) for col in columns], "claim": direction,
+                                          "references": sorted(references.get(category, ()))})
+            elif result == "uncertain":
+                verdict["notes"].append({"type": "unverified_claim", "category": category, "group": group,
+                                         "claim": direction})
+
+    mentioned_compact = {_compact(name) for name in mentioned}
+    for label in significant:
+        # manual 분석의 "대분류 - 소분류" 라벨은 소분류 언급도 인정
+        parts = [_compact(part) for part in str(label).split(" - ")]
+        if not (_compact(label) in mentioned_compact or any(part in mentioned_compact for part in parts)):
+            verdict["issues"].append({"type": "missing_significant", "category": label})
+    for label in non_significant:
+        if _compact(label) in mentioned_compact:
+            verdict["notes"].append({"type": "non_significant_mentioned", "category": label})
+
+    if verdict["issues"]:
+        verdict["decision"] = "reject"
+        verdict["feedback"] = _feedback(verdict["issues"], lang)
+    elif not significant or verdict["notes"]:
+        verdict["decision"] = "uncertain"
+    else:
+        verdict["decision"] = "accept"
+    return verdict
@@ -0,0 +1,207 @@
+import os
+import json
+import datetime
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+'''
+파싱된 통계표(tables, question_texts, question_keys)를 하나의 Arrow IPC 파일(bundle)로 저장/로딩합니다.
+
+- bundle 한 행 = 질문 하나 (key, 질문 텍스트, 순서, 테이블을 직렬화한 Arrow IPC stream)
+- schema metadata 에 원본 .xlsx 의 sha256, 파서 id, 포맷 버전을 기록 → 원본이 바뀌면 자동으로 무효화
+- 로딩은 memory map 기반이라 openpyxl 재파싱 없이 수 ms 안에 끝남
+- 문자열이 아닌 값(숫자, NaN, 날짜)이 섞인 object 컬럼은 값마다 JSON 으로 저장 → 로딩 시 원래 타입 복원
+  (str / int / float / bool / None / datetime / date / time 외의 타입은 str 로 저장됨)
+- 디렉토리 상한: SURVEY_TABLE_BUNDLE_MAX_FILES 개 / SURVEY_TABLE_BUNDLE_MAX_BYTES 를 넘으면 저장 시
+  가장 오래 사용하지 않은 bundle 부터 삭제 (로딩할 때마다 mtime 갱신 → LRU)
+- SURVEY_TABLE_BUNDLE_DIR="" 이면 업로드 파일을 디스크에 저장하지 않음 (프로세스 메모리 캐시만 사용)
+
+사용법:
+    export_survey_tables(path, tables, question_texts, question_keys, source_digest=digest)
+    loaded = import_survey_tables(path, expected_digest=digest)   # 없거나 오래된 bundle 이면 None
+'''
+
+BUNDLE_FORMAT_VERSION = "2"
+
+# ✅ 업로드 파일 bundle 저장 위치 (빈 문자열이면 디스크 bundle 사용 안 함)
+BUNDLE_DIR = os.getenv(
+    "SURVEY_TABLE_BUNDLE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "survey_tables"),
+)
+BUNDLE_MAX_FILES = int(os.getenv("SURVEY_TABLE_BUNDLE_MAX_FILES", "32"))
+BUNDLE_MAX_BYTES = int(os.getenv("SURVEY_TABLE_BUNDLE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+BUNDLE_SCHEMA = pa.schema([
+    ("key", pa.string()),
+    ("question_text", pa.string()),
+    ("order", pa.int32()),
+    ("table", pa.binary()),
+])
+
+def bundle_path_for(source_digest: str, parser_id: str = "", sheet_name: str = "통계표") -> str:
+    safe_parser = "".join(ch if ch.isascii() and ch.isalnum() else "_" for ch in parser_id)
+    safe_sheet = sheet_name.encode("utf-8").hex()
+    return os.path.join(BUNDLE_DIR, f"{source_digest}_{safe_parser}_{safe_sheet}.arrow")
+
+def _encode_value(val) -> str:
+    if isinstance(val, np.generic):
+        val = val.item()
+    if isinstance(val, datetime.datetime):
+        return json.dumps({"datetime": val.isoformat()})
+    if isinstance(val, datetime.date):
+        return json.dumps({"date": val.isoformat()})
+    if isinstance(val, datetime.time):
+        return json.dumps({"time": val.isoformat()})
+    if val is None or isinstance(val, (str, int, float, bool)):
+        return json.dumps(val, ensure_ascii=False)
+    return json.dumps(str(val), ensure_ascii=False)
+
+def _decode_value(text: str):
+    val = json.loads(text)
+    if isinstance(val, dict):
+        (kind, iso), = val.items()
+        return getattr(datetime, kind).fromisoformat(iso)
+    return val
+
+def _table_to_ipc(table: pd.DataFrame) -> bytes:
+    # 컬럼명이 중복되거나 문자열이 아닐 수 있으므로 위치 기반 이름으로 저장하고 원래 이름은 metadata 에 보관
+    frame = table.copy(deep=False)
+    frame.columns = [f"c{idx}" for idx in range(frame.shape[1])]
+    json_columns = []
+    for col in frame.columns:
+        if frame[col].dtype == object and not all(val is None or isinstance(val, str) for val in frame[col]):
+            frame[col] = frame[col].map(_encode_value)
+            json_columns.append(col)
+
+    arrow_table = pa.Table.from_pandas(frame)
+    metadata = dict(arrow_table.schema.metadata or {})
+    metadata[b"columns"] = json.dumps([str(col) for col in table.columns], ensure_ascii=False).encode("utf-8")
+    metadata[b"json_columns"] = json.dumps(json_columns).encode("utf-8")
+    arrow_table = arrow_table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+def _ipc_to_table(buffer) -> pd.DataFrame:
+    arrow_table = pa.ipc.open_stream(buffer).read_all()
+    columns = json.loads(arrow_table.schema.metadata[b"columns"].decode("utf-8"))
+    table = arrow_table.to_pandas()
+    for col in json.loads(arrow_table.schema.metadata[b"json_columns"].decode("utf-8")):
+        table[col] = table[col].map(_decode_value).astype(object)
+    table.columns = columns
+    return table
+
+def export_survey_tables(path: str, tables: dict, question_texts: dict, question_keys: list,
+                         source_digest: str, parser_id: str = ""):
+    """
+    파싱 결과 전체를 path 에 원자적으로(tmp 파일 → rename) 저장합니다.
+    """
+    keys = [key for key in question_keys if key in tables]
+    batch = pa.table({
+        "key": keys,
+        "question_text": [question_texts.get(key, "") for key in keys],
+        "order": list(range(len(keys))),
+        "table": [_table_to_ipc(tables[key]) for key in keys],
+    }, schema=BUNDLE_SCHEMA)
+    batch = batch.replace_schema_metadata({
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "source_sha256": source_digest,
+        "parser_id": parser_id,
+        # 테이블이 없는 질문(헤더 부족 등)도 key 순서를 그대로 복원하기 위해 보관
+        "question_keys": json.dumps(list(question_keys), ensure_ascii=False),
+        "question_texts": json.dumps(question_texts, ensure_ascii=False),
+    })
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            with pa.ipc.new_file(f, batch.schema) as writer:
+                writer.write_table(batch)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    prune_bundles(directory)
+
+def prune_bundles(directory: str = None, max_files: int = None, max_bytes: int = None) -> int:
+    """
+    최근에 사용한(mtime) bundle 부터 max_files 개 / max_bytes 까지만 남기고 삭제 → 삭제한 파일 수
+    """
+    directory = BUNDLE_DIR if directory is None else directory
+    max_files = BUNDLE_MAX_FILES if max_files is None else max_files
+    max_bytes = BUNDLE_MAX_BYTES if max_bytes is None else max_bytes
+    if not directory or not os.path.isdir(directory):
+        return 0
+
+    bundles = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".arrow") and entry.is_file():
+                stat = entry.stat()
+                bundles.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    removed, kept, total = 0, 0, 0
+    for _, size, path in sorted(bundles, reverse=True):
+        if kept < max_files and total + size <= max_bytes:
+            kept += 1
+            total += size
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            # 다른 프로세스가 먼저 삭제한 경우
+            pass
+    return removed
+
+def read_bundle_metadata(path: str) -> dict:
+    with pa.memory_map(path, "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return {key.decode("utf-8"): value.decode("utf-8") for key, value in metadata.items()}
+
+def import_survey_tables(path: str, expected_digest: str = None, parser_id: str = None, keys=None):
+    """
+    bundle 을 memory map 으로 읽어 (tables, question_texts, question_keys)를 반환합니다.
+    파일이 없거나, 포맷/원본 해시/파서가 다르면 None
+    keys 를 주면 해당 질문의 테이블만 복원합니다.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        metadata = {key.decode("utf-8"): value.decode("utf-8") for key, value in (reader.schema.metadata or {}).items()}
+        if metadata.get("format_version") != BUNDLE_FORMAT_VERSION:
+            return None
+        if expected_digest is not None and metadata.get("source_sha256") != expected_digest:
+            return None
+        if parser_id is not None and metadata.get("parser_id") != parser_id:
+            return None
+
+        bundle = reader.read_all()
+        wanted = None if keys is None else set(keys)
+        tables = {}
+        key_column = bundle.column("key")
+        table_column = bundle.column("table")
+        for idx in range(bundle.num_rows):
+            key = key_column[idx].as_py()
+            if wanted is not None and key not in wanted:
+                continue
+            tables[key] = _ipc_to_table(table_column[idx].as_buffer())
+
+    # LRU 기준 — 최근에 로딩한 bundle 은 prune_bundles 에서 늦게 삭제
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    question_texts = json.loads(metadata["question_texts"])
+    question_keys = json.loads(metadata["question_keys"])
+    return tables, question_texts, question_keys
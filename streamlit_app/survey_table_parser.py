@@ -0,0 +1,301 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import openpyxl
+
+'''
+통계표 시트 파서 (CLI agent 와 Streamlit 앱이 공유하는 단일 구현)
+
+사용법:
+    tables, question_texts, question_keys = load_survey_tables("YOUR_FILE_PATH")                 # Streamlit 기준
+    tables, question_texts, question_keys = parse_survey_tables(path, **PARSER_PRESETS["cli"])  # CLI 기준
+
+두 경로의 차이는 옵션으로만 표현합니다.
+- trailer_rows: 테이블 끝에서 잘라낼 요약 행 수 (합계 등) — Streamlit 1, CLI 2
+- normalize_keys: 질문 key 의 '-', '.' → '_' 정규화 여부 — Streamlit True, CLI False
+- drop_unlabeled_rows: 대분류/사례수가 모두 빈 행 제거 여부 — Streamlit True, CLI False
+'''
+
+QUESTION_PATTERN = r"^[A-Z]+\d*[-.]?\d*\."
+
+# 테이블 제목 후보에서 제외하는 척도 라벨
+SCALE_LABELS = ['관심없다', '보통', '관심있다', '평균']
+
+PARSER_PRESETS = {
+    "streamlit": {"trailer_rows": 1, "normalize_keys": True, "drop_unlabeled_rows": True},
+    "cli": {"trailer_rows": 2, "normalize_keys": False, "drop_unlabeled_rows": False},
+}
+
+# ✅ 정규화 함수
+def normalize_key(key: str) -> str:
+    return key.replace("-", "_").replace(".", "_")
+
+def _question_key(title: str, key_counts: dict, normalize_keys: bool = True):
+    """
+    질문 제목 → 중복 번호가 붙은 key (패턴이 맞지 않으면 None)
+    """
+    match = re.match(QUESTION_PATTERN, title)
+    if not match:
+        return None
+    base_key = match.group().rstrip(".")
+    key_counts[base_key] += 1
+    suffix = f"_{key_counts[base_key]}" if key_counts[base_key] > 1 else ""
+    final_key = base_key + suffix
+    return normalize_key(final_key) if normalize_keys else final_key
+
+def _merge_headers(first_header: np.ndarray, second_header: np.ndarray) -> np.ndarray:
+    """
+    (질문 수 × 컬럼 수) 2줄 헤더 문자열 → 컬럼명 (문자열 연산은 모두 numpy 로 한 번에)
+    """
+    n_cols = first_header.shape[1]
+    col_idx = np.arange(n_cols)
+
+    # 사례수 다음에 나오는 테이블 제목 찾기 (척도 라벨이 아닌 첫 번째 값)
+    candidates = (col_idx > 2) & (first_header != "") & ~np.isin(first_header, SCALE_LABELS)
+    has_title = candidates.any(axis=1)
+    title_text = first_header[np.arange(len(first_header)), candidates.argmax(axis=1)]
+    is_title = has_title[:, None] & (first_header == title_text[:, None])
+
+    first_val = np.where(is_title, "", first_header)
+    combined = np.char.add(np.char.add(first_val, " "), second_header)
+    combined = np.char.strip(np.char.replace(np.char.strip(combined), "nan", ""))
+
+    names = combined.astype(object)
+    names[:, :3] = ["대분류", "소분류", "사례수"][:n_cols]
+    return names
+
+class _SheetArrays:
+    """
+    시트(또는 질문 블록) 전체를 한 번만 변환한 배열들
+    - columns: 컬럼별 원래 dtype 의 array (수치 변환이 안 되는 컬럼은 이 값을 그대로 사용)
+    - present: 빈 셀이 아닌지 여부 (행 × 컬럼)
+    - numeric: pd.to_numeric(errors='coerce') 결과를 하나로 모은 float64 block (행 × 컬럼)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.columns = [df.iloc[:, idx].array for idx in range(df.shape[1])]
+        self.present = df.notna().to_numpy()
+        self.numeric = np.asfortranarray(
+            df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+        self._frame = df
+
+    def header_rows(self, rows) -> np.ndarray:
+        text = self._frame.iloc[rows].fillna('').astype(str).to_numpy()
+        return text.astype(str) if text.size else np.zeros(text.shape, dtype=str)
+
+def _ffill_source(present_col: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    # 각 행이 값을 가져올 마지막 비어있지 않은 행 번호 (앞쪽에 값이 없으면 -1)
+    return np.maximum.accumulate(np.where(present_col, rows, -1))
+
+def _take(values: np.ndarray, source: np.ndarray) -> np.ndarray:
+    taken = values[np.maximum(source, 0)]
+    if (source < 0).any():
+        taken[source < 0] = np.nan
+    return taken
+
+def _take_native(column, source: np.ndarray) -> pd.Series:
+    # 원래 dtype(object, str 등)을 유지한 채 행 선택 (-1 은 NaN)
+    return pd.Series(column.take(source, allow_fill=True))
+
+def _numeric_column(column, source: np.ndarray, numeric: np.ndarray) -> np.ndarray:
+    """
+    pd.to_numeric(..., errors='coerce').round(1) 과 같은 결과 — 정수만 있는 컬럼만 pandas 로 dtype 을 확인
+    """
+    if column.dtype.kind != "f" and not np.isnan(numeric).any() and (numeric == np.floor(numeric)).all():
+        return pd.to_numeric(_take_native(column, source), errors='coerce').round(1).to_numpy()
+    return np.round(numeric, 1)
+
+def _assemble_table(sheet: _SheetArrays, names: np.ndarray, rows: np.ndarray,
+                    trailer_rows: int, drop_unlabeled_rows: bool):
+    # ✅ 헤더 2행을 뺀 데이터 행들 → 빈 컬럼/빈 행 제거
+    data_present = sheet.present[rows]
+    keep_cols = np.flatnonzero(data_present.any(axis=0))
+    kept_names = names[keep_cols]
+    label_cols = keep_cols[kept_names == "대분류"]
+    count_cols = keep_cols[kept_names == "사례수"]
+    if len(label_cols) == 0 or (drop_unlabeled_rows and len(count_cols) == 0):
+        return None
+    rows = rows[data_present.any(axis=1)]
+
+    # 대분류 채우기 (ffill)
+    sources = {col: _ffill_source(sheet.present[rows, col], rows) for col in label_cols}
+    row_mask = np.ones(len(rows), dtype=bool)
+    if drop_unlabeled_rows:
+        labeled = [sources[col] >= 0 for col in label_cols] + [sheet.present[rows, col] for col in count_cols]
+        row_mask = np.logical_or.reduce(labeled)
+
+    # 마지막 요약행 (예: 합계 등) 제거
+    selected = np.flatnonzero(row_mask)
+    if trailer_rows and len(selected) > 2:
+        selected = selected[:-trailer_rows]
+    rows = rows[selected]
+    sources = {col: source[selected] for col, source in sources.items()}
+
+    # ✅ 숫자 컬럼 반올림 — 이름이 중복된 컬럼은 기존 파서처럼 변환하지 않음
+    duplicated = pd.Index(kept_names).duplicated(keep=False)
+    data = {}
+    for pos, col in enumerate(keep_cols):
+        source = sources.get(col, rows)
+        numeric = _take(sheet.numeric[:, col], source)
+        if not duplicated[pos] and not np.isnan(numeric).all():
+            data[pos] = _numeric_column(sheet.columns[col], source, numeric)
+        else:
+            data[pos] = _take_native(sheet.columns[col], source)
+
+    table = pd.DataFrame(data)
+    table.columns = list(kept_names)
+    return table
+
+def build_question_table(table: pd.DataFrame, trailer_rows: int = 1, drop_unlabeled_rows: bool = True):
+    """
+    질문 제목 다음 행부터 다음 질문 제목 전까지의 블록 → 정리된 테이블 (헤더 2행이 없으면 None)
+    """
+    table = table.reset_index(drop=True)
+    if len(table) < 2:
+        return None
+
+    sheet = _SheetArrays(table)
+    header = sheet.header_rows([0, 1])
+    names = _merge_headers(header[:1], header[1:])[0]
+    return _assemble_table(sheet, names, np.arange(2, len(table)), trailer_rows, drop_unlabeled_rows)
+
+def parse_survey_tables(file_path, sheet_name: str = "통계표", trailer_rows: int = 1,
+                        normalize_keys: bool = True, drop_unlabeled_rows: bool = True):
+    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+
+    question_indices = df[df[0].astype(str).str.match(QUESTION_PATTERN)].index.tolist()
+    bounds = list(zip(question_indices, question_indices[1:] + [len(df)]))
+
+    # ✅ 시트 전체를 한 번만 수치 변환하고, 모든 질문의 헤더를 한 번에 병합
+    sheet = _SheetArrays(df)
+    with_header = [(start, end) for start, end in bounds if end - start - 1 >= 2]
+    header = sheet.header_rows([row for start, _ in with_header for row in (start + 1, start + 2)])
+    merged = _merge_headers(header[0::2], header[1::2]) if with_header else []
+    header_names = {start: names for (start, _), names in zip(with_header, merged)}
+
+    tables = {}
+    question_texts = {}
+    question_keys = []
+    key_counts = defaultdict(int)
+
+    for start, end in bounds:
+        title = str(df.iloc[start, 0]).strip()
+
+        final_key = _question_key(title, key_counts, normalize_keys)
+        if final_key is None:
+            continue
+
+        question_texts[final_key] = title + "(전체 단위 : %)"
+        question_keys.append(final_key)
+
+        if start not in header_names:
+            continue
+        table = _assemble_table(sheet, header_names[start], np.arange(start + 3, end), trailer_rows, drop_unlabeled_rows)
+        if table is not None:
+            tables[final_key] = table
+
+    return tables, question_texts, question_keys
+
+def load_survey_tables(file_path, sheet_name: str = "통계표"):
+    return parse_survey_tables(file_path, sheet_name=sheet_name, **PARSER_PRESETS["streamlit"])
+
+# ✅ openpyxl cell 값 → pd.read_excel 과 같은 값 (빈 셀은 NaN, 정수값 float 은 int)
+def _excel_cell_value(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _iter_sheet_rows(file_path, sheet_name: str, max_col: int = None):
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        for row in workbook[sheet_name].iter_rows(max_col=max_col, values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+def _block_to_frame(rows: list) -> pd.DataFrame:
+    width = max((len(row) for row in rows), default=0)
+    return pd.DataFrame([
+        [_excel_cell_value(val) for val in row] + [np.nan] * (width - len(row))
+        for row in rows
+    ])
+
+def iter_survey_tables(file_path, sheet_name: str = "통계표", keys=None, trailer_rows: int = 1,
+                       normalize_keys: bool = True, drop_unlabeled_rows: bool = True):
+    """
+    통계표 시트를 openpyxl read_only 모드로 한 행씩 읽으면서 (key, question_text, table)을 yield 합니다.
+    keys 를 주면 해당 질문의 테이블만 만들고, 모두 찾으면 나머지 시트는 읽지 않습니다.
+    컬럼 dtype 은 해당 블록의 값만으로 추론되므로, 다른 질문 블록에만 문자열이 있는 컬럼은
+    parse_survey_tables 결과와 dtype(int/float)이 다를 수 있습니다 (값은 동일).
+    """
+    if keys is None:
+        wanted = None
+    else:
+        wanted = {normalize_key(key.strip()) if normalize_keys else key.strip() for key in keys}
+    key_counts = defaultdict(int)
+    current_key = None
+    current_text = None
+    block_rows = None
+
+    for row in _iter_sheet_rows(file_path, sheet_name):
+        first = row[0] if row else None
+        if first is None or not re.match(QUESTION_PATTERN, str(first)):
+            if block_rows is not None:
+                block_rows.append(row)
+            continue
+
+        # ✅ 새 질문 제목 → 이전 질문 블록 완성
+        if block_rows is not None:
+            table = build_question_table(_block_to_frame(block_rows), trailer_rows, drop_unlabeled_rows)
+            if table is not None:
+                yield current_key, current_text, table
+            if wanted is not None:
+                wanted.discard(current_key)
+                if not wanted:
+                    return
+
+        title = str(first).strip()
+        current_key = _question_key(title, key_counts, normalize_keys)
+        current_text = title + "(전체 단위 : %)"
+        # 필요 없는 질문 블록은 행을 보관하지 않음
+        block_rows = [] if current_key is not None and (wanted is None or current_key in wanted) else None
+
+    if block_rows is not None:
+        table = build_question_table(_block_to_frame(block_rows), trailer_rows, drop_unlabeled_rows)
+        if table is not None:
+            yield current_key, current_text, table
+
+def list_survey_questions(file_path, sheet_name: str = "통계표", normalize_keys: bool = True):
+    """
+    index 전용 모드 — 테이블을 만들지 않고 첫 번째 열만 읽어 (question_keys, question_texts)를 반환합니다.
+    """
+    question_texts = {}
+    question_keys = []
+    key_counts = defaultdict(int)
+
+    for row in _iter_sheet_rows(file_path, sheet_name, max_col=1):
+        first = row[0] if row else None
+        if first is None or not re.match(QUESTION_PATTERN, str(first)):
+            continue
+        title = str(first).strip()
+        final_key = _question_key(title, key_counts, normalize_keys)
+        if final_key is None:
+            continue
+        question_texts[final_key] = title + "(전체 단위 : %)"
+        question_keys.append(final_key)
+
+    return question_keys, question_texts
+
+def load_survey_question(file_path, selected_key: str, sheet_name: str = "통계표"):
+    """
+    선택된 질문 하나의 (table, question_text) — 해당 블록까지만 읽습니다. 없으면 (None, None)
+    """
+    tables = iter_survey_tables(file_path, sheet_name=sheet_name, keys=[selected_key], **PARSER_PRESETS["streamlit"])
+    for _, question_text, table in tables:
+        return table, question_text
+    return None, None
@@ -6,37 +6,16 @@ import io
 import re
 import streamlit as st
 
-# ✅ 유의성 별 부여 함수
-def assign_significance_stars(p_value):
-    if p_value < 0.001:
-        return "***"
-    elif p_value < 0.01:
-        return "**"
-    elif p_value < 0.05:
-        return "*"
-    else:
-        return ""
-
-# ✅ DEMO 매핑 추출 함수
-def extract_demo_mapping_from_dataframe(df, column="Unnamed: 0"):
-    col = df[column].dropna().astype(str).reset_index(drop=True)
-    cut_idx = None
-    for i, val in enumerate(col):
-        if val.strip() == 'DEMO1':
-            cut_idx = i
-            break
-    sliced = col[:cut_idx] if cut_idx is not None else col
-
-    demo_dict = {}
-    for entry in sliced:
-        entry = str(entry).strip()
-        match = re.match(r"(DEMO\d+)[\s'\"]+(.+?)['\"\s\.]*$", entry)
-        if match:
-            key = match.group(1)
-            label = match.group(2).strip()
-            demo_dict[key] = label
-
-    return demo_dict
+from raw_data_session import get_raw_data_session, extract_demo_mapping_from_dataframe
+from table_analysis_stat_engine import (
+    assign_significance_stars,
+    factorize_column,
+    factorize_demo_columns,
+    grouped_ft_test,
+    grouped_chi_square,
+    statistics_matrix_notes,
+    statistics_matrix_result,
+)
 
 # ✅ 자연어 요약 생성 함수
 def summarize_ft_test(result_df: pd.DataFrame, lang: str = "한국어") -> str:
@@ -61,83 +40,97 @@ def summarize_ft_test(result_df: pd.DataFrame, lang: str = "한국어") -> str:
 
     return "  ".join(summary)
 
-def run_statistical_tests(test_type, df, question_key, demo_dict):
-    # ✅ F/T-test 실행 함수
+# ✅ chi-square 에서 검정하지 못한 DEMO 안내 (문항별 계산 / 통계 매트릭스 조회 공통)
+def report_skipped_demo(demo_col: str, label: str, note: str):
+    if note == "missing_demo":
+        st.warning(f"❌ DEMO 컬럼 누락: {demo_col}")
+    elif note == "unorderable_demo":
+        st.error(f"❌ Chi-square 실패: {label} / DEMO 값을 정렬할 수 없습니다.")
+    elif note == "too_small":
+        st.info(f"⚠️ 스킵됨: {label} - 교차표 크기 부족")
+
+def run_statistical_tests(test_type, df, question_key, demo_dict, session=None):
+    # ✅ F/T-test 실행 함수 (모든 DEMO 컬럼을 한 번에 계산하는 벡터화 엔진 사용)
     def run_ft_test_df(df: pd.DataFrame, question_key: str, demo_dict: dict) -> pd.DataFrame:
         question_key = question_key.replace("-", "_").strip()
-        rows = []
-
-        for demo_col, label in demo_dict.items():
-            if demo_col not in df.columns:
-                continue
+        if question_key not in df.columns:
+            return pd.DataFrame([])
 
-            try:
-                groups = df.groupby(demo_col)[question_key].apply(list)
-                group_values = [pd.Series(values).dropna().tolist() for values in groups]
+        # 세션이 있으면 수치 변환 / DEMO 코드화 결과를 재사용
+        if session is not None and session.raw_data is df:
+            values = session.column_values(question_key)
+            demo_codes = session.demo_codes()
+        else:
+            values = pd.to_numeric(df[question_key], errors="coerce").to_numpy(dtype=np.float64)
+            demo_codes = factorize_demo_columns(df, demo_dict)
 
-                if len(group_values) < 2:
-                    continue
+        engine_result = grouped_ft_test(values, demo_codes).set_index("demo_col")
 
-                levene_stat, levene_p = stats.levene(*group_values)
-
-                if len(group_values) == 2:
-                    test_stat, test_p = stats.ttest_ind(
-                        group_values[0], group_values[1],
-                        equal_var=(levene_p > 0.05)
-                    )
-                else:
-                    test_stat, test_p = stats.f_oneway(*group_values)
-
-                row = {
-                    "대분류": label,
-                    "통계량": round(abs(test_stat), 3),
-                    "p-value": round(test_p, 4),
-                    "유의성": assign_significance_stars(test_p)
-                }
-                rows.append(row)
-
-            except Exception:
+        rows = []
+        for demo_col, label in demo_dict.items():
+            if demo_col not in engine_result.index:
                 continue
+            test_stat = engine_result.at[demo_col, "statistic"]
+            test_p = engine_result.at[demo_col, "p_value"]
+            rows.append({
+                "대분류": label,
+                "통계량": round(abs(test_stat), 3),
+                "p-value": round(test_p, 4),
+                "유의성": assign_significance_stars(test_p)
+            })
 
         result_df = pd.DataFrame(rows)
         return result_df
     
-    # Chi-square 실행 함수
+    # Chi-square 실행 함수 (교차표를 한 번의 bincount 로 만드는 벡터화 엔진 사용)
     def run_chi_square_test_df(df: pd.DataFrame, question_key: str, demo_dict: dict) -> pd.DataFrame:
         question_key = question_key.replace("-", "_").strip()
-        if question_key not in [col.replace("-", "_").strip() for col in df.columns]:
+        normalized_columns = {str(col).replace("-", "_").strip(): col for col in df.columns}
+        if question_key not in normalized_columns:
             st.error(f"❌ 질문 항목 '{question_key}' 이(가) 데이터에 존재하지 않습니다.")
             return pd.DataFrame([])
 
+        if session is not None and session.raw_data is df:
+            demo_codes = session.demo_codes()
+        else:
+            demo_codes = factorize_demo_columns(df, demo_dict)
+        try:
+            question_codes = {question_key: factorize_column(df[normalized_columns[question_key]])}
+            engine_result = grouped_chi_square(question_codes, demo_codes).set_index("demo_col")
+            engine_error = None
+        except Exception as e:
+            # ✅ 문항 컬럼을 정렬할 수 없으면(혼합 타입 등) 모든 DEMO 가 같은 이유로 실패 → DEMO 별 오류로 표시
+            engine_result, engine_error = None, str(e)
+
         rows = []
 
         for demo_col, label in demo_dict.items():
             if demo_col not in df.columns:
-                st.warning(f"❌ DEMO 컬럼 누락: {demo_col}")
+                report_skipped_demo(demo_col, label, "missing_demo")
                 continue
 
-            try:
-                normalized_columns = {col.replace("-", "_").strip(): col for col in df.columns}
-                contingency_table = pd.crosstab(df[demo_col], df[normalized_columns[question_key]])
-
-                if contingency_table.shape[0] < 2 or contingency_table.shape[1] < 2:
-                    st.info(f"⚠️ 스킵됨: {label} - 교차표 크기 부족")
-                    continue
-
-                chi2, p, dof, expected = stats.chi2_contingency(contingency_table)
+            if engine_result is None:
+                st.error(f"❌ Chi-square 실패: {label} / {engine_error}")
+                continue
 
-                row = {
-                    "대분류": label,
-                    "통계량": round(chi2, 3),
-                    "p-value": round(p, 4),
-                    "유의성": assign_significance_stars(p)
-                }
-                rows.append(row)
+            if demo_col not in engine_result.index:
+                report_skipped_demo(demo_col, label, "unorderable_demo")
+                continue
 
-            except Exception as e:
-                st.error(f"❌ Chi-square 실패: {label} / {str(e)}")
+            result = engine_result.loc[demo_col]
+            if result["n_rows"] < 2 or result["n_cols"] < 2:
+                report_skipped_demo(demo_col, label, "too_small")
                 continue
 
+            chi2, p = result["statistic"], result["p_value"]
+            row = {
+                "대분류": label,
+                "통계량": round(chi2, 3),
+                "p-value": round(p, 4),
+                "유의성": assign_significance_stars(p)
+            }
+            rows.append(row)
+
         return pd.DataFrame(rows)
     
     # ✅ 임의(수기) 분석 함수
@@ -199,7 +192,7 @@ def run_statistical_tests(test_type, df, question_key, demo_dict):
 def ft_star_analysis_node_fn(state: dict) -> dict:
     try:
 
-        raw_data_file = state["raw_data_file"]
+        raw_data_file = state.get("raw_data_file")
         normalized_key = state["selected_key"].replace("-", "_").strip()
         test_type = state["test_type"]
         if "user_analysis_plan" in state:
@@ -213,18 +206,26 @@ def ft_star_analysis_node_fn(state: dict) -> dict:
 
         with st.spinner("🔍 F/T 분석 진행 중..." if lang == "한국어" else "🔍 Running F/T analysis..."):
 
-            raw_data = pd.read_excel(raw_data_file, sheet_name="DATA")
-            demo_df = pd.read_excel(raw_data_file, sheet_name="DEMO")
-
-            # ✅ 컬럼명 정규화: '-' → '_', 그리고 양쪽 공백 제거
-            raw_data.columns = [col.replace("-", "_").strip() for col in raw_data.columns]
-
-            demo_mapping = extract_demo_mapping_from_dataframe(demo_df)
-
-            result_df = run_statistical_tests(test_type = test_type,
-                                            df = raw_data,
-                                            question_key=question_key,
-                                            demo_dict=demo_mapping)
+            # ✅ DATA / DEMO 시트는 batch 전체에서 한 번만 로딩 (컬럼명 정규화, DEMO 매핑 포함)
+            session = state.get("raw_data_session") or get_raw_data_session(raw_data_file)
+            raw_data = session.raw_data
+            demo_mapping = session.demo_mapping
+
+            # ✅ 업로드 단위로 미리 계산된 통계 매트릭스가 있으면 재계산 없이 조회
+            result_df = None
+            statistics_matrix = state.get("statistics_matrix")
+            if statistics_matrix is not None:
+                result_df = statistics_matrix_result(statistics_matrix, question_key, test_type)
+                if result_df is not None:
+                    for demo_col, label, note in statistics_matrix_notes(statistics_matrix, question_key, test_type):
+                        report_skipped_demo(demo_col, label, note)
+
+            if result_df is None:
+                result_df = run_statistical_tests(test_type = test_type,
+                                                df = raw_data,
+                                                question_key=question_key,
+                                                demo_dict=demo_mapping,
+                                                session=session)
 
             # ✅ Streamlit 출력
             st.markdown("### ✅ F/T 검정 결과" if lang == "한국어" else "### ✅ F/T Test Results")
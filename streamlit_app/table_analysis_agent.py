@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 from dotenv import load_dotenv
@@ -11,7 +11,7 @@ load_dotenv()
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o", temperature=0.3, openai_api_key=api_key)
+llm = get_llm(model="gpt-4o", temperature=0.3, openai_api_key=api_key)
 
 TABLE_ANALYSIS_PROMPT = {
     "한국어": """
@@ -100,7 +100,7 @@ Let's think step by step.
 """
 }
 
-def streamlit_table_anaylsis_node_fn(state):
+def _table_analysis_prompt(state) -> str:
     st.info("✅ [Table Analysis Agent] Start table analyzing")
 
     linearized_table = state["linearized_table"]
@@ -111,18 +111,17 @@ def streamlit_table_anaylsis_node_fn(state):
     anchor = state.get("anchor", "없음")  # fallback
     lang = state.get("lang", "한국어")
 
-    with st.spinner("LLM 분석 중..."):
-        prompt = TABLE_ANALYSIS_PROMPT[lang].format(
-            selected_question=selected_question,
-            linearized_table=linearized_table,
-            ft_test_summary=str(ft_test_summary),
-            generated_hypotheses=generated_hypotheses,
-            anchor=anchor
-        )
-
-        response = llm.invoke(prompt)
-        table_analysis = response.content.strip()
+    return TABLE_ANALYSIS_PROMPT[lang].format(
+        selected_question=selected_question,
+        linearized_table=linearized_table,
+        ft_test_summary=str(ft_test_summary),
+        generated_hypotheses=generated_hypotheses,
+        anchor=anchor
+    )
 
+def _table_analysis_result(state, response):
+    lang = state.get("lang", "한국어")
+    table_analysis = response.content.strip()
 
     # ✅ Table Analysis 출력
     st.success("생성된 보고서 초안:" if lang == "한국어" else "Drafted Analysis Report:")
@@ -131,4 +130,17 @@ def streamlit_table_anaylsis_node_fn(state):
 
     return {**state, "table_analysis": table_analysis}
 
-streamlit_table_anaylsis_node = RunnableLambda(streamlit_table_anaylsis_node_fn)
\ No newline at end of file
+def streamlit_table_anaylsis_node_fn(state):
+    prompt = _table_analysis_prompt(state)
+    with st.spinner("LLM 분석 중..."):
+        response = llm.invoke(prompt)
+    return _table_analysis_result(state, response)
+
+# ✅ async graph(ainvoke)용 — LLM 응답을 기다리는 동안 event loop 를 막지 않음
+async def streamlit_table_anaylsis_node_afn(state):
+    prompt = _table_analysis_prompt(state)
+    with st.spinner("LLM 분석 중..."):
+        response = await llm.ainvoke(prompt)
+    return _table_analysis_result(state, response)
+
+streamlit_table_anaylsis_node = RunnableLambda(streamlit_table_anaylsis_node_fn, afunc=streamlit_table_anaylsis_node_afn)
@@ -54,7 +54,7 @@ import openai
 import streamlit as st
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 # ✅ 환경 변수 로드 및 API 키 설정
@@ -62,7 +62,7 @@ load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
 # ✅ LLM 설정
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.0)
+llm = get_llm(model="gpt-4o-mini", temperature=0.0)
 
 
 TEST_TYPE_PROMPT = """
@@ -112,8 +112,10 @@ def normalize_test_type(llm_output: str) -> str:
     else:
         return "unknown"
 
-def streamlit_test_type_decision_fn(state):
-    lang = state.get("lang", "한국어")
+def _test_type_shortcut(state):
+    """
+    LLM 호출 없이 결정 가능한 경우 (rule 기반 manual / 사용자 선택 / batch override) 결과 state, 아니면 None
+    """
     selected_table = state["selected_table"]
 
     IGNORE_COLUMNS = {"대분류", "소분류", "사례수", "row_name"}
@@ -135,6 +137,16 @@ def streamlit_test_type_decision_fn(state):
     if isinstance(user_decision, dict) and user_decision.get("test_type") in ["ft_test", "chi_square"]:
         return {**state, "test_type": user_decision["test_type"]}
 
+    # batch 모드에서 app 이 미리 결정한 검정 방법이 있으면 LLM 재호출 없이 사용
+    if state.get("test_type_override") in ["ft_test", "chi_square"]:
+        return {**state, "test_type": state["test_type_override"]}
+
+    return None
+
+def _test_type_prompt(state) -> str:
+    lang = state.get("lang", "한국어")
+    IGNORE_COLUMNS = {"대분류", "소분류", "사례수", "row_name"}
+    filtered_columns = [col for col in state["selected_table"].columns if col not in IGNORE_COLUMNS]
     column_names_str = ", ".join(filtered_columns)
 
     prompt = TEST_TYPE_PROMPT.format(
@@ -143,13 +155,10 @@ def streamlit_test_type_decision_fn(state):
 
     if state.get("analysis_type", True):
         st.info("🤖 LLM에게 적절한 통계 검정 방식을 문의합니다..." if lang == "한국어" else "🤖 Asking the LLM to determine the appropriate statistical test...")
+    return prompt
 
-    if state.get("analysis_type", True):
-        with st.spinner("LLM 판단 중..." if lang == "한국어" else "Determining test type..."):
-            response = llm.invoke(prompt)
-    else:
-        response = llm.invoke(prompt)
-
+def _test_type_result(state, response):
+    lang = state.get("lang", "한국어")
     test_type = response.content.strip()
     test_type = normalize_test_type(test_type)
 
@@ -161,5 +170,36 @@ def streamlit_test_type_decision_fn(state):
         "test_type": test_type
     }
 
+def streamlit_test_type_decision_fn(state):
+    lang = state.get("lang", "한국어")
+    shortcut = _test_type_shortcut(state)
+    if shortcut is not None:
+        return shortcut
+
+    prompt = _test_type_prompt(state)
+    if state.get("analysis_type", True):
+        with st.spinner("LLM 판단 중..." if lang == "한국어" else "Determining test type..."):
+            response = llm.invoke(prompt)
+    else:
+        response = llm.invoke(prompt)
+
+    return _test_type_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_test_type_decision_afn(state):
+    lang = state.get("lang", "한국어")
+    shortcut = _test_type_shortcut(state)
+    if shortcut is not None:
+        return shortcut
+
+    prompt = _test_type_prompt(state)
+    if state.get("analysis_type", True):
+        with st.spinner("LLM 판단 중..." if lang == "한국어" else "Determining test type..."):
+            response = await llm.ainvoke(prompt)
+    else:
+        response = await llm.ainvoke(prompt)
+
+    return _test_type_result(state, response)
+
 
-streamlit_test_type_decision_node = RunnableLambda(streamlit_test_type_decision_fn)
\ No newline at end of file
+streamlit_test_type_decision_node = RunnableLambda(streamlit_test_type_decision_fn, afunc=streamlit_test_type_decision_afn)
\ No newline at end of file
@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import streamlit as st
+
+from dotenv import load_dotenv
+from llm_gateway import get_llm
+from significance_verifier import verify_significance
+from langchain_core.runnables import RunnableLambda
+
+load_dotenv()
+api_key = os.getenv("OPENAI_API_KEY")
+
+# ✅ 가설 / 초안 / 자기 검증 / 다듬기를 한 번의 structured output 호출로 생성 (JSON schema 강제)
+FUSED_ANALYSIS_SCHEMA = {
+    "name": "table_analysis_report",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "hypotheses": {"type": "array", "items": {"type": "string"}},
+            "draft": {"type": "string"},
+            "self_check": {
+                "type": "object",
+                "properties": {
+                    "decision": {"type": "string", "enum": ["accept", "reject"]},
+                    "issues": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["decision", "issues"],
+                "additionalProperties": False,
+            },
+            "final_summary": {"type": "string"},
+        },
+        "required": ["hypotheses", "draft", "self_check", "final_summary"],
+        "additionalProperties": False,
+    },
+}
+
+llm = get_llm(
+    model="gpt-4o",
+    temperature=0.3,
+    openai_api_key=api_key,
+    model_kwargs={"response_format": {"type": "json_schema", "json_schema": FUSED_ANALYSIS_SCHEMA}},
+)
+
+FUSED_ANALYSIS_PROMPT = {
+    "한국어": """
+당신은 통계 데이터를 바탕으로 인구집단 간 경향을 요약하는 데이터 분석 전문가입니다.
+아래 정보를 바탕으로 네 단계를 순서대로 수행하고, 결과를 JSON 하나로만 출력하세요.
+
+📝 설문 조사 질문:
+{selected_question}
+
+📊 표 데이터 (선형화된 형태):
+{linearized_table}
+
+📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
+{anchor}
+
+📈 통계 분석 결과 (F/T-test, 통계적으로 유의미한 대분류):
+{ft_test_summary}
+
+---
+
+1️⃣ hypotheses: 질문과 관련해 데이터에서 확인할 수 있을 법한 가설 2~5개 (짧은 문장, 외부 지식 금지)
+
+2️⃣ draft: 보고서 초안
+- 통계적으로 유의미한 대분류(유의성 별 존재)만 중심으로 분석하고, 유의성이 없거나 검정에서 제외된 대분류는 언급하지 말 것
+  (유의미한 대분류가 없으면 p-value 가 작은 대분류 중 주요 항목과 관련된 대분류만 언급)
+- 모든 소분류를 나열하지 말고 특징적인 그룹과 주요 차이만 서술할 것
+- 인과 해석, 외부 배경지식, 주관적 추론 금지 — 표에서 확인 가능한 사실만 서술
+- 숫자값을 직접 쓰지 말고 상대적인 경향만 음슴체로 서술할 것 (예: ~했음, ~로 나타났음)
+
+3️⃣ self_check: 초안 검증
+- 유의미한 대분류가 모두 언급되었는지, 그룹 간 높고 낮음이 표와 일치하는지 확인
+- 모두 맞으면 decision "accept", 수정할 수 없는 왜곡이 남아 있으면 "reject" 와 issues 에 이유 기록
+
+4️⃣ final_summary: 검증에서 찾은 문제를 고치고 문장을 다듬은 최종 요약
+- 내용 추가 / 삭제 없이 단절적인 문장(~했음. ~했음. 반복)과 중복 표현을 연결어로 자연스럽게 정리
+- 제목, 불릿, 리스트 없이 서술형, 음슴체 유지
+
+📝 출력 형식 (JSON 만 출력):
+{{"hypotheses": ["..."], "draft": "...", "self_check": {{"decision": "accept", "issues": []}}, "final_summary": "..."}}
+""",
+    "English": """
+You are a data analyst summarizing trends across population groups based on statistical data.
+Perform the four steps below in order and output a single JSON object only.
+
+📝 Survey Question:
+{selected_question}
+
+📊 Table Data (Linearized):
+{linearized_table}
+
+📈 Key Variables (most frequently selected):
+{anchor}
+
+📈 Statistical Test Results (F/T-test, significant groups):
+{ft_test_summary}
+
+---
+
+1️⃣ hypotheses: 2 to 5 short hypotheses relevant to the question that could be checked in the data (no external knowledge)
+
+2️⃣ draft: draft report
+- Focus only on statistically significant categories (marked with asterisks); do not mention non-significant or excluded categories
+  (if none are significant, mention only categories with small p-values related to the key variables)
+- Do not list all subgroups; highlight only characteristic groups and major differences
+- No causal interpretation, external knowledge or speculation — describe only facts verifiable from the table
+- Avoid exact numbers; describe relative tendencies only
+
+3️⃣ self_check: verify the draft
+- Check that every significant category is mentioned and that higher/lower claims match the table
+- If everything is correct, decision "accept"; if a distortion remains that cannot be fixed, "reject" with the reasons in issues
+
+4️⃣ final_summary: the final summary with the issues fixed and the sentences polished
+- No additions or deletions; connect choppy or repetitive sentences with natural transitions
+- Narrative form without titles, bullets or lists
+
+📝 Output format (JSON only):
+{{"hypotheses": ["..."], "draft": "...", "self_check": {{"decision": "accept", "issues": []}}, "final_summary": "..."}}
+"""
+}
+
+def _fused_prompt(state) -> str:
+    lang = state.get("lang", "한국어")
+    if state.get("analysis_type", True):
+        st.info("✅ [Fused Analysis Agent] 가설 / 분석 / 검증 / 다듬기 단일 호출" if lang == "한국어" else "✅ [Fused Analysis Agent] Hypotheses / analysis / check / polish in one call")
+    return FUSED_ANALYSIS_PROMPT[lang].format(
+        selected_question=state["selected_question"],
+        linearized_table=state["linearized_table"],
+        anchor=state.get("anchor", "없음"),
+        ft_test_summary=str(state.get("ft_test_summary", "")),
+    )
+
+def parse_fused_response(content: str) -> dict:
+    """
+    JSON 응답을 FUSED_ANALYSIS_SCHEMA 기준으로 검사 — schema 위반이면 ValueError
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON 파싱 실패: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("JSON object 가 아님")
+
+    missing = [key for key in FUSED_ANALYSIS_SCHEMA["schema"]["required"] if key not in payload]
+    if missing:
+        raise ValueError(f"필수 필드 누락: {missing}")
+    hypotheses, self_check = payload["hypotheses"], payload["self_check"]
+    if not isinstance(hypotheses, list) or not all(isinstance(item, str) for item in hypotheses):
+        raise ValueError("hypotheses 는 문자열 목록이어야 함")
+    for key in ("draft", "final_summary"):
+        if not isinstance(payload[key], str) or not payload[key].strip():
+            raise ValueError(f"{key} 가 비어 있음")
+    if not isinstance(self_check, dict) or self_check.get("decision") not in ("accept", "reject") \
+            or not isinstance(self_check.get("issues", []), list):
+        raise ValueError("self_check 형식 오류")
+    return payload
+
+def _validate_fused(state, payload: dict):
+    """
+    schema 는 맞지만 결과를 그대로 쓸 수 없는 경우의 이유, 문제 없으면 None
+    """
+    if payload["self_check"]["decision"] == "reject":
+        return "self_check reject: " + "; ".join(map(str, payload["self_check"].get("issues", [])))
+    verdict = verify_significance(payload["final_summary"], state.get("ft_test_result"), state.get("selected_table"),
+                                  anchor=state.get("anchor"), lang=state.get("lang", "한국어"))
+    if verdict["decision"] == "reject":
+        return "significance check reject: " + verdict["feedback"]
+    return None
+
+def _fused_result(state, response):
+    lang = state.get("lang", "한국어")
+    try:
+        payload = parse_fused_response(response.content)
+        error = _validate_fused(state, payload)
+    except ValueError as e:
+        payload, error = None, str(e)
+
+    # ✅ schema / 검증 실패 → multi-agent 경로(가설 생성부터)로 fallback
+    if error is not None:
+        print(f"⚠️ fused 분석 실패, multi-agent 경로로 전환: {error}")
+        if state.get("analysis_type", True):
+            st.warning(f"⚠️ 단일 호출 결과를 사용할 수 없어 단계별 분석으로 전환합니다: {error}" if lang == "한국어" else f"⚠️ Falling back to the step-by-step analysis: {error}")
+        return {**state, "fused_analysis": {"status": "fallback", "error": error}}
+
+    hypotheses = "\n".join(f"{i}. {item}" for i, item in enumerate(payload["hypotheses"], 1))
+    polishing_result = payload["final_summary"].strip()
+    if state.get("analysis_type") is False:
+        st.success(f"✅ '{state['selected_key']}' 보고서 분석 완료")
+    else:
+        st.markdown("### ✅ 생성된 가설" if lang == "한국어" else "### ✅ Generated Hypotheses")
+        st.markdown(hypotheses)
+        st.success("🎉 다듬어진 최종 요약문:" if lang == "한국어" else "🎉 Polished Final Summary:")
+        st.text(polishing_result)
+
+    return {
+        **state,
+        "generated_hypotheses": hypotheses,
+        "table_analysis": payload["draft"].strip(),
+        "hallucination_check": "accept",
+        "feedback": "",
+        "polishing_result": polishing_result,
+        "fused_analysis": {"status": "ok", "self_check_issues": payload["self_check"].get("issues", [])},
+    }
+
+def streamlit_fused_analysis_fn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _fused_prompt(state)
+    if state.get("analysis_type", True):
+        with st.spinner("LLM 분석 중..." if lang == "한국어" else "LLM is analyzing..."):
+            response = llm.invoke(prompt)
+    else:
+        response = llm.invoke(prompt)
+    return _fused_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_fused_analysis_afn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _fused_prompt(state)
+    if state.get("analysis_type", True):
+        with st.spinner("LLM 분석 중..." if lang == "한국어" else "LLM is analyzing..."):
+            response = await llm.ainvoke(prompt)
+    else:
+        response = await llm.ainvoke(prompt)
+    return _fused_result(state, response)
+
+streamlit_fused_analysis_node = RunnableLambda(streamlit_fused_analysis_fn, afunc=streamlit_fused_analysis_afn)
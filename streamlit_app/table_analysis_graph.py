@@ -1,7 +1,9 @@
+import os
+
 from h11 import Data
 from langgraph.graph import StateGraph, END
 from typing import Annotated, TypedDict, IO, Dict
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.graph.message import add_messages
 from pandas import DataFrame
 
@@ -15,6 +17,11 @@ from table_analysis_hypothesis_generation import streamlit_hypothesis_generate_n
 from table_analysis_FT_Star_analysis import streamlit_ft_star_analysis_node
 from table_analysis_decision_test_type import streamlit_test_type_decision_node
 from table_analysis_get_anchor import get_anchor_node
+from table_analysis_fused_agent import streamlit_fused_analysis_node
+from graph_tracing import trace_node, trace_graph
+
+# ✅ "fused": 가설 / 분석 / 검증 / 다듬기를 한 번의 LLM 호출로 처리 (실패 시 multi-agent 경로로 fallback)
+TABLE_GRAPH_MODE = os.getenv("TABLE_GRAPH_MODE", "multi_agent")
 
 class AgentState(TypedDict):
     query: Annotated[str,"User input query"]
@@ -33,13 +40,17 @@ class AgentState(TypedDict):
     numeric_anaylsis: Annotated[str, "Numeric analysis results"]
 
     table_analysis: Annotated[str, "Final table analysis result"]
-    revised_analysis: Annotated[str, add_messages]
+    revised_analysis: Annotated[str, "Revised analysis by revision LLM"]
+    revised_analysis_history: Annotated[list[str], "Checked / revised drafts in order (last one is checked next)"]
 
     hallucination_check: Annotated[str, "table_analysis hallucination_check"]
     hallucination_reject_num: Annotated[int, "Number of hallucination rejections"]
+    revision_loop: Annotated[dict, "revision_loop 통계 (검증 / revision 횟수, 토큰, 비용, stop_reason)"]
+    significance_check: Annotated[dict, "규칙 기반 유의성 검증 결과 (decision, feedback, issues, notes)"]
     feedback: Annotated[str, "LLM feedback"]
 
     polishing_result: Annotated[str, "Final sentence polishing step output"]
+    fused_analysis: Annotated[dict, "fused 모드 단일 호출 결과 (status: ok / fallback, error)"]
 
     generated_hypotheses: Annotated[str, "Generated hypothesis for table"]
 
@@ -47,39 +58,78 @@ class AgentState(TypedDict):
     raw_data_file: Annotated[IO[bytes], "Streamlit Uploaded Raw Data File (file-like object)"]
 
     raw_data: Annotated[DataFrame, "Raw DATA sheet DataFrame"]
+    raw_data_session: Annotated[object, "RawDataSession shared by every question of an upload"]
     raw_variables: Annotated[DataFrame, "변수 sheet DataFrame"]
     raw_code_guide: Annotated[DataFrame, "코딩가이드 sheet DataFrame"]
     raw_question: Annotated[DataFrame, "문항 sheet DataFrame"]
 
     test_type: Annotated[str, "F/T or 카이 스퀘어 검정 방법 선택 결과"]
+    test_type_override: Annotated[str, "batch 모드에서 미리 결정된 검정 방법 (ft_test / chi_square)"]
+    statistics_matrix: Annotated[DataFrame, "업로드 단위로 미리 계산된 (문항 × DEMO) 통계 매트릭스"]
     ft_test_result: Annotated[Dict[str, str], "F/T 검정 결과 dict (e.g. {'성별': '...결과'})"]
     ft_test_summary: Annotated[str, "F/T 검정 결과 자연어 형식"]
 
     lang: Annotated[str, "선택 언어 (한국어 또는 English)"]
 
-def build_table_graph() -> Runnable:
+def _inline_async_node(node: RunnableLambda) -> RunnableLambda:
+    """
+    async 구현이 없는 (LLM 을 호출하지 않는) 노드를 event loop 스레드에서 그대로 실행
+    → 기본 동작(스레드 풀 실행)과 달리 Streamlit ScriptRunContext 가 유지됨
+    """
+    if getattr(node, "afunc", None) is not None:
+        return node
+    func = node.func
+
+    async def afunc(state):
+        return func(state)
+
+    return RunnableLambda(func, afunc=afunc)
+
+def build_table_graph(async_mode: bool = False, fused: bool = None) -> Runnable:
     builder = StateGraph(state_schema=AgentState)
+    # ✅ async_mode: graph.ainvoke 전용 — LLM 노드는 llm.ainvoke, 나머지 노드는 event loop 스레드에서 실행
+    node = _inline_async_node if async_mode else (lambda runnable: runnable)
+    fused = TABLE_GRAPH_MODE == "fused" if fused is None else fused
+    graph_name = "table_analysis_fused" if fused else "table_analysis"
+
+    # ✅ 모든 노드는 실행 시간 / 토큰 / 캐시 hit 을 span 으로 기록 (graph_tracing)
+    def add_node(name, runnable):
+        builder.add_node(name, trace_node(graph_name, name, node(runnable)))
 
     # ✅ 노드 정의
-    builder.add_node("table_parser", streamlit_table_parser_node)
-    builder.add_node("hypothesis_generate_node", streamlit_hypothesis_generate_node)
-    builder.add_node("table_analyzer", streamlit_table_anaylsis_node)
-    builder.add_node("hallucination_check_node", streamlit_hallucination_check_node)
-    builder.add_node("revise_table_analysis", streamlit_revise_table_analysis_node)
-    builder.add_node("sentence_polish_node", streamlit_sentence_polish_node)
-    builder.add_node("FT_anlysis_node", streamlit_ft_star_analysis_node)
-    builder.add_node("test_decision_node", streamlit_test_type_decision_node)
-    builder.add_node("get_anchor_node", get_anchor_node)
+    add_node("table_parser", streamlit_table_parser_node)
+    add_node("hypothesis_generate_node", streamlit_hypothesis_generate_node)
+    add_node("table_analyzer", streamlit_table_anaylsis_node)
+    add_node("hallucination_check_node", streamlit_hallucination_check_node)
+    add_node("revise_table_analysis", streamlit_revise_table_analysis_node)
+    add_node("sentence_polish_node", streamlit_sentence_polish_node)
+    add_node("FT_anlysis_node", streamlit_ft_star_analysis_node)
+    add_node("test_decision_node", streamlit_test_type_decision_node)
+    add_node("get_anchor_node", get_anchor_node)
 
     # ✅ Entry Point
     builder.set_entry_point("table_parser")
 
     # ✅ Graph Flow
-    builder.add_edge("table_parser", "hypothesis_generate_node")
-    builder.add_edge("hypothesis_generate_node", "test_decision_node")
-    builder.add_edge("test_decision_node", "FT_anlysis_node")
-    builder.add_edge("FT_anlysis_node", "get_anchor_node")
-    builder.add_edge("get_anchor_node", "table_analyzer")
+    if fused:
+        # 검정 / 통계 분석을 먼저 수행한 뒤 단일 호출, schema·검증 실패 시에만 가설 생성부터 multi-agent 경로 실행
+        add_node("fused_analysis_node", streamlit_fused_analysis_node)
+        builder.add_edge("table_parser", "test_decision_node")
+        builder.add_edge("test_decision_node", "FT_anlysis_node")
+        builder.add_edge("FT_anlysis_node", "get_anchor_node")
+        builder.add_edge("get_anchor_node", "fused_analysis_node")
+        builder.add_conditional_edges(
+            "fused_analysis_node",
+            lambda state: END if state.get("fused_analysis", {}).get("status") == "ok" else "hypothesis_generate_node",
+            [END, "hypothesis_generate_node"]
+        )
+        builder.add_edge("hypothesis_generate_node", "table_analyzer")
+    else:
+        builder.add_edge("table_parser", "hypothesis_generate_node")
+        builder.add_edge("hypothesis_generate_node", "test_decision_node")
+        builder.add_edge("test_decision_node", "FT_anlysis_node")
+        builder.add_edge("FT_anlysis_node", "get_anchor_node")
+        builder.add_edge("get_anchor_node", "table_analyzer")
     builder.add_edge("table_analyzer", "hallucination_check_node")
 
     def route_hallucination(state):
@@ -93,9 +143,11 @@ def build_table_graph() -> Runnable:
         if result == "accept":
             return "sentence_polish_node"
         elif result == "reject":
-            if reject_count >= 4:
+            # ✅ reject 횟수 / 토큰·비용·시간 예산 / 진전 없는 revision → revision_loop 가 stop_reason 기록
+            stop_reason = state.get("revision_loop", {}).get("stop_reason")
+            if stop_reason:
                 if is_interactive:
-                    st.warning("⚠️ Reject count exceeded. Forcing END.")
+                    st.warning(f"⚠️ Revision loop stopped ({stop_reason}). Forcing END.")
                 return "sentence_polish_node"
             return "revise_table_analysis"
         else:
@@ -110,4 +162,13 @@ def build_table_graph() -> Runnable:
     builder.add_edge("revise_table_analysis", "hallucination_check_node")
     builder.add_edge("sentence_polish_node", END)
 
-    return builder.compile()
\ No newline at end of file
+    return trace_graph(graph_name, builder.compile(), question_field="selected_key",
+                       revision_nodes=("revise_table_analysis",))
+
+def build_async_table_graph(fused: bool = None) -> Runnable:
+    """
+    여러 질문 / 여러 Streamlit 세션이 하나의 event loop 를 공유하도록 ainvoke 로 실행하는 graph
+        result = await build_async_table_graph().ainvoke(init_state)
+        result = await build_async_table_graph(fused=True).ainvoke(init_state)   # 단일 호출 모드
+    """
+    return build_table_graph(async_mode=True, fused=fused)
\ No newline at end of file
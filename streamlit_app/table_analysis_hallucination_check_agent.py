@@ -3,15 +3,19 @@ import openai
 import streamlit as st
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
+from revision_loop import before_check, after_check
 from langchain_core.runnables import RunnableLambda
 
 # ✅ 환경 변수 로드 및 API 키 설정
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-# ✅ LLM 설정
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=1.0, top_p = 0.9, openai_api_key=api_key)
+# ✅ LLM 설정 (검증은 같은 입력에 같은 판정이 나오도록 temperature 0)
+llm = get_llm(model="gpt-4o-mini", temperature=0.0, openai_api_key=api_key)
+
+# ✅ reject 가 이 횟수에 도달하면 더 이상 revision 하지 않음
+MAX_REJECTIONS = 4
 
 HALLUCINATION_CHECK_PROMPT = {
     "한국어": """
@@ -78,9 +82,7 @@ Please evaluate whether the summary accurately and consistently reflects the sta
 """
 }
 
-# ✅ LangGraph-compatible hallucination 체크 노드
-def streamlit_hallucination_check_node_fn(state):
-    hallucination_reject_num = state.get("hallucination_reject_num", 0)
+def _hallucination_check_prompt(state):
     lang = state.get("lang", "한국어")
     if state.get("analysis_type", True):
         st.info("✅ [Hallucination Check Agent] 환각 평가 시작" if lang == "한국어" else "✅ [Hallucination Check Agent] Start hallucination evaluation")
@@ -98,38 +100,91 @@ def streamlit_hallucination_check_node_fn(state):
         ft_test_summary=str(state["ft_test_summary"]),
         table_analysis=table_analysis
     )
+    return prompt, table_analysis
 
-    # ✅ LLM 호출
-    if state.get("analysis_type", True):
-        with st.spinner("Hallucination 평가 중..." if lang == "한국어" else "Evaluating hallucination..."):
-            response = llm.invoke(prompt)
-    else:
-        response = llm.invoke(prompt)
+def _hallucination_check_skipped(state, loop, decision, verdict):
+    """
+    revision_loop 가 LLM 없이 결정한 경우 — "accept" / "reject": 규칙 기반 유의성 검증, "stop": 직전 초안과 거의 동일
+    """
+    lang = state.get("lang", "한국어")
+    if decision == "stop":
+        if state.get("analysis_type", True):
+            st.warning("⚠️ 수정 결과가 이전 초안과 거의 같아 revision 을 종료합니다." if lang == "한국어" else "⚠️ The revision is nearly identical to the previous draft. Stopping revisions.")
+        return {**state, "hallucination_check": "reject", "revision_loop": loop, "significance_check": verdict}
+    return _hallucination_check_result(state, decision, verdict["feedback"], loop, verdict=verdict)
 
+def _parse_check_response(response):
     result = response.content.strip()
+    if result.lower().startswith("reject"):
+        return "reject", result[len("reject"):].strip(": ").strip()
+    return "accept", ""
+
+def _hallucination_check_result(state, decision, feedback, loop, response=None, verdict=None):
+    hallucination_reject_num = state.get("hallucination_reject_num", 0)
+    lang = state.get("lang", "한국어")
+    source = "LLM" if response is not None else ("규칙 검증" if lang == "한국어" else "Rule check")
 
     # ✅ 결과 해석 및 상태 업데이트
-    if result.lower().startswith("reject"):
-        decision = "reject"
-        feedback = result[len("reject"):].strip(": ").strip()
+    if decision == "reject":
         hallucination_reject_num += 1
         if state.get("analysis_type", True):
-            st.warning(f"❌ Hallucination Check 결과: {decision}" if lang == "한국어" else f"❌ Hallucination Check Result: {decision}")
-            st.info(f"💡 LLM 피드백: {feedback}" if lang == "한국어" else f"💡 LLM Feedback: {feedback}")
+            st.warning(f"❌ Hallucination Check 결과 ({source}): {decision}" if lang == "한국어" else f"❌ Hallucination Check Result ({source}): {decision}")
+            st.info(f"💡 {source} 피드백: {feedback}" if lang == "한국어" else f"💡 {source} Feedback: {feedback}")
         if "revised_analysis_history" not in state:
             state["revised_analysis_history"] = []
-        state["revised_analysis_history"].append(table_analysis)
+        state["revised_analysis_history"].append(loop["last_draft"])
     else:
-        decision = "accept"
         feedback = ""
         if state.get("analysis_type", True):
-            st.success(f"✅ Hallucination Check 결과: {decision}" if lang == "한국어" else f"✅ Hallucination Check Result: {decision}")
+            st.success(f"✅ Hallucination Check 결과 ({source}): {decision}" if lang == "한국어" else f"✅ Hallucination Check Result ({source}): {decision}")
+
+    loop = after_check(loop, decision, llm.model, response, hallucination_reject_num, MAX_REJECTIONS)
 
     return {
         **state,
         "hallucination_check": decision,
         "feedback": feedback,
-        "hallucination_reject_num": hallucination_reject_num
+        "hallucination_reject_num": hallucination_reject_num,
+        "revision_loop": loop,
+        "significance_check": verdict,
     }
 
-streamlit_hallucination_check_node = RunnableLambda(streamlit_hallucination_check_node_fn)
\ No newline at end of file
+# ✅ LangGraph-compatible hallucination 체크 노드
+def streamlit_hallucination_check_node_fn(state):
+    lang = state.get("lang", "한국어")
+    prompt, table_analysis = _hallucination_check_prompt(state)
+
+    # ✅ 규칙 기반 유의성 검증으로 accept / reject 가 확정되거나 진전 없는 revision 이면 LLM 호출 생략
+    loop, skipped, verdict = before_check(state, table_analysis)
+    if skipped is not None:
+        return _hallucination_check_skipped(state, loop, skipped, verdict)
+
+    # ✅ LLM 호출
+    if state.get("analysis_type", True):
+        with st.spinner("Hallucination 평가 중..." if lang == "한국어" else "Evaluating hallucination..."):
+            response = llm.invoke(prompt)
+    else:
+        response = llm.invoke(prompt)
+
+    decision, feedback = _parse_check_response(response)
+    return _hallucination_check_result(state, decision, feedback, loop, response=response, verdict=verdict)
+
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_hallucination_check_node_afn(state):
+    lang = state.get("lang", "한국어")
+    prompt, table_analysis = _hallucination_check_prompt(state)
+
+    loop, skipped, verdict = before_check(state, table_analysis)
+    if skipped is not None:
+        return _hallucination_check_skipped(state, loop, skipped, verdict)
+
+    if state.get("analysis_type", True):
+        with st.spinner("Hallucination 평가 중..." if lang == "한국어" else "Evaluating hallucination..."):
+            response = await llm.ainvoke(prompt)
+    else:
+        response = await llm.ainvoke(prompt)
+
+    decision, feedback = _parse_check_response(response)
+    return _hallucination_check_result(state, decision, feedback, loop, response=response, verdict=verdict)
+
+streamlit_hallucination_check_node = RunnableLambda(streamlit_hallucination_check_node_fn, afunc=streamlit_hallucination_check_node_afn)
\ No newline at end of file
@@ -3,13 +3,13 @@ import openai
 import streamlit as st
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, openai_api_key=api_key)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3, openai_api_key=api_key)
 
 HYPOTHESIS_PROMPT = {
     "한국어": """
@@ -49,7 +49,7 @@ Example:
 """
 }
 
-def streamlit_hypothesis_generate_fn(state):
+def _hypothesis_prompt(state) -> str:
     if state.get("analysis_type", True):
         st.info("✅ [Hypothesis Agent] Start hypothesis generation")
     selected_table = state["selected_table"]
@@ -90,19 +90,14 @@ def streamlit_hypothesis_generate_fn(state):
 
     lang = state.get("lang", "한국어")
 
-    # ✅ LLM 호출
-    prompt = HYPOTHESIS_PROMPT[lang].format(
+    return HYPOTHESIS_PROMPT[lang].format(
         row_names=row_names_str,
         column_names=column_names_str,
         selected_question=selected_question
     )
 
-    if state.get("analysis_type", True):
-        with st.spinner("Generating hypotheses..." if lang == "English" else "가설 생성 중..."):
-            response = llm.invoke(prompt)
-    else:
-        response = llm.invoke(prompt)
-
+def _hypothesis_result(state, response):
+    lang = state.get("lang", "한국어")
     hypotheses = response.content.strip()
 
     # ✅ Hypothesis 블록 → 바로 전체 출력
@@ -113,4 +108,30 @@ def streamlit_hypothesis_generate_fn(state):
 
     return {**state, "generated_hypotheses": hypotheses}
 
-streamlit_hypothesis_generate_node = RunnableLambda(streamlit_hypothesis_generate_fn)
\ No newline at end of file
+def streamlit_hypothesis_generate_fn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _hypothesis_prompt(state)
+
+    # ✅ LLM 호출
+    if state.get("analysis_type", True):
+        with st.spinner("Generating hypotheses..." if lang == "English" else "가설 생성 중..."):
+            response = llm.invoke(prompt)
+    else:
+        response = llm.invoke(prompt)
+
+    return _hypothesis_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_hypothesis_generate_afn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _hypothesis_prompt(state)
+
+    if state.get("analysis_type", True):
+        with st.spinner("Generating hypotheses..." if lang == "English" else "가설 생성 중..."):
+            response = await llm.ainvoke(prompt)
+    else:
+        response = await llm.ainvoke(prompt)
+
+    return _hypothesis_result(state, response)
+
+streamlit_hypothesis_generate_node = RunnableLambda(streamlit_hypothesis_generate_fn, afunc=streamlit_hypothesis_generate_afn)
\ No newline at end of file
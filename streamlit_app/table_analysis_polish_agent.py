@@ -3,13 +3,13 @@ import openai
 import streamlit as st
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, openai_api_key=api_key)
+llm = get_llm(model="gpt-4o-mini", temperature=0.3, openai_api_key=api_key)
 
 POLISHING_PROMPT = {
     "한국어": """
@@ -72,34 +72,53 @@ If the sentences are too choppy ("~했음. ~했음." repetition), redundant, or
 """
 }
 
-def streamlit_sentence_polish_fn(state):
+def _polish_prompt(state) -> str:
+    lang = state.get("lang", "한국어")
+    if state.get("analysis_type") is not False:
+        st.info("✅ [Polish Agent] 문장 다듬기 시작" if lang == "한국어" else "✅ [Polish Agent] Start sentence polishing")
+
+    # revision_loop 가 첫 reject 에서 멈추면 (예산 소진) 수정본 없이 초안을 다듬음
+    raw_summary = state.get("revised_analysis") or state["table_analysis"]
+    return POLISHING_PROMPT[lang].format(raw_summary=raw_summary)
+
+def _polish_result(state, response):
+    lang = state.get("lang", "한국어")
+    polishing_result = response.content.strip()
+
     if state.get("analysis_type") is False:
         # Skip UI rendering
-        lang = state.get("lang", "한국어")
-        hallucination_reject_num = state["hallucination_reject_num"]
-        raw_summary = state["table_analysis"] if hallucination_reject_num == 0 else state["revised_analysis"]
-        response = llm.invoke(POLISHING_PROMPT[lang].format(raw_summary=raw_summary))
-        polishing_result = response.content.strip()
         st.success(f"✅ '{state['selected_key']}' 보고서 분석 완료")
         print("✅ 전체 문장 다듬기 완료")
-        return {**state, "polishing_result": polishing_result}
     else:
-        lang = state.get("lang", "한국어")
-        st.info("✅ [Polish Agent] 문장 다듬기 시작" if lang == "한국어" else "✅ [Polish Agent] Start sentence polishing")
+        st.text("### ✅ 최종 보고서" if lang == "한국어" else "### ✅ Final Report")
+        st.success("🎉 다듬어진 최종 요약문:" if lang == "한국어" else "🎉 Polished Final Summary:")
+        st.text(polishing_result)
 
-        hallucination_reject_num = state["hallucination_reject_num"]
+    return {**state, "polishing_result": polishing_result}
 
-        raw_summary = state["table_analysis"] if hallucination_reject_num == 0 else state["revised_analysis"]
+def streamlit_sentence_polish_fn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _polish_prompt(state)
 
+    if state.get("analysis_type") is False:
+        response = llm.invoke(prompt)
+    else:
         with st.spinner("LLM이 문장을 다듬는 중..." if lang == "한국어" else "LLM is polishing the summary..."):
-            response = llm.invoke(POLISHING_PROMPT[lang].format(raw_summary=raw_summary))
+            response = llm.invoke(prompt)
 
-        polishing_result = response.content.strip()
+    return _polish_result(state, response)
 
-        st.text("### ✅ 최종 보고서" if lang == "한국어" else "### ✅ Final Report")
-        st.success("🎉 다듬어진 최종 요약문:" if lang == "한국어" else "🎉 Polished Final Summary:")
-        st.text(polishing_result)
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_sentence_polish_afn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _polish_prompt(state)
+
+    if state.get("analysis_type") is False:
+        response = await llm.ainvoke(prompt)
+    else:
+        with st.spinner("LLM이 문장을 다듬는 중..." if lang == "한국어" else "LLM is polishing the summary..."):
+            response = await llm.ainvoke(prompt)
 
-        return {**state, "polishing_result": polishing_result}
+    return _polish_result(state, response)
 
-streamlit_sentence_polish_node = RunnableLambda(streamlit_sentence_polish_fn)
\ No newline at end of file
+streamlit_sentence_polish_node = RunnableLambda(streamlit_sentence_polish_fn, afunc=streamlit_sentence_polish_afn)
\ No newline at end of file
@@ -2,13 +2,14 @@ import os
 import openai
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from llm_gateway import get_llm
+from revision_loop import after_revision
 from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, openai_api_key=api_key)
+llm = get_llm(model="gpt-4o-mini", temperature=0.7, openai_api_key=api_key)
 
 REVISION_PROMPT = {
     "한국어": """
@@ -95,8 +96,7 @@ Let's think step by step
 """
 }
 
-# ✅ LangGraph 노드 함수
-def streamlit_revise_table_analysis_fn(state):
+def _revision_prompt(state) -> str:
     lang = state.get("lang", "한국어")
     if state.get("analysis_type", True):
         st.info("✅ [Revision Agent] 테이블 분석 요약 수정 시작" if lang == "한국어" else "✅ [Revision Agent] Start table analysis revision")
@@ -104,7 +104,7 @@ def streamlit_revise_table_analysis_fn(state):
     # 📌 table_analysis는 revised_history가 있으면 마지막 것을, 없으면 초안을 fallback
     report_to_modify = state.get("revised_analysis_history", [state.get("table_analysis", "")])[-1]
 
-    prompt = REVISION_PROMPT[lang].format(
+    return REVISION_PROMPT[lang].format(
         linearized_table=state["linearized_table"],
         ft_test_summary=str(state["ft_test_summary"]),
         anchor=state["anchor"],
@@ -112,12 +112,8 @@ def streamlit_revise_table_analysis_fn(state):
         feedback=state["feedback"]
     )
 
-    if state.get("analysis_type", True):
-        with st.spinner("LLM이 수정 보고서를 작성 중..." if lang == "한국어" else "LLM is drafting the revised summary..."):
-            response = llm.invoke(prompt)
-    else:
-        response = llm.invoke(prompt)
-
+def _revision_result(state, response):
+    lang = state.get("lang", "한국어")
     new_revised_analysis = response.content.strip()
 
     # Append to revision history
@@ -132,8 +128,35 @@ def streamlit_revise_table_analysis_fn(state):
     return {
         **state,
         "revised_analysis": new_revised_analysis,
-        "revised_analysis_history": revision_history
+        "revised_analysis_history": revision_history,
+        "revision_loop": after_revision(state, llm.model, response),
     }
 
+# ✅ LangGraph 노드 함수
+def streamlit_revise_table_analysis_fn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _revision_prompt(state)
+
+    if state.get("analysis_type", True):
+        with st.spinner("LLM이 수정 보고서를 작성 중..." if lang == "한국어" else "LLM is drafting the revised summary..."):
+            response = llm.invoke(prompt)
+    else:
+        response = llm.invoke(prompt)
+
+    return _revision_result(state, response)
+
+# ✅ async graph(ainvoke)용 노드
+async def streamlit_revise_table_analysis_afn(state):
+    lang = state.get("lang", "한국어")
+    prompt = _revision_prompt(state)
+
+    if state.get("analysis_type", True):
+        with st.spinner("LLM이 수정 보고서를 작성 중..." if lang == "한국어" else "LLM is drafting the revised summary..."):
+            response = await llm.ainvoke(prompt)
+    else:
+        response = await llm.ainvoke(prompt)
+
+    return _revision_result(state, response)
+
 # ✅ LangGraph 노드 등록
-streamlit_revise_table_analysis_node = RunnableLambda(streamlit_revise_table_analysis_fn)
\ No newline at end of file
+streamlit_revise_table_analysis_node = RunnableLambda(streamlit_revise_table_analysis_fn, afunc=streamlit_revise_table_analysis_afn)
\ No newline at end of file
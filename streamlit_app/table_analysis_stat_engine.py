@@ -0,0 +1,387 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+'''
+DEMO 컬럼별 집단간 차이 검정을 NumPy 배열 연산으로 한 번에 계산하는 엔진입니다.
+
+- 각 DEMO 컬럼은 pd.factorize 로 정수 코드화 (NaN → -1, groupby 와 같은 정렬 순서)
+- 모든 DEMO 컬럼의 코드에 offset 을 더해 하나의 np.bincount 로 집단별 n / 합계 / 편차제곱합을 계산
+- Levene(중앙값 기준, scipy 기본값), Student/Welch t-test, One-way ANOVA 를 위 충분통계량으로부터 계산
+  → scipy.stats.levene / ttest_ind / f_oneway 와 수치 오차 범위 내에서 동일
+- Chi-square 는 (문항 × DEMO) 교차표 전체를 하나의 bincount 로 만든 뒤 벡터 연산으로 계산
+  → pd.crosstab + scipy.stats.chi2_contingency (2x2 Yates 보정 포함)와 동일
+'''
+
+# ✅ chi-square 한 번의 bincount 에 펼칠 최대 원소 수 (문항 chunk 크기 결정용)
+CHI_SQUARE_CHUNK_ELEMENTS = 4_000_000
+
+# ✅ 통계 매트릭스 계산 시 process pool 을 사용할 최소 규모 (문항 수 × 응답자 수)
+PROCESS_POOL_MIN_CELLS = 2_000_000
+
+# ✅ 유의성 별 부여 함수
+def assign_significance_stars(p_value):
+    if p_value < 0.001:
+        return "***"
+    elif p_value < 0.01:
+        return "**"
+    elif p_value < 0.05:
+        return "*"
+    else:
+        return ""
+
+def significance_stars(p_values: np.ndarray) -> np.ndarray:
+    p_values = np.asarray(p_values, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return np.select([p_values < 0.001, p_values < 0.01, p_values < 0.05], ["***", "**", "*"], default="")
+
+def factorize_column(series: pd.Series):
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes.astype(np.intp, copy=False), len(uniques)
+
+def factorize_demo_columns(df: pd.DataFrame, demo_cols) -> dict:
+    """
+    {demo_col: (codes, n_groups)} — 코드화할 수 없는 컬럼(혼합 타입 등)은 제외
+    """
+    demo_codes = {}
+    for demo_col in demo_cols:
+        if demo_col not in df.columns:
+            continue
+        try:
+            demo_codes[demo_col] = factorize_column(df[demo_col])
+        except Exception:
+            continue
+    return demo_codes
+
+def _segment_anova(n, sums, ssw, seg_starts, n_groups):
+    """
+    집단별 (n, 합계, 집단내 편차제곱합) 배열을 DEMO 구간별 One-way ANOVA F / p-value 로 변환
+    빈 집단이 있으면 scipy 와 같이 NaN 을 반환
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / n
+        total_n = np.add.reduceat(n, seg_starts)
+        grand_mean = np.add.reduceat(sums, seg_starts) / total_n
+        seg_ids = np.repeat(np.arange(len(seg_starts)), n_groups)
+        ssb = np.add.reduceat(n * (mean - grand_mean[seg_ids]) ** 2, seg_starts)
+        ssw_total = np.add.reduceat(ssw, seg_starts)
+
+        df_between = n_groups - 1
+        df_within = total_n - n_groups
+        f_stat = (ssb / df_between) / (ssw_total / df_within)
+        p_value = stats.f.sf(f_stat, df_between, df_within)
+    return f_stat, p_value
+
+def grouped_ft_test(values: np.ndarray, demo_codes: dict) -> pd.DataFrame:
+    """
+    values: 문항 응답값 (float64, 비수치 응답은 NaN)
+    demo_codes: factorize_demo_columns 결과
+
+    집단이 2개인 DEMO 는 t-test (Levene p > 0.05 이면 Student, 아니면 Welch),
+    3개 이상이면 One-way ANOVA 결과를 반환합니다. 집단이 2개 미만인 DEMO 는 제외됩니다.
+    """
+    columns = ["demo_col", "n_groups", "test", "statistic", "p_value", "levene_statistic", "levene_p"]
+    demo_codes = {col: (codes, k) for col, (codes, k) in demo_codes.items() if k >= 2}
+    if not demo_codes:
+        return pd.DataFrame(columns=columns)
+
+    values = np.asarray(values, dtype=np.float64)
+    demo_cols = list(demo_codes)
+    n_groups = np.array([demo_codes[col][1] for col in demo_cols], dtype=np.intp)
+    seg_starts = np.concatenate([[0], np.cumsum(n_groups)[:-1]])
+    total_groups = int(n_groups.sum())
+
+    # ✅ 모든 DEMO 컬럼의 (집단 코드 + offset)을 펼쳐 한 번의 bincount 로 집계
+    codes_mat = np.stack([demo_codes[col][0] for col in demo_cols])
+    valid = (codes_mat >= 0) & ~np.isnan(values)[None, :]
+    flat_codes = (codes_mat + seg_starts[:, None])[valid]
+    flat_values = np.broadcast_to(values, codes_mat.shape)[valid]
+
+    n = np.bincount(flat_codes, minlength=total_groups).astype(np.float64)
+    sums = np.bincount(flat_codes, weights=flat_values, minlength=total_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / n
+    dev = flat_values - mean[flat_codes]
+    ssw = np.bincount(flat_codes, weights=dev * dev, minlength=total_groups)
+
+    # ✅ 집단별 중앙값: (코드, 값) 정렬 후 구간 중앙 위치에서 한 번에 추출
+    sorted_values = flat_values[np.lexsort((flat_values, flat_codes))]
+    counts = n.astype(np.intp)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    last = max(len(sorted_values) - 1, 0)
+    lo = np.minimum(starts + (counts - 1) // 2, last)
+    hi = np.minimum(starts + counts // 2, last)
+    if len(sorted_values):
+        median = np.where(counts > 0, (sorted_values[lo] + sorted_values[hi]) / 2, np.nan)
+    else:
+        median = np.full(total_groups, np.nan)
+
+    # ✅ Levene (center='median') = |x - 중앙값| 에 대한 One-way ANOVA
+    z = np.abs(flat_values - median[flat_codes])
+    z_sums = np.bincount(flat_codes, weights=z, minlength=total_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_dev = z - (z_sums / n)[flat_codes]
+    z_ssw = np.bincount(flat_codes, weights=z_dev * z_dev, minlength=total_groups)
+    levene_stat, levene_p = _segment_anova(n, z_sums, z_ssw, seg_starts, n_groups)
+
+    f_stat, f_p = _segment_anova(n, sums, ssw, seg_starts, n_groups)
+
+    # ✅ 집단이 2개인 DEMO: Student / Welch t-test
+    i1, i2 = seg_starts, seg_starts + 1
+    n1, n2 = n[i1], n[i2]
+    m1, m2 = mean[i1], mean[i2]
+    s1, s2 = ssw[i1], ssw[i2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled_df = n1 + n2 - 2
+        pooled_var = (s1 + s2) / pooled_df
+        t_student = (m1 - m2) / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+        p_student = 2 * stats.t.sf(np.abs(t_student), pooled_df)
+
+        v1, v2 = s1 / (n1 - 1) / n1, s2 / (n2 - 1) / n2
+        t_welch = (m1 - m2) / np.sqrt(v1 + v2)
+        welch_df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+        p_welch = 2 * stats.t.sf(np.abs(t_welch), welch_df)
+
+    equal_var = levene_p > 0.05
+    t_stat = np.where(equal_var, t_student, t_welch)
+    t_p = np.where(equal_var, p_student, p_welch)
+    # 집단내 분산이 0 인 경우 scipy 와 같이 |t| = inf, p = 0
+    t_p = np.where(np.isinf(t_stat), 0.0, t_p)
+
+    is_t = n_groups == 2
+    return pd.DataFrame({
+        "demo_col": demo_cols,
+        "n_groups": n_groups,
+        "test": np.where(is_t, "t", "f"),
+        "statistic": np.where(is_t, t_stat, f_stat),
+        "p_value": np.where(is_t, t_p, f_p),
+        "levene_statistic": levene_stat,
+        "levene_p": levene_p,
+    }, columns=columns)
+
+def _chi_square_tables(counts: np.ndarray):
+    """
+    (T, R, C) 교차표 묶음 → 표별 chi2, p-value, 자유도, 실제 행/열 수
+    관측되지 않은 행/열(합계 0)은 pd.crosstab 과 같이 없는 것으로 취급
+    """
+    observed = counts.astype(np.float64)
+    row_sums = observed.sum(axis=2)
+    col_sums = observed.sum(axis=1)
+    total = row_sums.sum(axis=1)
+    n_rows = (row_sums > 0).sum(axis=1)
+    n_cols = (col_sums > 0).sum(axis=1)
+    dof = (n_rows - 1) * (n_cols - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = row_sums[:, :, None] * col_sums[:, None, :] / total[:, None, None]
+        # 자유도 1 (2x2) 인 표는 chi2_contingency 기본값과 같이 Yates 연속성 보정
+        diff = expected - observed
+        yates = (dof == 1)[:, None, None]
+        observed = np.where(yates, observed + np.sign(diff) * np.minimum(0.5, np.abs(diff)), observed)
+        cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    chi2 = cells.sum(axis=(1, 2))
+    p_value = stats.chi2.sf(chi2, dof)
+    return chi2, p_value, dof, n_rows, n_cols
+
+def grouped_chi_square(question_codes: dict, demo_codes: dict) -> pd.DataFrame:
+    """
+    question_codes: {question_key: (codes, n_categories)} — 여러 문항을 한 번에 계산 가능
+    demo_codes: factorize_demo_columns 결과
+
+    (문항, DEMO) 쌍마다 한 행인 tidy DataFrame 을 반환합니다.
+    n_rows / n_cols 가 2 미만인 교차표는 검정 불가이므로 statistic / p_value 가 NaN 입니다.
+    """
+    columns = ["question_key", "demo_col", "n_rows", "n_cols", "dof", "statistic", "p_value"]
+    if not question_codes or not demo_codes:
+        return pd.DataFrame(columns=columns)
+
+    demo_cols = list(demo_codes)
+    demo_mat = np.stack([demo_codes[col][0] for col in demo_cols])
+    max_demo = max(max(k for _, k in demo_codes.values()), 1)
+    n_demo, n_resp = demo_mat.shape
+
+    question_keys = list(question_codes)
+    chunk_size = max(1, CHI_SQUARE_CHUNK_ELEMENTS // max(n_demo * n_resp, 1))
+
+    frames = []
+    for chunk_start in range(0, len(question_keys), chunk_size):
+        chunk_keys = question_keys[chunk_start:chunk_start + chunk_size]
+        q_mat = np.stack([question_codes[key][0] for key in chunk_keys])
+        max_question = max(max(question_codes[key][1] for key in chunk_keys), 1)
+        block = max_demo * max_question
+        n_tables = len(chunk_keys) * n_demo
+
+        # ✅ (문항, DEMO, 응답자) → 교차표 블록 내 위치 코드로 펼쳐 한 번에 집계
+        valid = (demo_mat[None, :, :] >= 0) & (q_mat[:, None, :] >= 0)
+        table_ids = np.arange(n_tables).reshape(len(chunk_keys), n_demo)
+        flat_codes = (
+            table_ids[:, :, None] * block
+            + demo_mat[None, :, :] * max_question
+            + q_mat[:, None, :]
+        )[valid]
+        counts = np.bincount(flat_codes, minlength=n_tables * block).reshape(n_tables, max_demo, max_question)
+
+        chi2, p_value, dof, n_rows, n_cols = _chi_square_tables(counts)
+        testable = (n_rows >= 2) & (n_cols >= 2)
+        frames.append(pd.DataFrame({
+            "question_key": np.repeat(chunk_keys, n_demo),
+            "demo_col": np.tile(demo_cols, len(chunk_keys)),
+            "n_rows": n_rows,
+            "n_cols": n_cols,
+            "dof": dof,
+            "statistic": np.where(testable, chi2, np.nan),
+            "p_value": np.where(testable, p_value, np.nan),
+        }, columns=columns))
+
+    return pd.concat(frames, ignore_index=True)
+
+STATISTICS_MATRIX_COLUMNS = ["question_key", "test_type", "demo_col", "label", "statistic", "p_value", "stars", "note"]
+
+def _statistics_matrix_chunk(ft_keys, ft_values, chi_codes, demo_codes):
+    """
+    process pool 작업 단위: 일부 문항에 대한 F/T + chi-square 결과 (tidy DataFrame)
+    """
+    frames = []
+    for idx, key in enumerate(ft_keys):
+        result = grouped_ft_test(ft_values[:, idx], demo_codes)
+        if not result.empty:
+            frames.append(result[["demo_col", "statistic", "p_value"]].assign(question_key=key, test_type="ft_test", note=""))
+
+    if chi_codes:
+        result = grouped_chi_square(chi_codes, demo_codes)
+        testable = (result["n_rows"] >= 2) & (result["n_cols"] >= 2)
+        frames.append(result[["question_key", "demo_col", "statistic", "p_value"]].assign(
+            test_type="chi_square", note=np.where(testable, "", "too_small"),
+        ))
+
+    if not frames:
+        return pd.DataFrame(columns=["question_key", "test_type", "demo_col", "statistic", "p_value", "note"])
+    return pd.concat(frames, ignore_index=True)
+
+def compute_statistics_matrix(raw_data: pd.DataFrame, demo_mapping: dict, question_tests: dict,
+                              max_workers: int = None, demo_codes: dict = None) -> pd.DataFrame:
+    """
+    업로드 파일 전체에 대한 (문항 × DEMO) 통계 매트릭스를 한 번에 계산합니다.
+
+    raw_data: 컬럼명이 정규화된 DATA 시트
+    demo_mapping: {'DEMO1': '성별', ...}
+    question_tests: {question_key: 'ft_test' | 'chi_square'} — 그 외 test_type 은 제외
+    max_workers: process pool 크기 (1 이면 현재 프로세스에서 계산)
+
+    반환: 문항별 DEMO 순서대로 정렬된 tidy DataFrame (STATISTICS_MATRIX_COLUMNS)
+          chi-square 에서 검정하지 못한 DEMO 는 statistic / p_value 가 NaN 이고 note 에 사유
+          ("missing_demo" / "unorderable_demo" / "too_small") — 검정한 칸의 note 는 ""
+    """
+    if demo_codes is None:
+        demo_codes = factorize_demo_columns(raw_data, demo_mapping)
+    demo_codes = {col: demo_codes[col] for col in demo_mapping if col in demo_codes}
+    skipped_demos = [col for col in demo_mapping if col not in demo_codes]
+
+    normalized_columns = {str(col).replace("-", "_").strip(): col for col in raw_data.columns}
+    ft_keys, chi_keys = [], []
+    for key, test_type in question_tests.items():
+        key = key.replace("-", "_").strip()
+        if key not in normalized_columns:
+            continue
+        if test_type == "ft_test":
+            ft_keys.append(key)
+        elif test_type == "chi_square":
+            chi_keys.append(key)
+
+    if ft_keys:
+        ft_values = np.column_stack([
+            pd.to_numeric(raw_data[normalized_columns[key]], errors="coerce").to_numpy(dtype=np.float64)
+            for key in ft_keys
+        ])
+    else:
+        ft_values = np.empty((len(raw_data), 0))
+    chi_codes = {}
+    for key in chi_keys:
+        try:
+            chi_codes[key] = factorize_column(raw_data[normalized_columns[key]])
+        except Exception:
+            # 정렬할 수 없는 문항(혼합 타입 등)은 제외 → 문항별 계산 경로에서 DEMO 별 오류로 표시
+            continue
+    chi_keys = [key for key in chi_keys if key in chi_codes]
+
+    # ✅ 규모가 크면 문항 단위로 나누어 process pool 에서 병렬 계산
+    n_questions = len(ft_keys) + len(chi_keys)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers > 1 and n_questions > 1 and n_questions * len(raw_data) >= PROCESS_POOL_MIN_CELLS:
+        n_chunks = min(max_workers, n_questions)
+        ft_splits = np.array_split(np.arange(len(ft_keys)), n_chunks)
+        chi_splits = np.array_split(np.array(chi_keys, dtype=object), n_chunks)
+        with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+            futures = [
+                executor.submit(
+                    _statistics_matrix_chunk,
+                    [ft_keys[i] for i in ft_idx],
+                    ft_values[:, ft_idx],
+                    {key: chi_codes[key] for key in chi_split},
+                    demo_codes,
+                )
+                for ft_idx, chi_split in zip(ft_splits, chi_splits)
+            ]
+            frames = [future.result() for future in futures]
+        matrix = pd.concat(frames, ignore_index=True)
+    else:
+        matrix = _statistics_matrix_chunk(ft_keys, ft_values, chi_codes, demo_codes)
+
+    # ✅ 코드화하지 못한 DEMO 도 chi-square 문항마다 한 칸씩 남김 → 문항별 경로와 같은 누락 / 실패 안내
+    if chi_keys and skipped_demos:
+        matrix = pd.concat([matrix, pd.DataFrame({
+            "question_key": np.repeat(chi_keys, len(skipped_demos)),
+            "test_type": "chi_square",
+            "demo_col": np.tile(skipped_demos, len(chi_keys)),
+            "statistic": np.nan,
+            "p_value": np.nan,
+            "note": ["missing_demo" if col not in raw_data.columns else "unorderable_demo" for col in skipped_demos] * len(chi_keys),
+        })], ignore_index=True)
+
+    # 입력 문항 순서 → DEMO 매핑 순서로 정렬
+    question_order = {key: idx for idx, key in enumerate(ft_keys + chi_keys)}
+    demo_order = {col: idx for idx, col in enumerate(demo_mapping)}
+    matrix = matrix.assign(
+        _q=matrix["question_key"].map(question_order),
+        _d=matrix["demo_col"].map(demo_order),
+    ).sort_values(["_q", "_d"]).drop(columns=["_q", "_d"]).reset_index(drop=True)
+
+    matrix["label"] = matrix["demo_col"].map(demo_mapping)
+    matrix["stars"] = significance_stars(matrix["p_value"].to_numpy())
+    return matrix[STATISTICS_MATRIX_COLUMNS]
+
+def pivot_statistics_matrix(matrix: pd.DataFrame, values: str = "p_value") -> pd.DataFrame:
+    """
+    tidy 통계 매트릭스 → (문항 × DEMO 라벨) 형태 표 (values: statistic / p_value / stars)
+    """
+    matrix = matrix[matrix["note"] == ""]
+    return matrix.pivot(index="question_key", columns="label", values=values)
+
+def statistics_matrix_result(matrix: pd.DataFrame, question_key: str, test_type: str):
+    """
+    통계 매트릭스에서 한 문항의 결과를 run_statistical_tests 와 같은 형식으로 꺼냅니다.
+    매트릭스에 해당 (문항, test_type)이 없으면 None
+    """
+    question_key = question_key.replace("-", "_").strip()
+    rows = matrix[(matrix["question_key"] == question_key) & (matrix["test_type"] == test_type)]
+    if rows.empty:
+        return None
+
+    rows = rows[rows["note"] == ""]
+    return pd.DataFrame({
+        "대분류": rows["label"].to_numpy(),
+        "통계량": [round(abs(value), 3) for value in rows["statistic"]],
+        "p-value": [round(value, 4) for value in rows["p_value"]],
+        "유의성": [assign_significance_stars(value) for value in rows["p_value"]],
+    })
+
+def statistics_matrix_notes(matrix: pd.DataFrame, question_key: str, test_type: str) -> list:
+    """
+    매트릭스에서 한 문항의 검정하지 못한 DEMO → [(demo_col, label, note)] (DEMO 매핑 순서)
+    """
+    question_key = question_key.replace("-", "_").strip()
+    rows = matrix[(matrix["question_key"] == question_key) & (matrix["test_type"] == test_type) & (matrix["note"] != "")]
+    return list(zip(rows["demo_col"], rows["label"], rows["note"]))
@@ -0,0 +1,124 @@
+import os
+import functools
+
+import numpy as np
+import pandas as pd
+
+'''
+통계표(DataFrame) → LLM 프롬프트용 텍스트 선형화
+
+사용법:
+    linearized_table = linearize_table(selected_table)                    # 토큰 수가 가장 적은 형식 자동 선택
+    linearized_table = linearize_table(selected_table, fmt="compact")     # 형식 지정
+
+형식:
+- row_wise : "대분류: 성별; 소분류: 남자; 사례수: 1087.0 | ..." (기존 형식, 모든 셀에 컬럼명 반복)
+- markdown : 헤더 1회 + 구분선이 있는 markdown 표
+- compact  : 헤더 1회 + " | " 로 구분한 행 (빈 셀은 'nan' 대신 빈 칸으로 남겨 컬럼 위치 유지, 정수값의 '.0' 제거)
+
+"auto" 는 토큰 수가 가장 적은 형식을 고르고 (같으면 LINEARIZE_FORMAT_PREFERENCE 순서), 그 형식도 max_tokens 를 넘으면
+경고만 출력합니다. (데이터 행은 잘라내지 않음)
+토큰 절감 측정: python -m benchmarks.pipeline_benchmark 의 linearize_tokens (형식별 전체 질문 토큰 합)
+  합성 통계표 small / medium 에서 auto(= compact) 가 row_wise 대비 약 63% 절감 (오프라인 근사 토큰 기준)
+'''
+
+LINEARIZE_FORMATS = ("row_wise", "markdown", "compact")
+
+# ✅ 자동 선택 시 토큰 수가 같을 때의 선호 순서 (앞쪽일수록 LLM 이 읽기 쉬운 형식)
+LINEARIZE_FORMAT_PREFERENCE = ("row_wise", "markdown", "compact")
+
+# ✅ 기본 형식 / 토큰 예산 (환경변수로 변경 가능)
+DEFAULT_LINEARIZE_FORMAT = os.getenv("TABLE_LINEARIZE_FORMAT", "auto")
+DEFAULT_MAX_TOKENS = int(os.getenv("TABLE_LINEARIZE_MAX_TOKENS", "800"))
+DEFAULT_TOKEN_MODEL = "gpt-4o"
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        # tiktoken 미설치 / 오프라인(encoding 파일 다운로드 실패) → 근사치 사용
+        print(f"⚠️ tiktoken encoding 로딩 실패 ({model}), 토큰 수를 근사치로 계산합니다: {e}")
+        return None
+
+def count_tokens(text: str, model: str = DEFAULT_TOKEN_MODEL) -> int:
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 근사치: 한글 등 비 ASCII 문자는 1자 ≈ 1토큰, ASCII 는 4자 ≈ 1토큰
+    n_ascii = sum(1 for ch in text if ch.isascii())
+    return (len(text) - n_ascii) + (n_ascii + 3) // 4
+
+def _cell_text(df: pd.DataFrame) -> np.ndarray:
+    # df.iterrows() 와 같은 값 → 문자열 변환 (df.values 공통 dtype 기준)
+    return np.asarray(df.values).astype(str)
+
+def _compact_cell_text(df: pd.DataFrame) -> np.ndarray:
+    columns = []
+    for idx in range(df.shape[1]):
+        col = df.iloc[:, idx]
+        if pd.api.types.is_float_dtype(col.dtype):
+            values = col.to_numpy(dtype=np.float64)
+            text = values.astype(str)
+            integral = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 1e15)
+            text[integral] = values[integral].astype(np.int64).astype(str)
+            text[np.isnan(values)] = ""
+        else:
+            values = col.to_numpy(dtype=object)
+            text = np.asarray(values).astype(str)
+            text[pd.isna(values)] = ""
+        columns.append(text.astype(object))
+    if not columns:
+        return np.empty((len(df), 0), dtype=object)
+    return np.column_stack(columns)
+
+def linearize_row_wise(df: pd.DataFrame) -> str:
+    if df.shape[1] == 0:
+        return " | ".join("" for _ in range(len(df)))
+    prefixes = np.array([f"{col}: " for col in df.columns], dtype=object)
+    cells = prefixes + _cell_text(df).astype(object)
+    return " | ".join("; ".join(row) for row in cells.tolist())
+
+def linearize_markdown(df: pd.DataFrame) -> str:
+    cells = _compact_cell_text(df)
+    header = "| " + " | ".join(str(col) for col in df.columns) + " |"
+    divider = "|" + "|".join("---" for _ in df.columns) + "|"
+    rows = ["| " + " | ".join(row) + " |" for row in cells.tolist()]
+    return "\n".join([header, divider] + rows)
+
+def linearize_compact(df: pd.DataFrame) -> str:
+    cells = _compact_cell_text(df)
+    header = " | ".join(str(col) for col in df.columns)
+    return "\n".join([header] + [" | ".join(row) for row in cells.tolist()])
+
+LINEARIZERS = {
+    "row_wise": linearize_row_wise,
+    "markdown": linearize_markdown,
+    "compact": linearize_compact,
+}
+
+def choose_linearization(df: pd.DataFrame, max_tokens: int = None, model: str = DEFAULT_TOKEN_MODEL,
+                         preference=LINEARIZE_FORMAT_PREFERENCE):
+    """
+    토큰 수가 가장 적은 형식 (같으면 preference 순서) → (fmt, text, n_tokens)
+    """
+    max_tokens = DEFAULT_MAX_TOKENS if max_tokens is None else max_tokens
+    candidates = []
+    for rank, fmt in enumerate(preference):
+        text = LINEARIZERS[fmt](df)
+        candidates.append((count_tokens(text, model), rank, fmt, text))
+
+    n_tokens, _, fmt, text = min(candidates)
+    if n_tokens > max_tokens:
+        print(f"⚠️ 선형화된 표가 토큰 예산을 초과합니다 ({n_tokens} > {max_tokens}), '{fmt}' 형식 사용")
+    return fmt, text, n_tokens
+
+def linearize_table(df: pd.DataFrame, fmt: str = None, max_tokens: int = None,
+                    model: str = DEFAULT_TOKEN_MODEL) -> str:
+    fmt = fmt or DEFAULT_LINEARIZE_FORMAT
+    if fmt == "auto":
+        return choose_linearization(df, max_tokens=max_tokens, model=model)[1]
+    if fmt not in LINEARIZERS:
+        raise ValueError(f"❌ 지원하지 않는 선형화 형식입니다: {fmt} (가능: auto, {', '.join(LINEARIZE_FORMATS)})")
+    return LINEARIZERS[fmt](df)
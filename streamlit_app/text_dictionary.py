@@ -32,6 +32,10 @@ TEXT = {
             "한국어": "3️⃣ 분석 방식 선택",
             "English": "3️⃣ Select Analysis Mode"
         },
+        "fused_mode_label": {
+            "한국어": "⚡ 단일 호출(fused) 모드 — 가설 / 분석 / 검증 / 다듬기를 LLM 한 번으로 처리",
+            "English": "⚡ Fused mode — hypotheses / analysis / check / polish in a single LLM call"
+        },
         "mode_options": {
             "English": ["Single Question - Manual Selection", "Batch All Questions - Full Auto Analysis"],
             "한국어": ["단일 질문 선택 - 직접 선택", "전체 질문 batch - 전체 자동 분석"]
@@ -220,5 +224,19 @@ This service is a multi-agent platform that analyzes and summarizes statistical
         "한국어": "💡 설문 설계 생성",
         "English": "💡 Generate Survey Plan"
         }
+    },
+    "trace_summary": {
+        "title": {
+            "한국어": "⏱️ 최근 실행 추적",
+            "English": "⏱️ Last Run Trace"
+        },
+        "empty": {
+            "한국어": "아직 기록된 실행이 없습니다.",
+            "English": "No traced runs yet."
+        },
+        "totals": {
+            "한국어": "질문 {traces}건 · 누적 {seconds:.1f}초 · LLM 호출 {llm_calls}회 · 토큰 {prompt_tokens:,} / {completion_tokens:,} · 캐시 hit {cache_hits}회 · revision {revision_iterations}회 · 실패 {errors}건",
+            "English": "{traces} questions · {seconds:.1f}s total · {llm_calls} LLM calls · tokens {prompt_tokens:,} / {completion_tokens:,} · {cache_hits} cache hits · {revision_iterations} revisions · {errors} failed"
+        }
     }
-}
\ No newline at end of file
+}
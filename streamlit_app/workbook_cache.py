@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# ✅ 디스크 bundle (Arrow) — pyarrow 가 없으면 메모리 캐시만 사용
+try:
+    import survey_table_bundle
+except ImportError:
+    try:
+        from streamlit_app import survey_table_bundle
+    except ImportError:
+        survey_table_bundle = None
+
+'''
+업로드된 통계표 엑셀 파일의 파싱 결과를 내용(content) 해시 기준으로 캐싱합니다.
+
+사용법:
+    tables, question_texts, question_keys = get_parsed_workbook(uploaded_file, load_survey_tables)
+
+- 같은 내용의 파일은 파서(parser) 별로 한 번만 파싱되고, 이후 호출은 dict 조회로 끝납니다.
+- 프로세스 재시작 후에는 Arrow bundle(survey_table_bundle)에서 memory map 으로 복원합니다.
+- 단일 질문 모드는 get_workbook_index / get_parsed_question 으로 key 목록과 선택된 테이블만 캐싱합니다.
+- 반환되는 DataFrame들은 캐시와 공유되므로, 수정이 필요하면 반드시 .copy() 후 사용할 것
+'''
+
+# ✅ 프로세스당 최대 보관 워크북 수 (LRU)
+MAX_CACHED_WORKBOOKS = 8
+
+# ✅ key 목록 / 단일 질문 테이블은 작으므로 따로 더 많이 보관
+MAX_CACHED_QUESTIONS = 64
+
+_cache = OrderedDict()
+_question_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def read_workbook_bytes(source) -> bytes:
+    """
+    파일 경로, bytes, file-like 객체(BytesIO, Streamlit UploadedFile 등)에서 원본 bytes를 읽습니다.
+    file-like 객체의 현재 위치는 변경하지 않습니다.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+
+    position = source.tell()
+    source.seek(0)
+    data = source.read()
+    source.seek(position)
+    return data
+
+def workbook_digest(source) -> str:
+    return hashlib.sha256(read_workbook_bytes(source)).hexdigest()
+
+def _parser_id(parser) -> str:
+    return f"{getattr(parser, '__module__', '')}.{getattr(parser, '__qualname__', repr(parser))}"
+
+def _load_bundle(digest, parser_id, sheet_name):
+    if survey_table_bundle is None or not survey_table_bundle.BUNDLE_DIR:
+        return None
+    path = survey_table_bundle.bundle_path_for(digest, parser_id, sheet_name)
+    try:
+        return survey_table_bundle.import_survey_tables(path, expected_digest=digest, parser_id=parser_id)
+    except Exception as e:
+        print(f"⚠️ 통계표 bundle 로딩 실패 ({path}): {e}")
+        return None
+
+def _store_bundle(digest, parser_id, sheet_name, parsed):
+    if survey_table_bundle is None or not survey_table_bundle.BUNDLE_DIR:
+        return
+    path = survey_table_bundle.bundle_path_for(digest, parser_id, sheet_name)
+    try:
+        survey_table_bundle.export_survey_tables(path, *parsed, source_digest=digest, parser_id=parser_id)
+    except Exception as e:
+        print(f"⚠️ 통계표 bundle 저장 실패 ({path}): {e}")
+
+def _memoize(cache, limit, key, compute):
+    with _lock:
+        if key in cache:
+            cache.move_to_end(key)
+            _stats["hits"] += 1
+            return cache[key]
+
+    value = compute()
+    with _lock:
+        _stats["misses"] += 1
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+    return value
+
+def get_parsed_workbook(source, parser, sheet_name: str = "통계표", use_bundle: bool = True):
+    """
+    parser(file, sheet_name=...) 결과 (tables, question_texts, question_keys)를 캐시에서 찾고,
+    없으면 디스크 bundle → 파싱 순서로 가져온 뒤 저장합니다.
+    """
+    data = read_workbook_bytes(source)
+    digest = hashlib.sha256(data).hexdigest()
+    parser_id = _parser_id(parser)
+    key = (digest, parser_id, sheet_name)
+
+    def parse():
+        parsed = _load_bundle(digest, parser_id, sheet_name) if use_bundle else None
+        if parsed is None:
+            parsed = parser(io.BytesIO(data), sheet_name=sheet_name)
+            if use_bundle:
+                _store_bundle(digest, parser_id, sheet_name, parsed)
+        return parsed
+
+    cached = _memoize(_cache, MAX_CACHED_WORKBOOKS, key, parse)
+    tables, question_texts, question_keys = cached
+    # 호출자가 컨테이너를 수정해도 캐시가 오염되지 않도록 얕은 복사본 반환
+    return dict(tables), dict(question_texts), list(question_keys)
+
+def get_workbook_index(source, indexer, sheet_name: str = "통계표"):
+    """
+    indexer(file, sheet_name=...) 결과 (question_keys, question_texts) — 테이블은 만들지 않음
+    """
+    data = read_workbook_bytes(source)
+    key = (hashlib.sha256(data).hexdigest(), _parser_id(indexer), sheet_name)
+    question_keys, question_texts = _memoize(
+        _question_cache, MAX_CACHED_QUESTIONS, key,
+        lambda: indexer(io.BytesIO(data), sheet_name=sheet_name),
+    )
+    return list(question_keys), dict(question_texts)
+
+def get_parsed_question(source, loader, selected_key: str, sheet_name: str = "통계표"):
+    """
+    loader(file, selected_key, sheet_name=...) 결과 (table, question_text) — 선택된 질문 하나만 파싱
+    """
+    data = read_workbook_bytes(source)
+    key = (hashlib.sha256(data).hexdigest(), _parser_id(loader), sheet_name, selected_key)
+    return _memoize(
+        _question_cache, MAX_CACHED_QUESTIONS, key,
+        lambda: loader(io.BytesIO(data), selected_key, sheet_name=sheet_name),
+    )
+
+def clear_workbook_cache():
+    with _lock:
+        _cache.clear()
+        _question_cache.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+def workbook_cache_stats() -> dict:
+    with _lock:
+        return {**_stats, "size": len(_cache), "question_size": len(_question_cache)}